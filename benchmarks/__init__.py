@@ -0,0 +1,5 @@
+"""Performance benchmarks for pycmdlineapp-groundwork.
+
+Benchmarks live in `bench_*.py` modules of this package and are run with
+`python -m benchmarks`. See `python -m benchmarks --help` for the available options.
+"""
@@ -0,0 +1,153 @@
+"""Command line entry point of the benchmark suite: `python -m benchmarks --help`."""
+
+import importlib
+import pkgutil
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import click
+
+from .harness import (
+    DEFAULT_REGRESSION_THRESHOLD,
+    SIZE_LABELS,
+    BenchmarkContext,
+    compare_results,
+    load_results,
+    parse_size,
+    registered_suites,
+    run_suites,
+    write_results,
+)
+
+#: Baseline file used by `--compare` and `--save-baseline` if no other path is given
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+
+
+def _import_benchmark_modules() -> None:
+    """Import all `bench_*` modules of this package so their suites get registered."""
+    package_path = str(Path(__file__).parent)
+    for module_info in pkgutil.iter_modules([package_path]):
+        if module_info.name.startswith("bench_"):
+            importlib.import_module(f"{__package__}.{module_info.name}")
+
+
+def _format_seconds(seconds: float) -> str:
+    for unit, factor in (("s", 1.0), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= factor:
+            return f"{seconds / factor:8.3f} {unit}"
+    return f"{seconds / 1e-9:8.1f} ns"
+
+
+def _print_result(name: str, result: Dict[str, Any]) -> None:
+    click.echo(
+        f"{name:60s} median {_format_seconds(result['median'])}  "
+        f"min {_format_seconds(result['min'])}  (x{result['iterations']},"
+        f" {result['rounds']} rounds)"
+    )
+    if "memory_retained" in result:
+        click.echo(
+            f"{'':60s} retained {result['memory_retained'] / 1024 ** 2:9.1f} MB"
+            f"  peak {result['memory_peak'] / 1024 ** 2:9.1f} MB"
+        )
+
+
+@click.command()
+@click.option(
+    "--suite",
+    "suites",
+    multiple=True,
+    help="Suite to run, may be given multiple times. Defaults to all suites.",
+)
+@click.option("--filter", "name_filter", default=None, help="Only run cases containing this text.")
+@click.option(
+    "--max-size",
+    default="1MB",
+    show_default=True,
+    help="Largest synthetic input size, eg. 100MB for the full sweep.",
+)
+@click.option("--repeat", default=5, show_default=True, help="Timing rounds per case.")
+@click.option(
+    "--output",
+    type=click.Path(dir_okay=False),
+    default="benchmark-results.json",
+    show_default=True,
+    help="JSON file the results are written to.",
+)
+@click.option(
+    "--compare",
+    "compare_to",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help=f"Baseline JSON file to compare against, eg. {DEFAULT_BASELINE.name}.",
+)
+@click.option(
+    "--threshold",
+    default=DEFAULT_REGRESSION_THRESHOLD,
+    show_default=True,
+    help="Relative slow-down of the median flagged as regression.",
+)
+@click.option(
+    "--save-baseline",
+    is_flag=True,
+    help=f"Also store the results as new baseline in {DEFAULT_BASELINE}.",
+)
+@click.option("--list", "list_suites", is_flag=True, help="List suites and exit.")
+def main(
+    suites: Tuple[str, ...],
+    name_filter: Optional[str],
+    max_size: str,
+    repeat: int,
+    output: str,
+    compare_to: Optional[str],
+    threshold: float,
+    save_baseline: bool,
+    list_suites: bool,
+):
+    """Run the benchmark suites, write the results as JSON and optionally flag
+    regressions against a stored baseline. Exits with code 1 if a regression is found.
+    """
+    _import_benchmark_modules()
+    if list_suites:
+        for suite_name, suite in registered_suites().items():
+            click.echo(f"{suite_name:24s} {(suite.__doc__ or '').strip().splitlines()[0]}")
+        return
+
+    unknown = set(suites) - set(registered_suites())
+    if unknown:
+        raise click.BadParameter(f"unknown suite(s) {', '.join(sorted(unknown))}", param_hint="--suite")
+
+    largest = parse_size(max_size)
+    sizes = [size for size in sorted(SIZE_LABELS) if size <= largest]
+    with tempfile.TemporaryDirectory(prefix="pycmdlineapp-bench-") as work_dir:
+        context = BenchmarkContext(Path(work_dir), sizes, repeat=repeat)
+        results = run_suites(
+            context,
+            suite_names=suites if suites else None,
+            name_filter=name_filter,
+            progress=_print_result,
+        )
+
+    write_results(results, Path(output))
+    click.echo(f"Results written to {output}")
+    if save_baseline:
+        write_results(results, DEFAULT_BASELINE)
+        click.echo(f"Baseline written to {DEFAULT_BASELINE}")
+
+    if compare_to is not None:
+        comparison = compare_results(results, load_results(Path(compare_to)), threshold)
+        regressions = [entry for entry in comparison if entry["regression"]]
+        for entry in comparison:
+            marker = "REGRESSION" if entry["regression"] else ""
+            click.echo(
+                f"{entry['name']:60s} {_format_seconds(entry['baseline'])} ->"
+                f" {_format_seconds(entry['current'])}  x{entry['ratio']:.2f} {marker}"
+            )
+        if regressions:
+            click.echo(f"{len(regressions)} regression(s) above {threshold:.0%} found.")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+"""Benchmarks of the config pipeline: file loading, format fallback, deep merging,
+layered settings loading and the click `--config` option end to end.
+"""
+
+import json
+from functools import partial
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+import click
+from click.testing import CliRunner
+from pydantic import BaseModel, BaseSettings
+
+from pycmdlineapp_groundwork.config.click_config_option import click_config_option
+from pycmdlineapp_groundwork.config.config_data_types import ConfigDataTypes
+from pycmdlineapp_groundwork.config.config_file_loaders import (
+    _settings_config_load,
+    load_dict_from_file,
+)
+from pycmdlineapp_groundwork.utility.dict_deep_update import (
+    MAX_RECURSION_DEPTH,
+    dict_deep_update,
+)
+
+from .harness import BenchmarkCase, BenchmarkContext, benchmark_suite, size_label
+from .synthetic import (
+    generate_config,
+    generate_deep_dict,
+    generate_wide_dict,
+    write_config,
+)
+
+_SUFFIXES = {
+    ConfigDataTypes.json: ".json",
+    ConfigDataTypes.toml: ".toml",
+    ConfigDataTypes.yaml: ".yaml",
+}
+
+#: Number of files merged by the layered loading benchmarks
+LAYER_COUNTS = (1, 4, 16, 64)
+
+#: Size of each file in the layered loading benchmarks
+LAYER_SIZE = 10 * 1024
+
+
+def _unlink(file_path: Path) -> None:
+    if file_path.exists():
+        file_path.unlink()
+
+
+@benchmark_suite("load_dict_from_file")
+def load_dict_from_file_cases(context: BenchmarkContext) -> Iterator[BenchmarkCase]:
+    """`load_dict_from_file` per format and input size with the format known from the suffix."""
+    for data_type, suffix in _SUFFIXES.items():
+        for size in context.sizes:
+            file_path = write_config(
+                context.work_dir / f"load_{size}{suffix}", size, data_type
+            )
+            yield BenchmarkCase(
+                name=f"load_dict_from_file/{data_type.value}/{size_label(size)}",
+                func=partial(load_dict_from_file, file_path),
+                params={
+                    "data_type": data_type.value,
+                    "size": size,
+                    "file_size": file_path.stat().st_size,
+                },
+                teardown=partial(_unlink, file_path),
+            )
+
+
+@benchmark_suite("resolve_order")
+def resolve_order_cases(context: BenchmarkContext) -> Iterator[BenchmarkCase]:
+    """Format fallback of `load_dict_from_file`: content with unknown suffix is tried as
+    JSON and TOML before it parses as YAML, from a path and from an open stream.
+    """
+    for size in context.sizes:
+        file_path = write_config(
+            context.work_dir / f"fallback_{size}.txt", size, ConfigDataTypes.yaml
+        )
+        yield BenchmarkCase(
+            name=f"resolve_order/yaml_fallback_path/{size_label(size)}",
+            func=partial(load_dict_from_file, file_path),
+            params={"size": size, "file_size": file_path.stat().st_size},
+        )
+
+        def load_from_stream(file_path: Path = file_path) -> None:
+            with open(file_path, encoding="utf-8") as stream:
+                load_dict_from_file(stream)
+
+        yield BenchmarkCase(
+            name=f"resolve_order/yaml_fallback_stream/{size_label(size)}",
+            func=load_from_stream,
+            params={"size": size, "file_size": file_path.stat().st_size},
+            teardown=partial(_unlink, file_path),
+        )
+
+
+@benchmark_suite("dict_deep_update")
+def dict_deep_update_cases(context: BenchmarkContext) -> Iterator[BenchmarkCase]:
+    """`dict_deep_update` on wide and on deep trees, merged into an empty target
+    (deep-copy path) and overlaid onto an identically shaped target (in-place path).
+    """
+    for width in (100, 10_000, 100_000):
+        source = generate_wide_dict(width)
+        yield BenchmarkCase(
+            name=f"dict_deep_update/wide_into_empty/{width}",
+            func=lambda source=source: dict_deep_update({}, source),
+            params={"width": width},
+        )
+        target = generate_wide_dict(width, with_lists=False)
+        overlay = generate_wide_dict(width, with_lists=False)
+        yield BenchmarkCase(
+            name=f"dict_deep_update/wide_overlay/{width}",
+            func=partial(dict_deep_update, target, overlay),
+            params={"width": width},
+        )
+
+    for depth in (2, 5, MAX_RECURSION_DEPTH):
+        source = generate_deep_dict(depth)
+        yield BenchmarkCase(
+            name=f"dict_deep_update/deep_into_empty/{depth}",
+            func=lambda source=source: dict_deep_update({}, source),
+            params={"depth": depth},
+        )
+        target = generate_deep_dict(depth)
+        overlay = generate_deep_dict(depth)
+        yield BenchmarkCase(
+            name=f"dict_deep_update/deep_overlay/{depth}",
+            func=partial(dict_deep_update, target, overlay),
+            params={"depth": depth},
+        )
+
+
+@benchmark_suite("settings_config_load")
+def settings_config_load_cases(context: BenchmarkContext) -> Iterator[BenchmarkCase]:
+    """`_settings_config_load` merging N layered config files of `LAYER_SIZE` bytes each."""
+    for layers in LAYER_COUNTS:
+        file_paths: List[Path] = []
+        for layer in range(layers):
+            file_paths.append(
+                write_config(
+                    context.work_dir / f"layer_{layers}_{layer}.json",
+                    LAYER_SIZE,
+                    ConfigDataTypes.json,
+                    seed=layer,
+                )
+            )
+        yield BenchmarkCase(
+            name=f"settings_config_load/layers/{layers}",
+            func=partial(
+                _settings_config_load,
+                None,  # type: ignore
+                file_path=file_paths,
+                error_handling="propagate",
+            ),
+            params={"layers": layers, "layer_size": LAYER_SIZE},
+            teardown=lambda file_paths=file_paths: [_unlink(p) for p in file_paths],
+        )
+
+
+class _BenchSection(BaseModel):
+    name: str
+    enabled: bool
+    port: int
+    ratio: float
+    mode: str
+    tags: List[str]
+    limits: List[int]
+    nested: Dict[str, Any]
+
+
+class _BenchSettings(BaseSettings):
+    debug: bool = False
+    sections: Dict[str, _BenchSection] = {}
+
+
+def _config_cli(settings: _BenchSettings) -> click.Command:
+    @click.command()
+    @click_config_option(settings, _BenchSettings)
+    @click.option("--debug/--no-debug", default=settings.debug)
+    def cli(config, debug):
+        pass
+
+    return cli
+
+
+@benchmark_suite("click_config_option")
+def click_config_option_cases(context: BenchmarkContext) -> Iterator[BenchmarkCase]:
+    """A click command with `click_config_option` invoked through `CliRunner`."""
+    cli = _config_cli(_BenchSettings())
+    runner = CliRunner()
+    for size in context.sizes:
+        if size > 10 * 1024 * 1024:
+            continue
+        file_path = context.work_dir / f"cli_{size}.json"
+        file_path.write_text(
+            json.dumps(
+                {"debug": True, "sections": generate_config(size, ConfigDataTypes.json)}
+            ),
+            encoding="utf-8",
+        )
+
+        def invoke(file_path: Path = file_path) -> None:
+            result = runner.invoke(cli, ["--config", str(file_path)])
+            if result.exit_code != 0:
+                raise RuntimeError(result.output)
+
+        yield BenchmarkCase(
+            name=f"click_config_option/end_to_end/{size_label(size)}",
+            func=invoke,
+            params={"size": size, "file_size": file_path.stat().st_size},
+            teardown=partial(_unlink, file_path),
+        )
+
+
+#: Number of documented fields of the settings model of the `cli_cold_start` suite
+COLD_START_FIELDS = 300
+
+_COLD_START_CLI = '''
+import sys
+
+import click
+from pydantic import BaseSettings
+
+from pycmdlineapp_groundwork.config.click_config_option import (
+    DeferredHelpCommand,
+    click_config_option,
+    settings_field_option,
+)
+from pycmdlineapp_groundwork.config.settings_doc import apply_attributes_docs, with_attrs_docs
+
+mode = sys.argv.pop(1)
+
+
+class Settings(BaseSettings):
+{fields}
+
+
+if mode == "eager_uncached":
+    apply_attributes_docs(Settings, docs_cache=None)
+elif mode == "eager":
+    with_attrs_docs(Settings)
+else:
+    with_attrs_docs(lazy=True)(Settings)
+settings = Settings()
+
+
+@click.command(cls=DeferredHelpCommand)
+@click_config_option(settings, Settings, deferred=mode == "deferred")
+@settings_field_option(Settings, "--field-0", "field_0", type=int, default=settings.field_0)
+@click.pass_context
+def cli(ctx, config, field_0):
+    ctx.default_map and ctx.default_map["field_0"]
+
+
+cli()
+'''
+
+
+@benchmark_suite("cli_cold_start")
+def cli_cold_start_cases(context: BenchmarkContext) -> Iterator[BenchmarkCase]:
+    """Cold start of a command line app with `click_config_option` and a settings model of
+    `COLD_START_FIELDS` documented fields, each invocation in a new interpreter: attribute docs
+    extracted eagerly without and with the on-disk docs cache, and deferred to `--help`.
+    """
+    import os
+    import subprocess
+    import sys
+
+    script_path = context.work_dir / "cold_start_cli.py"
+    script_path.write_text(
+        _COLD_START_CLI.format(
+            fields="\n".join(
+                f"    #: documentation of field {index}\n    field_{index}: int = {index}"
+                for index in range(COLD_START_FIELDS)
+            )
+        ),
+        encoding="utf-8",
+    )
+    config_path = context.work_dir / "cold_start_config.json"
+    config_path.write_text(json.dumps({"field_0": 42}), encoding="utf-8")
+    environment = dict(
+        os.environ,
+        XDG_CACHE_HOME=str(context.work_dir / "cold_start_cache"),
+        PYTHONPATH=os.pathsep.join(
+            [str(Path(__file__).resolve().parent.parent)] + sys.path[1:]
+        ),
+    )
+
+    def invoke(*args: str) -> None:
+        subprocess.run(
+            [sys.executable, str(script_path), *args],
+            env=environment,
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+
+    for mode in ("eager_uncached", "eager", "deferred"):
+        # fills the docs cache, so that the timed invocations start with a warm cache
+        invoke(mode, "--help")
+        for action, args in (("run", ("--config", str(config_path))), ("help", ("--help",))):
+            yield BenchmarkCase(
+                name=f"cli_cold_start/{mode}/{action}",
+                func=partial(invoke, mode, *args),
+                params={"mode": mode, "action": action, "fields": COLD_START_FIELDS},
+            )
+
+
+@benchmark_suite("trusted_settings")
+def trusted_settings_cases(context: BenchmarkContext) -> Iterator[BenchmarkCase]:
+    """Loading a config into the settings model with full `parse_obj` validation and through
+    `parse_trusted` with a trusted digest, without and with sampled validation of 1% of the models.
+    """
+    from pycmdlineapp_groundwork.config.trusted_settings import TrustStore, parse_trusted
+
+    for size in context.sizes:
+        if size > 10 * 1024 * 1024:
+            continue
+        data = {"debug": True, "sections": generate_config(size, ConfigDataTypes.json)}
+        trust_store = TrustStore(context.work_dir / f"trusted_{size}.json")
+        parse_trusted(_BenchSettings, data, trust_store)
+        params = {"size": size}
+        yield BenchmarkCase(
+            name=f"trusted_settings/parse_obj/{size_label(size)}",
+            func=partial(_BenchSettings.parse_obj, data),
+            params=params,
+        )
+        for sample_rate in (0.0, 0.01):
+            yield BenchmarkCase(
+                name=f"trusted_settings/trusted_sample_{sample_rate:g}/{size_label(size)}",
+                func=partial(parse_trusted, _BenchSettings, data, trust_store, sample_rate=sample_rate),
+                params=dict(params, sample_rate=sample_rate),
+                teardown=partial(_unlink, trust_store.file_path),
+            )
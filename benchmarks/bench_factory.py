@@ -0,0 +1,396 @@
+"""Benchmarks of the factory package: per-build overhead of `GenericBuilder` and
+`Factory` compared with constructing the artifacts directly.
+"""
+
+import threading
+from functools import partial
+from typing import Iterator
+
+from pycmdlineapp_groundwork.factory import (
+    CachingBuilder,
+    Factory,
+    GenericBuildArtifact,
+    GenericBuilder,
+    IntDescriptor,
+    PooledBuilder,
+    ProcessPoolFactory,
+    SlottedBuildArtifact,
+    auto,
+    descriptor_from_dict,
+)
+from pycmdlineapp_groundwork.factory.descriptor_generation import _create_descriptor, _member_pairs
+
+from pycmdlineapp_groundwork.factory.plugin_discovery import (
+    PluginIndex,
+    _scan_entry_points,
+)
+
+from .harness import BenchmarkCase, BenchmarkContext, benchmark_suite
+
+
+class BenchArtifact(GenericBuildArtifact):
+    def __init__(self, context, value=0):
+        self.context = context
+        self.value = value
+
+
+class SlottedBenchArtifact(SlottedBuildArtifact):
+    context: str
+    value: int
+
+    def __init__(self, context, value=0):
+        self.context = context
+        self.value = value
+
+
+class RecyclableBenchArtifact(BenchArtifact):
+    def recycle_build_artifact(self, context, value=0):
+        self.context = context
+        self.value = value
+
+
+class BufferArtifact(GenericBuildArtifact):
+    """Artifact with a costly constructor whose recycle hook re-uses the allocated buffer."""
+
+    BUFFER_SIZE = 64 * 1024
+
+    def __init__(self, context, value=0):
+        self.context = context
+        self.buffer = bytearray(self.BUFFER_SIZE)
+        self.buffer[0] = value
+
+    def recycle_build_artifact(self, context, value=0):
+        self.context = context
+        self.buffer[0] = value
+
+
+class CpuHeavyArtifact(GenericBuildArtifact):
+    """Artifact whose constructor does CPU-bound setup work."""
+
+    def __init__(self, context, value=0, work=20_000):
+        self.context = context
+        self.value = value
+        self.checksum = sum(index * index % 7 for index in range(work))
+
+
+class BenchArtifactTypes(IntDescriptor):
+    plain = auto()
+    other = auto()
+
+
+class UncompiledBuilder(GenericBuilder):
+    """Baseline of the builder cases: the build path before constructor calls were precompiled, looking up the
+    registry and passing the fixed arguments on every call, counting with a plain int."""
+
+    def __call__(self, type_descriptor_key=None, *args, **kwargs):
+        self.uncompiled_count = getattr(self, "uncompiled_count", 0) + 1
+        if type_descriptor_key is None:
+            type_descriptor_key = next(iter(self._registry))
+        if type_descriptor_key not in self._registry:
+            raise ValueError(f"type_descriptor_key {type_descriptor_key} not yet registered")
+        return self._registry[type_descriptor_key](*self._fixed_args, *args, **self._fixed_kwargs, **kwargs)
+
+
+def _factory(builder: GenericBuilder) -> Factory:
+    factory = Factory()
+    factory.register_builder(builder)
+    return factory
+
+
+@benchmark_suite("build_overhead")
+def build_overhead_cases(context: BenchmarkContext) -> Iterator[BenchmarkCase]:
+    """Cost of a single build through `GenericBuilder` and `Factory` vs. direct construction and vs. the
+    uncompiled build path `GenericBuilder` had before precompiling the constructor call."""
+    key = BenchArtifactTypes.plain
+    yield BenchmarkCase(
+        name="build_overhead/direct/per_build_args",
+        func=partial(BenchArtifact, "ctx", value=42),
+    )
+    yield BenchmarkCase(
+        name="build_overhead/uncompiled_builder/per_build_args",
+        func=partial(UncompiledBuilder(key, BenchArtifact), key, "ctx", value=42),
+    )
+    builder = GenericBuilder(key, BenchArtifact)
+    yield BenchmarkCase(
+        name="build_overhead/builder/per_build_args",
+        func=partial(builder, key, "ctx", value=42),
+    )
+    yield BenchmarkCase(
+        name="build_overhead/factory/per_build_args",
+        func=partial(_factory(builder), key, "ctx", value=42),
+    )
+
+    yield BenchmarkCase(
+        name="build_overhead/uncompiled_builder/fixed_args",
+        func=partial(UncompiledBuilder(key, BenchArtifact, "ctx"), key, value=42),
+    )
+    fixed_builder = GenericBuilder(key, BenchArtifact, "ctx")
+    yield BenchmarkCase(
+        name="build_overhead/builder/fixed_args",
+        func=partial(fixed_builder, key, value=42),
+    )
+    yield BenchmarkCase(
+        name="build_overhead/factory/fixed_args",
+        func=partial(_factory(fixed_builder), key, value=42),
+    )
+    yield BenchmarkCase(
+        name="build_overhead/builder/default_key",
+        func=partial(fixed_builder, value=42),
+    )
+
+    instrumented_builder = GenericBuilder(key, BenchArtifact, "ctx")
+    instrumented_builder.enable_instrumentation()
+    yield BenchmarkCase(
+        name="build_overhead/builder/instrumented",
+        func=partial(instrumented_builder, key, value=42),
+    )
+
+
+#: :obj:`int` : number of artifacts built per batch in the `batch_build` suite
+BATCH_SIZE: int = 1000
+
+
+@benchmark_suite("batch_build")
+def batch_build_cases(context: BenchmarkContext) -> Iterator[BenchmarkCase]:
+    """Cost of building a batch of artifacts in a loop vs. through the bulk build API."""
+    key = BenchArtifactTypes.plain
+    values = list(range(BATCH_SIZE))
+    kwargs_list = [{"value": value} for value in values]
+    builder = GenericBuilder(key, BenchArtifact, "ctx")
+    factory = _factory(builder)
+
+    def loop():
+        return [factory(key, value=value) for value in values]
+
+    yield BenchmarkCase(name=f"batch_build/factory/loop/{BATCH_SIZE}", func=loop)
+    yield BenchmarkCase(
+        name=f"batch_build/factory/build_many/{BATCH_SIZE}",
+        func=partial(factory.build_many, key, kwargs_list),
+    )
+    yield BenchmarkCase(
+        name=f"batch_build/factory/build_columns/{BATCH_SIZE}",
+        func=partial(factory.build_columns, key, value=values),
+    )
+    plain_builder = GenericBuilder(key, BenchArtifact)
+    contexts = ["ctx"] * BATCH_SIZE
+    yield BenchmarkCase(
+        name=f"batch_build/builder/build_columns_positional/{BATCH_SIZE}",
+        func=partial(plain_builder.build_columns, key, contexts, values),
+    )
+
+
+@benchmark_suite("pooled_build")
+def pooled_build_cases(context: BenchmarkContext) -> Iterator[BenchmarkCase]:
+    """Build-and-discard cycle with and without recycling through `PooledBuilder`."""
+    key = BenchArtifactTypes.plain
+    builder = GenericBuilder(key, BenchArtifact, "ctx")
+
+    def allocate():
+        builder(key, value=42)
+
+    pooled_builder = PooledBuilder(key, RecyclableBenchArtifact, "ctx")
+
+    def recycle():
+        pooled_builder.release(pooled_builder(key, value=42), key)
+
+    yield BenchmarkCase(name="pooled_build/builder/allocate", func=allocate)
+    yield BenchmarkCase(name="pooled_build/pooled_builder/recycle", func=recycle)
+
+    buffer_builder = GenericBuilder(key, BufferArtifact, "ctx")
+    pooled_buffer_builder = PooledBuilder(key, BufferArtifact, "ctx")
+
+    def allocate_buffer():
+        buffer_builder(key, value=42)
+
+    def recycle_buffer():
+        pooled_buffer_builder.release(pooled_buffer_builder(key, value=42), key)
+
+    yield BenchmarkCase(name="pooled_build/builder/allocate_buffer", func=allocate_buffer)
+    yield BenchmarkCase(
+        name="pooled_build/pooled_builder/recycle_buffer", func=recycle_buffer
+    )
+
+
+@benchmark_suite("caching_build")
+def caching_build_cases(context: BenchmarkContext) -> Iterator[BenchmarkCase]:
+    """Repeated builds with equal arguments, constructing each time or served from a `CachingBuilder`."""
+    key = BenchArtifactTypes.plain
+    builder = GenericBuilder(key, BufferArtifact, "ctx")
+    caching_builder = CachingBuilder(key, BufferArtifact)
+
+    yield BenchmarkCase(name="caching_build/builder/construct", func=partial(builder, key, value=42))
+    yield BenchmarkCase(
+        name="caching_build/caching_builder/hit",
+        func=partial(caching_builder, key, "ctx", value=42),
+    )
+    # unhashable arguments are built without caching, measuring the cost of the failed lookup
+    yield BenchmarkCase(
+        name="caching_build/caching_builder/unhashable",
+        func=partial(caching_builder, key, ["ctx"], value=42),
+    )
+
+
+#: :obj:`int` : number of artifacts kept alive per case in the `artifact_memory` suite
+ARTIFACT_COUNT: int = 1_000_000
+
+
+@benchmark_suite("artifact_memory")
+def artifact_memory_cases(context: BenchmarkContext) -> Iterator[BenchmarkCase]:
+    """Time and retained memory of building 1M artifacts with and without `__slots__`."""
+    key = BenchArtifactTypes.plain
+    values = range(ARTIFACT_COUNT)
+    for variant, artifact_type in (
+        ("dict", BenchArtifact),
+        ("slots", SlottedBenchArtifact),
+    ):
+        builder = GenericBuilder(key, artifact_type, "ctx")
+        yield BenchmarkCase(
+            name=f"artifact_memory/{variant}/{ARTIFACT_COUNT}",
+            func=partial(builder.build_columns, key, value=values),
+            params={"count": ARTIFACT_COUNT},
+            measure_memory=True,
+        )
+
+
+#: :obj:`int` : builds per thread in the `concurrent_build` suite
+BUILDS_PER_THREAD: int = 10_000
+
+
+def _build_in_threads(factory: Factory, thread_count: int, register_keys=()) -> None:
+    """Build from thread_count threads at once while another thread registers register_keys."""
+    key = BenchArtifactTypes.plain
+    start = threading.Barrier(thread_count + 1)
+
+    def build():
+        start.wait()
+        for value in range(BUILDS_PER_THREAD):
+            factory(key, value=value)
+
+    def register():
+        start.wait()
+        for other_key in register_keys:
+            factory.register_builder(GenericBuilder, other_key, BenchArtifact)
+
+    threads = [threading.Thread(target=build) for _ in range(thread_count)]
+    threads.append(threading.Thread(target=register))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+@benchmark_suite("concurrent_build")
+def concurrent_build_cases(context: BenchmarkContext) -> Iterator[BenchmarkCase]:
+    """Stress test: builds through one `Factory` from many threads, with concurrent registration."""
+    for thread_count in (1, 4, 16):
+        yield BenchmarkCase(
+            name=f"concurrent_build/factory/{thread_count}_threads",
+            func=lambda thread_count=thread_count: _build_in_threads(
+                _factory(GenericBuilder(BenchArtifactTypes.plain, BenchArtifact, "ctx")),
+                thread_count,
+            ),
+            params={"threads": thread_count, "builds_per_thread": BUILDS_PER_THREAD},
+        )
+        yield BenchmarkCase(
+            name=f"concurrent_build/factory_registering/{thread_count}_threads",
+            func=lambda thread_count=thread_count: _build_in_threads(
+                _factory(GenericBuilder(BenchArtifactTypes.plain, BenchArtifact, "ctx")),
+                thread_count,
+                register_keys=[BenchArtifactTypes.other],
+            ),
+            params={"threads": thread_count, "builds_per_thread": BUILDS_PER_THREAD},
+        )
+
+
+#: :obj:`int` : number of CPU-heavy artifacts built per case in the `process_pool_build` suite
+HEAVY_BATCH_SIZE: int = 64
+
+
+@benchmark_suite("process_pool_build")
+def process_pool_build_cases(context: BenchmarkContext) -> Iterator[BenchmarkCase]:
+    """Batch of artifacts with CPU-heavy constructors, built in-process vs. in a process pool."""
+    key = BenchArtifactTypes.plain
+    kwargs_list = [{"value": value} for value in range(HEAVY_BATCH_SIZE)]
+    factory = _factory(GenericBuilder(key, CpuHeavyArtifact, "ctx"))
+    yield BenchmarkCase(
+        name=f"process_pool_build/factory/{HEAVY_BATCH_SIZE}",
+        func=partial(factory.build_many, key, kwargs_list),
+    )
+    for chunk_size in (1, 8):
+        pool_factory = ProcessPoolFactory(chunk_size=chunk_size)
+        pool_factory.register_builder(GenericBuilder(key, CpuHeavyArtifact, "ctx"))
+        # start the workers before timing
+        pool_factory.submit(key).result()
+        yield BenchmarkCase(
+            name=f"process_pool_build/process_pool_factory/chunk_{chunk_size}/{HEAVY_BATCH_SIZE}",
+            func=partial(pool_factory.build_many, key, kwargs_list),
+            params={"chunk_size": chunk_size},
+            teardown=pool_factory.shutdown,
+        )
+
+
+@benchmark_suite("plugin_discovery")
+def plugin_discovery_cases(context: BenchmarkContext) -> Iterator[BenchmarkCase]:
+    """Entry point lookup of the installed distributions: full scan vs. cached plugin index."""
+    yield BenchmarkCase(name="plugin_discovery/scan", func=_scan_entry_points)
+    index_path = context.work_dir / "plugin_index.json"
+    PluginIndex(index_path).entry_points("console_scripts")
+    yield BenchmarkCase(
+        name="plugin_discovery/cached_index",
+        func=lambda: PluginIndex(index_path).entry_points("console_scripts"),
+        teardown=index_path.unlink,
+    )
+
+
+#: :obj:`Tuple[int, ...]` : numbers of members of the descriptors generated in the `descriptor_generation` suite
+DESCRIPTOR_SIZES = (1_000, 10_000)
+
+
+@benchmark_suite("descriptor_generation")
+def descriptor_generation_cases(context: BenchmarkContext) -> Iterator[BenchmarkCase]:
+    """Creating large descriptor enums: the enum functional API, generating a new class and a cached class."""
+    for size in DESCRIPTOR_SIZES:
+        names = [f"type{index}" for index in range(size)]
+        pairs = _member_pairs(names, IntDescriptor)
+        params = {"members": size}
+        yield BenchmarkCase(
+            name=f"descriptor_generation/functional_api/{size}",
+            func=partial(IntDescriptor, "Generated", list(pairs)),
+            params=params,
+        )
+        yield BenchmarkCase(
+            name=f"descriptor_generation/generate/{size}",
+            func=partial(_create_descriptor, "Generated", pairs, IntDescriptor, None),
+            params=params,
+        )
+        yield BenchmarkCase(
+            name=f"descriptor_generation/cached/{size}",
+            func=partial(descriptor_from_dict, "Generated", names, IntDescriptor),
+            params=params,
+        )
+
+
+@benchmark_suite("value_dispatch")
+def value_dispatch_cases(context: BenchmarkContext) -> Iterator[BenchmarkCase]:
+    """Builds requested by raw descriptor values: converting to the enum first vs. the factory's dispatch table."""
+    factory = Factory()
+    factory.register_builder(GenericBuilder(BenchArtifactTypes.plain, BenchArtifact, "ctx"))
+    factory.register_builder(GenericBuilder(BenchArtifactTypes.other, SlottedBenchArtifact, "ctx"))
+    value = BenchArtifactTypes.other.value
+    yield BenchmarkCase(
+        name="value_dispatch/enum_conversion",
+        func=lambda: factory(BenchArtifactTypes(value), value=42),
+    )
+    yield BenchmarkCase(
+        name="value_dispatch/build_from_value", func=partial(factory.build_from_value, value, value=42)
+    )
+
+    requests = [(index % 2 + 1, {"value": index}) for index in range(BATCH_SIZE)]
+    yield BenchmarkCase(
+        name=f"value_dispatch/enum_conversion/{BATCH_SIZE}",
+        func=lambda: [factory(BenchArtifactTypes(value), **kwargs) for value, kwargs in requests],
+    )
+    yield BenchmarkCase(
+        name=f"value_dispatch/build_many_from_values/{BATCH_SIZE}",
+        func=partial(factory.build_many_from_values, requests),
+    )
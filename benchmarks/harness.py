@@ -0,0 +1,297 @@
+"""Minimal benchmark harness: suite registration, timing, JSON result files and
+comparison of results against a stored baseline.
+"""
+
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from pycmdlineapp_groundwork import __version__
+
+#: :obj:`str` :
+#: Version of the JSON result file layout written by `write_results`
+RESULTS_FORMAT_VERSION: str = "1"
+
+#: :obj:`float` :
+#: Default relative slow-down of the median that is reported as a regression
+DEFAULT_REGRESSION_THRESHOLD: float = 0.10
+
+#: :obj:`float` :
+#: Minimum wall time in seconds a single timing round should take
+MIN_ROUND_TIME: float = 0.05
+
+SIZE_LABELS = {
+    1024: "1KB",
+    10 * 1024: "10KB",
+    100 * 1024: "100KB",
+    1024 * 1024: "1MB",
+    10 * 1024 * 1024: "10MB",
+    100 * 1024 * 1024: "100MB",
+}
+
+
+def size_label(size: int) -> str:
+    """Return a human readable label for a byte size, eg. `1MB` for 1048576.
+    Example:
+    ```python
+    >>> size_label(10 * 1024)
+    '10KB'
+    >>> size_label(1500)
+    '1500B'
+
+    ```
+    """
+    return SIZE_LABELS.get(size, f"{size}B")
+
+
+def parse_size(size: str) -> int:
+    """Parse a size given as `<number>[B|KB|MB|GB]` into bytes.
+    Example:
+    ```python
+    >>> parse_size("100MB")
+    104857600
+    >>> parse_size("512")
+    512
+
+    ```
+    """
+    units = {"GB": 1024 ** 3, "MB": 1024 ** 2, "KB": 1024, "B": 1}
+    size = size.strip().upper()
+    for unit, factor in units.items():
+        if size.endswith(unit):
+            return int(float(size[: -len(unit)]) * factor)
+    return int(size)
+
+
+class BenchmarkCase:
+    """A single timed callable together with the parameters describing it.
+    Args:
+        name: unique name of the case, by convention `<suite>/<variant>/<size>`
+        func: callable without arguments that is timed
+        params: free-form parameters stored along with the timings in the result file
+        teardown: optional callable run once after the case has been timed, eg. to delete large input files
+        measure_memory: additionally measure, once, the memory allocated by `func` and still referenced by its
+            return value, see `measure_case_memory`
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[], Any],
+        params: Optional[Dict[str, Any]] = None,
+        teardown: Optional[Callable[[], None]] = None,
+        measure_memory: bool = False,
+    ):
+        self.name = name
+        self.func = func
+        self.params = params if params is not None else {}
+        self.teardown = teardown
+        self.measure_memory = measure_memory
+
+
+class BenchmarkContext:
+    """Options handed to every benchmark suite when it generates its cases.
+    Args:
+        work_dir: directory in which suites may create their synthetic input files
+        sizes: input sizes in bytes the size-dependent suites shall cover
+        repeat: number of timing rounds per case
+    """
+
+    def __init__(self, work_dir: Path, sizes: Iterable[int], repeat: int = 5):
+        self.work_dir = work_dir
+        self.sizes = list(sizes)
+        self.repeat = repeat
+
+
+SuiteFunction = Callable[[BenchmarkContext], Iterator[BenchmarkCase]]
+
+_suites: Dict[str, SuiteFunction] = {}
+
+
+def benchmark_suite(name: str) -> Callable[[SuiteFunction], SuiteFunction]:
+    """Register a generator function yielding `BenchmarkCase` objects as benchmark suite.
+    Cases are generated lazily, so a suite can create (and tear down) large inputs just
+    before they are timed.
+    Args:
+        name: name of the suite, used for filtering on the command line
+    Raises:
+        ValueError: if a suite with the same name is already registered
+    """
+
+    def decorator(func: SuiteFunction) -> SuiteFunction:
+        if name in _suites:
+            raise ValueError(f"Benchmark suite {name} already registered.")
+        _suites[name] = func
+        return func
+
+    return decorator
+
+
+def registered_suites() -> Dict[str, SuiteFunction]:
+    """Return a copy of all registered suites, keyed by suite name."""
+    return dict(_suites)
+
+
+def time_case(case: BenchmarkCase, repeat: int = 5) -> Dict[str, Any]:
+    """Time a benchmark case. The number of calls per round is calibrated so that a
+    round takes at least `MIN_ROUND_TIME` seconds; the reported figures are seconds
+    per single call.
+    Args:
+        case: the case to be timed
+        repeat: number of timing rounds
+    Returns:
+        dictionary with `min`, `median`, `mean`, `stdev`, `rounds`, `iterations` and the case's `params`
+    """
+    iterations = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            case.func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_ROUND_TIME:
+            break
+        iterations *= 2 if elapsed == 0 else max(2, int(MIN_ROUND_TIME / elapsed) + 1)
+
+    timings: List[float] = [elapsed / iterations]
+    for _ in range(max(repeat, 1) - 1):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            case.func()
+        timings.append((time.perf_counter() - start) / iterations)
+
+    return {
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.mean(timings),
+        "stdev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        "rounds": len(timings),
+        "iterations": iterations,
+        "params": case.params,
+    }
+
+
+def measure_case_memory(case: BenchmarkCase) -> Dict[str, int]:
+    """Call the case once under `tracemalloc` and measure the memory it allocated.
+    Returns:
+        dictionary with `memory_retained`, the bytes still allocated while the return value of
+        `func` is alive, and `memory_peak`, the peak allocation during the call
+    """
+    already_tracing = tracemalloc.is_tracing()
+    if not already_tracing:
+        tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        if hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        result = case.func()
+        retained, peak = tracemalloc.get_traced_memory()
+        del result
+    finally:
+        if not already_tracing:
+            tracemalloc.stop()
+    return {"memory_retained": retained - before, "memory_peak": peak - before}
+
+
+def run_suites(
+    context: BenchmarkContext,
+    suite_names: Optional[Iterable[str]] = None,
+    name_filter: Optional[str] = None,
+    progress: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """Run registered benchmark suites and collect their results.
+    Args:
+        context: options handed to the suites
+        suite_names: names of the suites to run, all registered suites if `None`
+        name_filter: only cases whose name contains this substring are timed
+        progress: optional callback receiving each case name and its result right after timing
+    Returns:
+        result document as written by `write_results`
+    """
+    benchmarks: Dict[str, Any] = {}
+    for suite_name, suite in _suites.items():
+        if suite_names is not None and suite_name not in suite_names:
+            continue
+        for case in suite(context):
+            try:
+                if name_filter is not None and name_filter not in case.name:
+                    continue
+                result = time_case(case, repeat=context.repeat)
+                if case.measure_memory:
+                    result.update(measure_case_memory(case))
+                result["suite"] = suite_name
+                benchmarks[case.name] = result
+                if progress is not None:
+                    progress(case.name, result)
+            finally:
+                if case.teardown is not None:
+                    case.teardown()
+
+    return {
+        "format_version": RESULTS_FORMAT_VERSION,
+        "meta": {
+            "package_version": __version__,
+            "python": sys.version.split()[0],
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        },
+        "benchmarks": benchmarks,
+    }
+
+
+def write_results(results: Dict[str, Any], file_path: Path) -> None:
+    """Write a result document as JSON to `file_path`."""
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    file_path.write_text(json.dumps(results, indent=2, sort_keys=True), encoding="utf-8")
+
+
+def load_results(file_path: Path) -> Dict[str, Any]:
+    """Load a result document previously written by `write_results`."""
+    return json.loads(file_path.read_text(encoding="utf-8"))
+
+
+def compare_results(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    threshold: float = DEFAULT_REGRESSION_THRESHOLD,
+) -> List[Dict[str, Any]]:
+    """Compare the medians of two result documents case by case.
+    Cases only present in one of the documents are skipped.
+    Args:
+        current: result document of the current run
+        baseline: stored result document to compare against
+        threshold: relative slow-down of the median above which a case is flagged as regression
+    Returns:
+        one entry per common case with `name`, `baseline`, `current`, `ratio` and `regression` flag
+    Example:
+    ```python
+    >>> baseline = {"benchmarks": {"a": {"median": 1.0}, "b": {"median": 1.0}}}
+    >>> current = {"benchmarks": {"a": {"median": 1.5}, "b": {"median": 1.05}}}
+    >>> [(c["name"], c["regression"]) for c in compare_results(current, baseline)]
+    [('a', True), ('b', False)]
+
+    ```
+    """
+    comparison = []
+    baseline_benchmarks = baseline.get("benchmarks", {})
+    for name, result in sorted(current.get("benchmarks", {}).items()):
+        if name not in baseline_benchmarks:
+            continue
+        baseline_median = baseline_benchmarks[name]["median"]
+        ratio = result["median"] / baseline_median if baseline_median > 0 else 1.0
+        comparison.append(
+            {
+                "name": name,
+                "baseline": baseline_median,
+                "current": result["median"],
+                "ratio": ratio,
+                "regression": ratio > 1.0 + threshold,
+            }
+        )
+    return comparison
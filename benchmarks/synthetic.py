@@ -0,0 +1,100 @@
+"""Generators for synthetic configuration data used as benchmark input."""
+
+import json
+import random
+from pathlib import Path
+from typing import Any, Dict
+
+import toml
+import yaml
+
+from pycmdlineapp_groundwork.config.config_data_types import ConfigDataTypes
+
+_WORDS = (
+    "alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel",
+    "india", "juliett", "kilo", "lima", "mike", "november", "oscar", "papa",
+)
+
+
+def _section(rnd: random.Random, index: int) -> Dict[str, Any]:
+    """Return one config section with a realistic mix of scalar, list and nested values."""
+    return {
+        "name": f"{rnd.choice(_WORDS)}-{index}",
+        "enabled": rnd.random() < 0.5,
+        "port": rnd.randint(1024, 65535),
+        "ratio": round(rnd.random(), 6),
+        "mode": rnd.choice(("fast", "safe", "debug")),
+        "tags": [rnd.choice(_WORDS) for _ in range(4)],
+        "limits": [rnd.randint(0, 1000) for _ in range(6)],
+        "nested": {"level": index % 8, "path": f"/srv/{rnd.choice(_WORDS)}/{index}"},
+    }
+
+
+def dumps_config(data: Dict[str, Any], data_type: ConfigDataTypes) -> str:
+    """Serialize a dictionary into the text format given by `data_type`."""
+    if data_type == ConfigDataTypes.json:
+        return json.dumps(data, indent=2)
+    if data_type == ConfigDataTypes.toml:
+        return toml.dumps(data)
+    if data_type == ConfigDataTypes.yaml:
+        return yaml.safe_dump(data, sort_keys=False)
+    raise ValueError(f"Cannot serialize synthetic config as {data_type}.")
+
+
+def generate_config(
+    target_size: int, data_type: ConfigDataTypes = ConfigDataTypes.json, seed: int = 42
+) -> Dict[str, Any]:
+    """Generate a deterministic config dictionary whose serialization in `data_type`
+    is roughly `target_size` bytes long.
+    Example:
+    ```python
+    >>> config = generate_config(4096)
+    >>> 2048 < len(dumps_config(config, ConfigDataTypes.json)) < 8192
+    True
+
+    ```
+    """
+    rnd = random.Random(seed)
+    probe = {"section_000000": _section(random.Random(seed), 0)}
+    section_size = max(len(dumps_config(probe, data_type)), 1)
+    count = max(1, target_size // section_size)
+    return {f"section_{index:06d}": _section(rnd, index) for index in range(count)}
+
+
+def write_config(
+    file_path: Path,
+    target_size: int,
+    data_type: ConfigDataTypes = ConfigDataTypes.json,
+    seed: int = 42,
+) -> Path:
+    """Write a synthetic config of roughly `target_size` bytes to `file_path`."""
+    file_path.write_text(
+        dumps_config(generate_config(target_size, data_type, seed), data_type),
+        encoding="utf-8",
+    )
+    return file_path
+
+
+def generate_wide_dict(
+    width: int, prefix: str = "key", with_lists: bool = True
+) -> Dict[str, Any]:
+    """Generate a flat dictionary with `width` entries. Every fourth entry is a list,
+    if `with_lists` is set, all other entries are scalars.
+    """
+    return {
+        f"{prefix}_{index}": [index, index + 1]
+        if with_lists and index % 4 == 0
+        else index
+        for index in range(width)
+    }
+
+
+def generate_deep_dict(depth: int, fan_out: int = 3, leaves: int = 4) -> Dict[str, Any]:
+    """Generate a tree of nested dictionaries `depth` levels deep, every inner node
+    having `fan_out` children and `leaves` scalar entries.
+    """
+    node: Dict[str, Any] = {f"leaf_{index}": index for index in range(leaves)}
+    if depth > 0:
+        for index in range(fan_out):
+            node[f"child_{index}"] = generate_deep_dict(depth - 1, fan_out, leaves)
+    return node
@@ -2,12 +2,16 @@
 
 __version__= "0.1.0"
 
-from .config.click_config_option import click_config_option
+from .config.click_config_option import click_config_option, DeferredHelpCommand, DeferredHelpGroup, settings_field_option
 from .config.settings_doc import with_attrs_docs
 from .config.config_data_types import ConfigDataTypes
 from .config.config_file_loaders import get_settings_config_load_function
 
-from .factory import GenericBuildArtifact, TGenericBuildArtifact, GenericBuilder, TGenericBuilder 
+from .factory import GenericBuildArtifact, SlottedBuildArtifact, TGenericBuildArtifact, GenericBuilder, TGenericBuilder 
 from .factory import IntDescriptor, StrDescriptor, AutoStrDescriptor, auto
-from .factory import Factory
+from .factory import descriptor_from_dict, descriptor_from_file
+from .factory import Factory, PooledBuilder, CachingBuilder, ProcessPoolFactory
+from .factory import AsyncBuilder, TAsyncBuilder, AsyncFactory
+from .factory import LazyReference, PluginIndex, discover_plugins
+from .factory import BuildInstrumentation
 
@@ -1,29 +1,153 @@
+import os
+import sys
 import click
-from pydantic import BaseSettings, ValidationError
-from typing import Sequence, TypeVar, Dict, cast
+from pydantic import BaseModel, BaseSettings, ValidationError
+from typing import Any, Dict, Iterator, Mapping, Optional, Sequence, Type, TypeVar, cast
 from pathlib import Path
 from functools import partial
 
 
 from ..utility.dict_deep_update import dict_deep_update
+from ..utility.memory_profile import memory_profiler
 from .config_file_loaders import DictLoadError, load_dict_from_file
 from .config_data_types import ConfigDataTypes
+from .settings_doc import apply_pending_attributes_docs
+from .settings_artifact import model_key
+from .source_locations import SourceLocationIndex, format_error_locations, load_dict_with_locations
+from .trusted_settings import TrustStore, parse_trusted
 
 SettingsClassType = TypeVar("SettingsClassType", bound=BaseSettings)
 
 
+class SettingsDefaultMap(Mapping):
+    """Default map of a click context backed by a settings object. Unlike `settings_obj.dict()`, which converts
+    the whole settings model, a value is converted only when click looks up the default of an option or
+    subcommand of this name.
+    Args:
+        settings_obj: an object instantiated from a pydantic settings class
+    """
+
+    def __init__(self, settings_obj: BaseSettings):
+        self._settings_obj = settings_obj
+        self._values: Dict[str, Any] = {}
+
+    def __getitem__(self, name: str) -> Any:
+        try:
+            return self._values[name]
+        except KeyError:
+            pass
+        if name not in self._settings_obj.__fields__:
+            raise KeyError(name)
+        value = self._values[name] = self._settings_obj.dict(include={name})[name]
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._settings_obj.__fields__)
+
+    def __len__(self) -> int:
+        return len(self._settings_obj.__fields__)
+
+
+def _completion_requested(prog_name: Optional[str], complete_var: Optional[str]) -> bool:
+    """Whether command.main() is going to answer a shell completion request, same test as click does."""
+    if complete_var is None:
+        if prog_name is None:
+            prog_name = os.path.basename(sys.argv[0] if sys.argv else __file__)
+        complete_var = "_{}_COMPLETE".format(prog_name.replace("-", "_").upper())
+    return bool(os.environ.get(complete_var))
+
+
+class DeferredHelpMixin:
+    """Applies the docs of settings models decorated with `with_attrs_docs(lazy=True)` just before help text or
+    shell completions are generated, so that normal invocations of the command never extract them."""
+
+    def main(self, args=None, prog_name=None, complete_var=None, standalone_mode=True, **extra):
+        if _completion_requested(prog_name, complete_var):
+            apply_pending_attributes_docs()
+        return super().main(  # type: ignore
+            args=args, prog_name=prog_name, complete_var=complete_var, standalone_mode=standalone_mode, **extra
+        )
+
+    def format_help(self, ctx: click.Context, formatter: click.HelpFormatter) -> None:
+        apply_pending_attributes_docs()
+        super().format_help(ctx, formatter)  # type: ignore
+
+
+class DeferredHelpCommand(DeferredHelpMixin, click.Command):
+    """click command deferring the docs of settings models to help and completion, see `DeferredHelpMixin`.
+    Use as `@click.command(cls=DeferredHelpCommand)`."""
+
+
+class DeferredHelpGroup(DeferredHelpMixin, click.Group):
+    """click group deferring the docs of settings models to help and completion, see `DeferredHelpMixin`.
+    Subcommands and subgroups created with its `command()` and `group()` decorators defer them as well."""
+
+    def command(self, *args, **kwargs):
+        kwargs.setdefault("cls", DeferredHelpCommand)
+        return super().command(*args, **kwargs)
+
+    def group(self, *args, **kwargs):
+        kwargs.setdefault("cls", DeferredHelpGroup)
+        return super().group(*args, **kwargs)
+
+
+class SettingsFieldOption(click.Option):
+    """click option whose help text defaults to the description of a settings field. The description is only
+    looked up when the help text is generated, so it may be applied lazily, see `with_attrs_docs(lazy=True)`.
+    Args:
+        settings_class_type: a class derived from pydantic settings class
+        field_name: name of the field, defaults to the name of the option
+    """
+
+    def __init__(self, *args, settings_class_type: Type[BaseSettings], field_name: Optional[str] = None, **kwargs):
+        self.settings_class_type = settings_class_type
+        self.field_name = field_name
+        super().__init__(*args, **kwargs)
+
+    @property
+    def help(self) -> Optional[str]:
+        if self._help is not None:
+            return self._help
+        field = self.settings_class_type.__fields__.get(self.field_name or self.name)
+        return field.field_info.description if field is not None else None
+
+    @help.setter
+    def help(self, value: Optional[str]) -> None:
+        self._help = value
+
+
+def settings_field_option(settings_class_type: Type[BaseSettings], *param_decls, field_name: Optional[str] = None, **attrs):
+    """Decorator adding a `SettingsFieldOption` to a click command, ie. an option documented by the description
+    of a settings field.
+    Args:
+        settings_class_type: a class derived from pydantic settings class
+        param_decls: names of the option, as for `click.option`
+        field_name: name of the field, defaults to the name of the option
+        attrs: further arguments of `click.option`
+    Returns:
+        click-option object
+    """
+    attrs.setdefault("cls", SettingsFieldOption)
+    return click.option(*param_decls, settings_class_type=settings_class_type, field_name=field_name, **attrs)
+
+
 
 def _validate(ctx: click.Context, param, value, settings_obj: BaseSettings,
-    settings_class_type: SettingsClassType ):
+    settings_class_type: SettingsClassType, deferred: bool = False, locate_errors: bool = False,
+    trust_store: Optional[TrustStore] = None, trust_sample_rate: float = 0.0):
     if not value:
         return list()
     if not isinstance(value, Sequence):
         value = [value]
     config_map = {}
+    locations: Dict[str, Optional[SourceLocationIndex]] = {}
     for config_file in value:
         config_file = Path(config_file).resolve()
         try:
-            config_map[str(config_file)] = load_dict_from_file(config_file)
+            if locate_errors:
+                config_map[str(config_file)], locations[str(config_file)] = load_dict_with_locations(config_file)
+            else:
+                config_map[str(config_file)] = load_dict_from_file(config_file)
         except DictLoadError as e:
             click.echo(
                 f"{e.message}\nContext:\n{e.document}\nPosition = {e.position},"
@@ -31,13 +155,23 @@ def _validate(ctx: click.Context, param, value, settings_obj: BaseSettings,
             )
             ctx.abort()
 
-    target_config_dict = settings_obj.dict()
+    # deferred: nested settings models are only converted to dicts if a config file merges values into them
+    target_config_dict = dict(settings_obj) if deferred else settings_obj.dict()
     new_settings_obj: BaseSettings = None
+    trust_key = model_key(settings_class_type)
+    merged_locations: Dict[str, Optional[SourceLocationIndex]] = {}
     for config_file, config_dict in config_map.items():
+        trust_key = f"{trust_key}\0{config_file}"
+        merged_locations[config_file] = locations.get(config_file)
         try:
-            dict_deep_update(
-                target_config_dict, cast(Dict[object, object], config_dict)
-            )
+            with memory_profiler.stage("merged_dict", config_file):
+                if deferred:
+                    for key in config_dict:
+                        if isinstance(target_config_dict.get(key), BaseModel):
+                            target_config_dict[key] = target_config_dict[key].dict()
+                dict_deep_update(
+                    target_config_dict, cast(Dict[object, object], config_dict)
+                )
         except RecursionError as e:
             click.echo(
                 f"Error reading {config_file}.\nData structure depth exceeded.\n{e}"
@@ -48,12 +182,24 @@ def _validate(ctx: click.Context, param, value, settings_obj: BaseSettings,
             ctx.abort()
 
         try:
-            new_settings_obj = settings_class_type.parse_obj(target_config_dict)
+            with memory_profiler.stage("pydantic_model", config_file):
+                if trust_store is not None:
+                    new_settings_obj = parse_trusted(
+                        settings_class_type, target_config_dict, trust_store, trust_key, trust_sample_rate
+                    )
+                else:
+                    new_settings_obj = settings_class_type.parse_obj(target_config_dict)
         except ValidationError as e:
             click.echo(f"Validation error for config file {config_file}.\n{e}")
+            error_locations = format_error_locations(e, merged_locations)
+            if error_locations:
+                click.echo("\n".join(error_locations))
             ctx.abort()
 
-    ctx.default_map = new_settings_obj.dict()
+    ctx.default_map = SettingsDefaultMap(new_settings_obj) if deferred else new_settings_obj.dict()
+    if memory_profiler.enabled:
+        click.echo(memory_profiler.report(), err=True)
+        memory_profiler.reset()
     return new_settings_obj
 
 
@@ -64,18 +210,37 @@ def click_config_option(
     click_obj=click,
     option_name: str = "config",
     option_short: str = "",
+    deferred: bool = False,
+    locate_errors: bool = False,
+    trust_store: Optional[TrustStore] = None,
+    trust_sample_rate: float = 0.0,
     **kw,
 ):
     """Decorator that provides an out-of-the box `--config`-option for click-commands. The options allows
     to provide one or more configuration files that are loaded at program invocation and read into a given
     pydantic settings class.
 
+    If the environment variable `PYCMDLINEAPP_MEMORY_PROFILE` is set, peak and retained memory
+    of each loading stage (raw bytes, decoded text, parsed dict, merged dict, pydantic model)
+    are measured and reported on stderr after the config files have been loaded.
+
     Args:
         settings_obj: an object instantiated from a pydantic settings class
         settings_class_type: a class derived from pydantic settings class
         click_obj: the global click-module object managing the application
         option_name: name of the option on the commandline, defaults to `config`, invoked on commandline with `--config=<path-to-config-file>`
         option_short_name: one-letter short-name, defaults to `c`. Eg. if `c` is given, invoked on commandline with `-c <path-to-config-file>`
+        deferred: fill the default map of the context from the loaded settings lazily, see `SettingsDefaultMap`,
+            instead of converting the whole settings model; combined with `DeferredHelpCommand`,
+            `settings_field_option` and `with_attrs_docs(lazy=True)`, documentation of the settings is only
+            extracted when help or completions are requested
+        locate_errors: index the locations of the values while parsing JSON, YAML and TOML config files, so
+            that validation errors are reported with `file:line:col` of the invalid values; parsing JSON
+            takes longer then, as it is not done by the C parser of the standard library
+        trust_store: skip validating configs validated before, see
+            [parse_trusted][pycmdlineapp_groundwork.config.trusted_settings.parse_trusted]; configs are validated
+            in full when they or the settings classes change
+        trust_sample_rate: fraction of the nested models of trusted configs validated anyway
     Returns:
         click-option object
     Example:
@@ -120,7 +285,10 @@ def click_config_option(
 
     option_kwargs = dict(
         help="Config file path for loading settings from file.",
-        callback=partial( _validate, settings_obj=settings_obj, settings_class_type=settings_class_type),
+        callback=partial(
+            _validate, settings_obj=settings_obj, settings_class_type=settings_class_type, deferred=deferred,
+            locate_errors=locate_errors, trust_store=trust_store, trust_sample_rate=trust_sample_rate,
+        ),
         type=click.Path(exists=True, dir_okay=False, resolve_path=True),
         expose_value=True,
         is_eager=True,
@@ -10,12 +10,17 @@ from pathlib import Path
 import yaml
 import toml
 import json
+import logging
 from functools import partial
 from typing import Any, MutableMapping, Dict, Callable, cast, Union, Sequence, AnyStr
 from pydantic import BaseSettings
 from .config_data_types import ConfigDataTypes
 from ..utility.typing import FilePathOrBuffer, Buffer, mmap
 from ..utility.dict_deep_update import dict_deep_update
+from ..utility.memory_profile import memory_profiler
+from ..utility.dict_compaction import compact_dict
+
+logger = logging.getLogger(__name__)
 
 MAX_CONFIG_FILE_SIZE = 1024 * 1024 * 1024
 
@@ -91,6 +96,29 @@ def _determine_config_file_type(file_path: Union[Path, str]) -> ConfigDataTypes:
         return ConfigDataTypes.unknown
 
 
+def _read_config_text(file_path: Path, encoding: str = "utf-8") -> str:
+    """Read a config file's content as text, like `Path.read_text()` does.
+    If memory profiling is enabled, reading the raw bytes and decoding them are recorded
+    as separate stages `raw_bytes` and `decoded_text`.
+    Args:
+        file_path: path to the file to be read
+        encoding: encoding used to decode the file's content
+    Returns:
+        the decoded file content with universal newlines
+    """
+    if not memory_profiler.enabled:
+        return file_path.read_text(encoding=encoding)
+
+    with memory_profiler.stage("raw_bytes", file_path):
+        raw = file_path.read_bytes()
+    with memory_profiler.stage("decoded_text", file_path):
+        text = raw.decode(encoding)
+        del raw
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
 def _load_dict_from_json_stream_or_file(
     file_path: Union[PathLike[str], Buffer[AnyStr]],
     data_type: ConfigDataTypes = ConfigDataTypes.infer,
@@ -111,7 +139,7 @@ def _load_dict_from_json_stream_or_file(
 
     try:
         if isinstance(file_path, Path):
-            return json.loads(file_path.read_text(encoding=encoding))
+            return json.loads(_read_config_text(file_path, encoding))
         else:
             return json.load(file_path)  # type: ignore
     except AttributeError as e:
@@ -157,7 +185,10 @@ def _load_dict_from_toml_stream_or_file(
     """
 
     try:
-        if (hasattr(file_path, "mode") and "b" in file_path.mode) or isinstance(   # type: ignore
+        if isinstance(file_path, Path):
+            # same as toml.load() on a path, which always decodes as utf-8
+            return toml.loads(_read_config_text(file_path, "utf-8"))
+        elif (hasattr(file_path, "mode") and "b" in file_path.mode) or isinstance(   # type: ignore
             file_path, (io.RawIOBase, io.BufferedIOBase, mmap)
         ):  
             return toml.loads(file_path.read().decode(encoding))  # type: ignore
@@ -209,7 +240,7 @@ def _load_dict_from_yaml_stream_or_file(
 
     try:
         if isinstance(file_path, Path):
-            return yaml.safe_load(file_path.read_text(encoding=encoding))
+            return yaml.safe_load(_read_config_text(file_path, encoding))
         else:
             return yaml.safe_load(file_path)  # type: ignore
     except AttributeError as e:
@@ -364,23 +395,26 @@ def load_dict_from_file(
 
     for resolve_data_type in resolve_order:
         if resolve_data_type == ConfigDataTypes.json:
-            result = _load_dict_from_json_stream_or_file(
-                file_path, determined_data_type, encoding=encoding
-            )
+            with memory_profiler.stage("parsed_dict", file_path, "json"):
+                result = _load_dict_from_json_stream_or_file(
+                    file_path, determined_data_type, encoding=encoding
+                )
             if result is not None:
                 return result
 
         elif resolve_data_type == ConfigDataTypes.toml:
-            result = _load_dict_from_toml_stream_or_file(
-                file_path, determined_data_type, encoding=encoding
-            )
+            with memory_profiler.stage("parsed_dict", file_path, "toml"):
+                result = _load_dict_from_toml_stream_or_file(
+                    file_path, determined_data_type, encoding=encoding
+                )
             if result is not None:
                 return result
 
         elif resolve_data_type == ConfigDataTypes.yaml:
-            result = _load_dict_from_yaml_stream_or_file(
-                file_path, determined_data_type, encoding=encoding
-            )
+            with memory_profiler.stage("parsed_dict", file_path, "yaml"):
+                result = _load_dict_from_yaml_stream_or_file(
+                    file_path, determined_data_type, encoding=encoding
+                )
             if result is not None:
                 return result
 
@@ -403,6 +437,7 @@ def _settings_config_load(
     data_type: ConfigDataTypes = ConfigDataTypes.infer,
     encoding: str = "utf-8",
     error_handling: str = "propagate",
+    compact: Union[bool, Dict[str, Any]] = False,
 ) -> Dict[str, Any]:
     """Loads settings from a file, stream or buffer into a dictionary that can be loaded by pydantic into settings classes.
     This function is not intended to be called directly, but to be used in connection [get_settings_config_load_function][pycmdlineapp_groundwork.config.config_file_loaders.get_settings_config_load_function]
@@ -421,8 +456,15 @@ def _settings_config_load(
             `ignore` does nothing and ultimatley returns an empty dictionary, if no data could be loaded and
             `propagate` raises the exceptions and leaves handling to the caller
             Default to `propagate`, if no value or `None` is given.
+        compact: post-process the merged dictionary with [compact_dict][pycmdlineapp_groundwork.utility.dict_compaction.compact_dict]
+            to reduce its memory footprint. `True` interns keys and de-duplicates strings only, which is safe
+            for pydantic settings; a dictionary is passed as keyword arguments to `compact_dict` instead,
+            eg. `{"pack_number_lists": True}` for consumers of the raw dictionary. `freeze` is not allowed,
+            as pydantic copies the dictionaries returned by settings sources.
+            The compaction report is logged at debug level.
     Raises:
-        ValueError: if error_handling is not one of `["abort", "ignore", "propagate"]` or if file_path is None
+        ValueError: if error_handling is not one of `["abort", "ignore", "propagate"]`, if file_path is None
+            or if compact asks to freeze the dictionary
         IOError: if eg. permission to a given file is denied and error_handling is `propagate`
         DictLoadError: if the given data could not be read into a dictionary (eg due to wrong syntax)
     Returns:
@@ -436,6 +478,10 @@ def _settings_config_load(
         raise ValueError(
             f"Invalid error handling type. Expected one of: {allowed_error_handling}"
         )
+    if isinstance(compact, dict) and compact.get("freeze"):
+        raise ValueError(
+            "Settings sources need to return a dict, compact cannot freeze it."
+        )
 
     if file_path is None:
         if error_handling == "abort":
@@ -471,7 +517,8 @@ def _settings_config_load(
                     Dict[str, Any],
                     load_dict_from_file(config_data, data_type, encoding=encoding),
                 )
-                dict_deep_update(result_dict, load_result) # type: ignore
+                with memory_profiler.stage("merged_dict", config_data):
+                    dict_deep_update(result_dict, load_result)  # type: ignore
 
             except DictLoadError as e:
                 if error_handling == "abort":
@@ -492,6 +539,16 @@ def _settings_config_load(
                 elif error_handling == "propagate":
                     raise e
 
+    if compact:
+        compact_options = (
+            compact if isinstance(compact, dict) else {"pack_number_lists": False}
+        )
+        # sizes are measured only for the debug log of the report, it costs traversals of both trees
+        compact_options = dict(
+            {"measure": logger.isEnabledFor(logging.DEBUG)}, **compact_options
+        )
+        result_dict, report = compact_dict(result_dict, **compact_options)
+        logger.debug("%s", report)
     return result_dict
 
 
@@ -500,6 +557,7 @@ def get_settings_config_load_function(
     data_type: ConfigDataTypes = ConfigDataTypes.infer,
     encoding: str = "utf-8",
     error_handling: str = "abort",
+    compact: Union[bool, Dict[str, Any]] = False,
 ) -> Callable[[BaseSettings], Dict[str, Any]]:
     """
     Returns a function that can be used in a Config class in pydantic's
@@ -512,6 +570,7 @@ def get_settings_config_load_function(
             `abort` calls `sys-exit()` on load error,
             `ignore` does nothing and ultimatley returns an empty dictionary, if no data could be loaded and
             `propagate` raises the exceptions and leaves handling to the caller
+        compact: compact the loaded dictionary to reduce memory, see [_settings_config_load][pycmdlineapp_groundwork.config.config_file_loaders._settings_config_load]
     Raises:
         ValueError: if error_handling is not one of `["abort", "ignore", "propagate"]`
     Returns:
@@ -567,4 +626,5 @@ def get_settings_config_load_function(
         data_type=data_type,
         encoding=encoding,
         error_handling=error_handling,
+        compact=compact,
     )
@@ -0,0 +1,227 @@
+"""Precompiled key-path selectors and projections over loaded configuration dictionaries.
+
+Selectors are written in a small dotted/JSONPath-like syntax and compiled once into a
+[JsonLocation][pycmdlineapp_groundwork.config.settings_doc.JsonLocation] tuple of keys and
+indexes. Evaluating a compiled selector is a plain loop of item lookups, cheap enough for
+hot code paths.
+
+Selector syntax | Compiled path
+---- | ----
+`server.port` | `('server', 'port')`
+`$.server.hosts[0]` | `('server', 'hosts', 0)`
+`servers[-1].name` | `('servers', -1, 'name')`
+`paths['with.dot']["and space"]` | `('paths', 'with.dot', 'and space')`
+"""
+
+import re
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Tuple, Union
+
+from .settings_doc import JsonLocation
+
+_SEGMENT = re.compile(
+    r"""
+    \.?(?P<name>[^.\[\]'"]+)          # dotted name
+    | \[(?P<index>-?\d+)\]            # list index
+    | \['(?P<single>[^']*)'\]         # quoted key
+    | \["(?P<double>[^"]*)"\]
+    """,
+    re.VERBOSE,
+)
+
+_MISSING = object()
+
+
+@lru_cache(maxsize=1024)
+def _compile_text(selector: str) -> Tuple[Union[str, int], ...]:
+    text = selector.strip()
+    if text.startswith("$"):
+        text = text[1:]
+    path: List[Union[str, int]] = []
+    position = 0
+    while position < len(text):
+        match = _SEGMENT.match(text, position)
+        # names after the first segment have to be introduced by a dot
+        if match is None or (
+            match.group("name") is not None and position > 0 and text[position] != "."
+        ):
+            raise ValueError(f"Invalid selector {selector!r} at position {position}.")
+        if match.group("name") is not None:
+            path.append(match.group("name"))
+        elif match.group("index") is not None:
+            path.append(int(match.group("index")))
+        elif match.group("single") is not None:
+            path.append(match.group("single"))
+        else:
+            path.append(match.group("double"))
+        position = match.end()
+    return tuple(path)
+
+
+def compile_selector(selector: Union[str, JsonLocation]) -> Tuple[Union[str, int], ...]:
+    """Compile a selector into its path of keys and indexes. Compiled selector texts are
+    cached, already compiled paths (any sequence of keys and indexes) are returned as tuple.
+    Args:
+        selector: selector text or path
+    Returns:
+        the compiled path
+    Raises:
+        ValueError: if the selector text is malformed
+    Example:
+    ```python
+    >>> compile_selector("$.a.b[3]['c.d']")
+    ('a', 'b', 3, 'c.d')
+    >>> compile_selector(["a", 0])
+    ('a', 0)
+
+    ```
+    """
+    if isinstance(selector, str):
+        return _compile_text(selector)
+    return tuple(selector)
+
+
+class Selector:
+    """A compiled selector, callable on a loaded configuration to return the selected value.
+    Args:
+        selector: selector text or path, see `compile_selector`
+    Example:
+    ```python
+    >>> config = {"servers": [{"name": "alpha", "port": 80}, {"name": "bravo", "port": 81}]}
+    >>> last_port = Selector("servers[-1].port")
+    >>> last_port(config)
+    81
+    >>> Selector("servers[5].port").get(config, default=8080)
+    8080
+
+    ```
+    """
+
+    __slots__ = ("path", "text")
+
+    def __init__(self, selector: Union[str, JsonLocation]):
+        self.path: JsonLocation = compile_selector(selector)
+        self.text = selector if isinstance(selector, str) else format_selector(self.path)
+
+    def __call__(self, data: Any) -> Any:
+        """Return the selected value.
+        Raises:
+            KeyError: if the path does not exist in data
+        """
+        value = data
+        try:
+            for step in self.path:
+                value = value[step]
+        except (KeyError, IndexError, TypeError):
+            raise KeyError(f"Selector {self.text!r} does not match the data.") from None
+        return value
+
+    def get(self, data: Any, default: Any = None) -> Any:
+        """Return the selected value or `default`, if the path does not exist in data."""
+        value = data
+        try:
+            for step in self.path:
+                value = value[step]
+        except (KeyError, IndexError, TypeError):
+            return default
+        return value
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.text!r})"
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, Selector) and self.path == other.path
+
+    def __hash__(self) -> int:
+        return hash(self.path)
+
+
+def format_selector(path: JsonLocation) -> str:
+    """Format a path as selector text.
+    Example:
+    ```python
+    >>> format_selector(("a", "b.c", 0, "d"))
+    "a['b.c'][0].d"
+
+    ```
+    """
+    parts: List[str] = []
+    for step in path:
+        if isinstance(step, int):
+            parts.append(f"[{step}]")
+        elif _SEGMENT.fullmatch(step) is not None and step.strip() == step:
+            parts.append(f".{step}" if parts else step)
+        else:
+            parts.append(f"[{step!r}]")
+    return "".join(parts)
+
+
+def select(data: Any, selector: Union[str, JsonLocation, Selector], default: Any = _MISSING) -> Any:
+    """Return the value at `selector` in data. For repeated lookups create a `Selector` once instead.
+    Args:
+        data: loaded configuration, eg. from `load_dict_from_file`
+        selector: selector text, path or compiled selector
+        default: returned if the path does not exist; if not given, `KeyError` is raised
+    Example:
+    ```python
+    >>> select({"a": {"b": [10, 20]}}, "a.b[1]")
+    20
+
+    ```
+    """
+    if not isinstance(selector, Selector):
+        selector = Selector(selector)
+    if default is _MISSING:
+        return selector(data)
+    return selector.get(data, default)
+
+
+def project(
+    data: Any,
+    selectors: Iterable[Union[str, JsonLocation, Selector]],
+    strict: bool = False,
+) -> Dict[Any, Any]:
+    """Return a new nested dictionary that contains only the selected subtrees of data.
+    Only the dictionaries on the way to the selected subtrees are created; the selected
+    subtrees themselves are shared with data, not copied. List indexes on the way
+    become integer keys of a dictionary in the projection.
+    Args:
+        data: loaded configuration, eg. from `load_dict_from_file`
+        selectors: selector texts, paths or compiled selectors
+        strict: raise `KeyError` for selectors not matching data instead of skipping them
+    Example:
+    ```python
+    >>> config = {"db": {"host": "h", "port": 1, "pool": {"size": 5}}, "log": {"level": "INFO"}}
+    >>> projected = project(config, ["db.pool", "log.level"])
+    >>> projected
+    {'db': {'pool': {'size': 5}}, 'log': {'level': 'INFO'}}
+    >>> projected["db"]["pool"] is config["db"]["pool"]
+    True
+
+    ```
+    """
+    compiled = [
+        selector if isinstance(selector, Selector) else Selector(selector)
+        for selector in selectors
+    ]
+    # select shorter paths first so that subtrees selected as a whole are never descended into
+    compiled.sort(key=lambda selector: len(selector.path))
+    result: Dict[Any, Any] = {}
+    selected_whole = set()
+    for selector in compiled:
+        path = tuple(selector.path)
+        if any(path[:length] in selected_whole for length in range(len(path) + 1)):
+            continue
+        value = selector.get(data, _MISSING)
+        if value is _MISSING:
+            if strict:
+                selector(data)
+            continue
+        if not path:
+            return data
+        node = result
+        for step in path[:-1]:
+            node = node.setdefault(step, {})
+        node[path[-1]] = value
+        selected_whole.add(path)
+    return result
@@ -0,0 +1,135 @@
+"""Immutable, hash-consed views of loaded settings for use as cache keys.
+
+`freeze_settings` turns a merged config dictionary (eg. from `_settings_config_load`)
+or a pydantic settings object (eg. from `click_config_option`) into a tree of
+`FrozenDict` and `FrozenSequence` nodes, the read-only collections of
+`utility.frozen_collections`. Each node computes its hash once, when it is built, and equal
+subtrees frozen with the same `HashConsTable` are the very same object. Thus hashing is O(1)
+and comparing two snapshots or subsections usually reduces to an identity check.
+"""
+
+import weakref
+from collections.abc import Mapping
+from typing import Any, Optional, Tuple, Union
+
+from pydantic import BaseModel
+
+from ..utility.frozen_collections import FrozenDict, FrozenSequence, _KeyLayout, thaw
+
+
+def _typed(value: Any) -> Any:
+    """Structural identity of a child: frozen nodes stand for themselves, scalars are
+    paired with their type, so that eg. `1`, `1.0` and `True` are not merged into one node.
+    """
+    if isinstance(value, (FrozenDict, FrozenSequence)):
+        return value
+    return (type(value), value)
+
+
+class HashConsTable:
+    """Registry of frozen nodes guaranteeing that equal subtrees frozen through the same
+    table are represented by one shared node, mappings with the same keys share one key layout.
+    Nodes and layouts are held weakly, so the table only keeps them alive while they are still
+    referenced elsewhere.
+    Example:
+    ```python
+    >>> table = HashConsTable()
+    >>> old = table.freeze({"db": {"host": "localhost", "port": 5432}, "debug": False})
+    >>> new = table.freeze({"db": {"host": "localhost", "port": 5432}, "debug": True})
+    >>> old["db"] is new["db"], old == new
+    (True, False)
+    >>> {old["db"]: "cached"}[new["db"]]
+    'cached'
+
+    ```
+    """
+
+    def __init__(self):
+        self._nodes: "weakref.WeakValueDictionary[Any, Any]" = (
+            weakref.WeakValueDictionary()
+        )
+        self._layouts: "weakref.WeakValueDictionary[Tuple[Any, ...], _KeyLayout]" = (
+            weakref.WeakValueDictionary()
+        )
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def freeze(self, value: Any) -> Any:
+        """Return the frozen, hash-consed representation of `value`.
+        Dicts (and other mappings) become `FrozenDict`, lists and tuples become
+        `FrozenSequence`, sets become frozensets; hashable scalars are returned as they are.
+        Raises:
+            TypeError: if the tree contains an unhashable value of another type
+        """
+        if isinstance(value, (FrozenDict, FrozenSequence)):
+            # already frozen, possibly by another table or by compact_dict(): re-intern its structure
+            value = thaw(value)
+        if isinstance(value, Mapping):
+            data = {key: self.freeze(item) for key, item in value.items()}
+            structure = (
+                FrozenDict,
+                frozenset((key, _typed(item)) for key, item in data.items()),
+            )
+            node = self._nodes.get(structure)
+            if node is None:
+                node = FrozenDict.from_dict(data, self._layouts)
+                # computed once now, so that hashing the node later costs nothing
+                hash(node)
+                self._nodes[structure] = node
+            return node
+        if isinstance(value, (list, tuple)):
+            items = tuple(self.freeze(item) for item in value)
+            structure = (FrozenSequence, tuple(_typed(item) for item in items))
+            node = self._nodes.get(structure)
+            if node is None:
+                node = FrozenSequence(items)
+                self._nodes[structure] = node
+            return node
+        if isinstance(value, (set, frozenset)):
+            return frozenset(self.freeze(item) for item in value)
+        hash(value)
+        return value
+
+
+_default_table = HashConsTable()
+
+
+def freeze_settings(
+    settings: Union[BaseModel, Mapping], table: Optional[HashConsTable] = None
+) -> FrozenDict:
+    """Return an immutable, hash-consed view of a settings object or merged config dictionary.
+    Snapshots frozen with the same table share all equal subtrees, so checking whether a
+    subsection changed between two snapshots is an identity check and using a subsection
+    as cache key costs no traversal.
+    Args:
+        settings: a pydantic model (eg. a `BaseSettings` object) or a (merged) config dictionary
+        table: hash-consing table to use; defaults to a process-wide table
+    Returns:
+        the frozen root node
+    Raises:
+        ValueError: if settings is None
+        TypeError: if the settings contain unhashable values other than dicts, lists and sets
+    Example:
+    ```python
+    >>> from pydantic import BaseSettings
+    >>> class Server(BaseSettings):
+    ...     host: str = "localhost"
+    ...     port: int = 8080
+    >>> class Settings(BaseSettings):
+    ...     server: Server = Server()
+    ...     debug: bool = False
+    >>> before = freeze_settings(Settings())
+    >>> after = freeze_settings(Settings(debug=True))
+    >>> before["server"] is after["server"]
+    True
+    >>> before == after
+    False
+
+    ```
+    """
+    if settings is None:
+        raise ValueError("Settings object is None.")
+    if isinstance(settings, BaseModel):
+        settings = settings.dict()
+    return (table if table is not None else _default_table).freeze(settings)
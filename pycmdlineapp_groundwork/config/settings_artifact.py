@@ -0,0 +1,294 @@
+"""Pre-rendered documentation of settings models, written at build time and loaded at run time
+in place of live introspection.
+
+The artifact holds, per model decorated with `with_attrs_docs`, the JSON schema, the field
+descriptions and the click help strings derived from them, together with a hash of the
+sources of the modules defining the model and the models nested in its fields. At run time
+a model whose source hash still matches is documented from the artifact without parsing its
+source; a stale or missing entry falls back to live extraction with `apply_attributes_docs`.
+Models decorated with `with_attrs_docs` at import time are documented from the artifact if it
+is installed with `SettingsArtifact.install()` before their modules are imported.
+
+Write an artifact with `write_settings_artifact()` or from the command line:
+`python -m pycmdlineapp_groundwork.config.settings_artifact my_app.settings -o settings_docs.json`
+"""
+
+import copy
+import hashlib
+import importlib
+import json
+import logging
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Type, Union
+
+import click
+from pydantic import BaseModel
+from pydantic.fields import ModelField
+
+from .settings_doc import (
+    _discard_pending_docs,
+    apply_attributes_docs,
+    documented_models,
+    is_pydantic_dataclass,
+    set_docs_source,
+)
+
+logger = logging.getLogger(__name__)
+
+#: :obj:`int` :
+#: Version of the artifact layout, artifacts of other versions are treated as stale
+ARTIFACT_FORMAT_VERSION: int = 2
+
+_source_hashes: Dict[str, Tuple[int, str]] = {}
+_source_hashes_lock = threading.Lock()
+
+
+def model_key(model: Type[Any]) -> str:
+    """Return the key a model is stored under in the artifact, eg. `"my_app.settings:Settings"`."""
+    return f"{model.__module__}:{model.__qualname__}"
+
+
+def source_hash(model: Type[Any]) -> Optional[str]:
+    """Return the SHA-256 hash of the module file model is defined in, None if it has no module file.
+    Hashes are computed once per process and module file version.
+    """
+    source_file = getattr(sys.modules.get(model.__module__), "__file__", None)
+    if source_file is None:
+        return None
+    try:
+        mtime = os.stat(source_file).st_mtime_ns
+    except OSError:
+        return None
+    with _source_hashes_lock:
+        cached = _source_hashes.get(source_file)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    digest = hashlib.sha256(Path(source_file).read_bytes()).hexdigest()
+    with _source_hashes_lock:
+        _source_hashes[source_file] = (mtime, digest)
+    return digest
+
+
+def _fields_model(model: Type[Any]) -> Type[Any]:
+    return model.__pydantic_model__ if is_pydantic_dataclass(model) else model
+
+
+def _field_models(field: ModelField) -> List[Type[BaseModel]]:
+    """Return the model classes a field may hold, also within unions and containers."""
+    sub_fields = field.sub_fields or []
+    models = [field.type_] if isinstance(field.type_, type) and issubclass(field.type_, BaseModel) else []
+    for sub_field in sub_fields:
+        models.extend(_field_models(sub_field))
+    return models
+
+
+def model_classes(model: Type[Any]) -> List[Type[Any]]:
+    """Return model and all model classes reachable from its fields, ordered by model_key()."""
+    seen: Set[Type[Any]] = set()
+    pending = [model]
+    while pending:
+        current = pending.pop()
+        if current in seen:
+            continue
+        seen.add(current)
+        for field in _fields_model(current).__fields__.values():
+            pending.extend(_field_models(field))
+    return sorted(seen, key=model_key)
+
+
+def models_source_hash(model: Type[Any]) -> Optional[str]:
+    """Return the SHA-256 hash of the module files of model and of all models reachable from its fields, whose
+    docs are part of model's schema; None if one of them has no module file."""
+    digest = hashlib.sha256()
+    for module_hash in sorted({source_hash(current) for current in model_classes(model)}, key=str):
+        if module_hash is None:
+            return None
+        digest.update(module_hash.encode("ascii"))
+    return digest.hexdigest()
+
+
+def _descriptions(model: Type[Any]) -> Dict[str, str]:
+    return {
+        name: field.field_info.description
+        for name, field in _fields_model(model).__fields__.items()
+        if field.field_info.description
+    }
+
+
+def _help_strings(descriptions: Dict[str, str]) -> Dict[str, str]:
+    # click rewraps help texts, so line breaks of the docs comments are not kept
+    return {name: " ".join(description.split()) for name, description in descriptions.items()}
+
+
+def _json_schema(model: Type[Any]) -> Dict[str, Any]:
+    # schemas of settings hold sets of environment variable names, which schema_json() encodes as lists
+    return json.loads(_fields_model(model).schema_json())
+
+
+def render_model(model: Type[Any]) -> Dict[str, Any]:
+    """Extract the docs of model from its source and render its artifact entry.
+    Args:
+        model: a pydantic model or pydantic dataclass
+    Returns:
+        dict with `source_hash`, `schema`, `descriptions` and `help`
+    """
+    apply_attributes_docs(model, docs_cache=None)
+    descriptions = _descriptions(model)
+    return {
+        "source_hash": models_source_hash(model),
+        "schema": _json_schema(model),
+        "descriptions": descriptions,
+        "help": _help_strings(descriptions),
+    }
+
+
+def write_settings_artifact(
+    file_path: Union[str, Path], models: Optional[Iterable[Type[Any]]] = None
+) -> Dict[str, Any]:
+    """Render the docs of settings models and write them as JSON artifact.
+    Args:
+        file_path: path of the artifact, replaced atomically
+        models: models to render, defaults to all models decorated with `with_attrs_docs` so far
+    Returns:
+        the written artifact
+    """
+    models = documented_models() if models is None else list(models)
+    artifact = {
+        "format_version": ARTIFACT_FORMAT_VERSION,
+        "models": {model_key(model): render_model(model) for model in models},
+    }
+    file_path = Path(file_path)
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    temporary_path = file_path.with_name(f"{file_path.name}.{os.getpid()}.tmp")
+    temporary_path.write_text(json.dumps(artifact, indent=2, sort_keys=True), encoding="utf-8")
+    os.replace(str(temporary_path), str(file_path))
+    return artifact
+
+
+class SettingsArtifact:
+    """Pre-rendered docs of settings models loaded from an artifact written by `write_settings_artifact()`.
+    Entries are used only while the source hash of the model's module matches, otherwise the docs are
+    extracted live.
+    Args:
+        models: artifact entries keyed by `model_key()`
+    Example:
+    ```python
+    >>> artifact= SettingsArtifact.load("settings_docs.json")  # doctest: +SKIP
+    >>> artifact.apply(Settings)  # doctest: +SKIP
+    True
+    >>> artifact.help(Settings)["port"]  # doctest: +SKIP
+    'port to listen on'
+
+    ```
+    """
+
+    def __init__(self, models: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.models = models if models is not None else {}
+
+    @classmethod
+    def load(cls, file_path: Union[str, Path]) -> "SettingsArtifact":
+        """Load an artifact; a missing, unreadable or outdated artifact loads as empty one, so that all
+        models fall back to live extraction."""
+        try:
+            artifact = json.loads(Path(file_path).read_text(encoding="utf-8"))
+            if artifact["format_version"] == ARTIFACT_FORMAT_VERSION:
+                return cls(artifact["models"])
+            logger.debug("Settings artifact %s has format %s, ignored", file_path, artifact["format_version"])
+        except (OSError, ValueError, KeyError, TypeError) as error:
+            logger.debug("Cannot load settings artifact %s: %s", file_path, error)
+        return cls()
+
+    def entry(self, model: Type[Any]) -> Optional[Dict[str, Any]]:
+        """Return the entry of model if it is not stale, None otherwise."""
+        entry = self.models.get(model_key(model))
+        if entry is None or entry["source_hash"] is None or entry["source_hash"] != models_source_hash(model):
+            return None
+        return entry
+
+    def is_fresh(self, model: Type[Any]) -> bool:
+        """Whether the artifact holds an entry of model matching its current source."""
+        return self.entry(model) is not None
+
+    def apply(self, model: Type[Any], override_existing: bool = True) -> bool:
+        """Set the field descriptions of model from the artifact, or extract them live if its entry is stale.
+        Args:
+            model: a pydantic model or pydantic dataclass
+            override_existing: override existing descriptions
+        Returns:
+            True if the descriptions were taken from the artifact
+        """
+        # docs deferred by with_attrs_docs(lazy=True) are applied now
+        _discard_pending_docs(model)
+        entry = self.entry(model)
+        if entry is None:
+            apply_attributes_docs(model, override_existing=override_existing)
+            return False
+        descriptions = entry["descriptions"]
+        fields_model = _fields_model(model)
+        for name, field in fields_model.__fields__.items():
+            if name in descriptions and (override_existing or not field.field_info.description):
+                field.field_info.description = descriptions[name]
+        fields_model.__dict__.get("__schema_cache__", {}).clear()
+        return True
+
+    def install(self) -> None:
+        """Document models decorated with `with_attrs_docs` from this artifact: lazily decorated models once their
+        docs are needed, the others when they are decorated, ie. if the artifact is installed before their modules
+        are imported."""
+        set_docs_source(self.apply)
+
+    @staticmethod
+    def uninstall() -> None:
+        """Extract the docs of models decorated with `with_attrs_docs` live again."""
+        set_docs_source(None)
+
+    def schema(self, model: Type[Any]) -> Dict[str, Any]:
+        """Return the JSON schema of model, generated live with its docs applied if the entry is stale."""
+        entry = self.entry(model)
+        if entry is None:
+            apply_attributes_docs(model)
+            return _json_schema(model)
+        return copy.deepcopy(entry["schema"])
+
+    def help(self, model: Type[Any]) -> Dict[str, str]:
+        """Return the click help strings of the fields of model, keyed by field name."""
+        entry = self.entry(model)
+        if entry is None:
+            apply_attributes_docs(model)
+            return _help_strings(_descriptions(model))
+        return dict(entry["help"])
+
+    def stale_models(self, models: Sequence[Type[Any]]) -> List[Type[Any]]:
+        """Return the models whose entries are missing or stale."""
+        return [model for model in models if not self.is_fresh(model)]
+
+
+@click.command()
+@click.argument("modules", nargs=-1, required=True)
+@click.option(
+    "--output", "-o", type=click.Path(dir_okay=False), required=True, help="Path of the artifact to write or check."
+)
+@click.option("--check", is_flag=True, help="Only check that the artifact is up to date, exit with 1 if it is stale.")
+def main(modules: Sequence[str], output: str, check: bool) -> None:
+    """Write the pre-rendered docs of the settings models decorated with `with_attrs_docs` in MODULES."""
+    for module in modules:
+        importlib.import_module(module)
+    models = [
+        model
+        for model in documented_models()
+        if any(model.__module__ == module or model.__module__.startswith(f"{module}.") for module in modules)
+    ]
+    if check:
+        stale = SettingsArtifact.load(output).stale_models(models)
+        for model in stale:
+            click.echo(f"stale: {model_key(model)}", err=True)
+        sys.exit(1 if stale else 0)
+    write_settings_artifact(output, models)
+    click.echo(f"Wrote docs of {len(models)} settings models to {output}")
+
+
+if __name__ == "__main__":
+    main()
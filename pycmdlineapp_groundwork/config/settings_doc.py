@@ -1,8 +1,13 @@
 # from https://github.com/danields761/pydantic-settings
 
-from typing import Callable, Optional, Type, TypeVar, Union, overload
-
-from class_doc import extract_docs_from_cls_obj
+import json
+import logging
+import os
+import sys
+import threading
+import weakref
+from hashlib import sha256
+from pathlib import Path
 
 # from pydantic_settings.types import AnyPydanticModel, is_pydantic_dataclass
 
@@ -20,12 +25,17 @@ from typing import (
     Type,
     TypeVar,
     Union,
+    overload,
 )
 
 from attr import dataclass
 from pydantic import BaseModel
 from typing_extensions import Protocol, runtime_checkable
 
+from ..utility.cache_dir import user_cache_dir
+
+logger = logging.getLogger(__name__)
+
 Json = Union[float, int, str, 'JsonDict', 'JsonList']
 JsonDict = Dict[str, Json]
 JsonList = List[Json]
@@ -104,22 +114,143 @@ AnySourceLocProvider = Union[
 ]
 
 
+AttributesDocs = Dict[str, List[str]]
+
+
+def _extract_docs(model: Type[Any]) -> AttributesDocs:
+    # imported on first extraction only, cached docs need neither class_doc nor the source
+    from class_doc import extract_docs_from_cls_obj
+
+    return {name: list(lines) for name, lines in extract_docs_from_cls_obj(model).items()}
+
+
+class AttributesDocsCache:
+    """
+    On-disk cache of the attribute docs extracted from the source of models,
+    keyed on the path and modification time of the module file and the
+    qualified name of the model. The docs of all models of one module are
+    stored in one JSON file, which is read once per process.
+    :param cache_dir: directory of the cache files, defaults to
+        ``attribute_docs`` in the user's cache directory
+    """
+
+    def __init__(self, cache_dir: Optional[Union[str, Path]] = None):
+        self.cache_dir = (
+            Path(cache_dir)
+            if cache_dir is not None
+            else user_cache_dir() / 'attribute_docs'
+        )
+        # module file path -> (mtime, {qualname: docs})
+        self._modules: Dict[str, Tuple[int, Dict[str, AttributesDocs]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, model: Type[Any]) -> AttributesDocs:
+        """
+        Return the attribute docs of model, extracted from its source only if
+        not cached for the current version of its module file.
+        :param model: any class, eg. a pydantic model
+        """
+        if '<locals>' in model.__qualname__:
+            # classes defined in functions may share their qualified name
+            return _extract_docs(model)
+        source_file = getattr(sys.modules.get(model.__module__), '__file__', None)
+        try:
+            mtime = os.stat(source_file).st_mtime_ns  # type: ignore
+        except (OSError, TypeError):
+            # no module file, eg. classes defined interactively
+            return _extract_docs(model)
+        with self._lock:
+            cached_mtime, classes = self._modules.get(source_file, (None, None))
+            if cached_mtime != mtime:
+                classes = self._read(source_file, mtime)
+                self._modules[source_file] = (mtime, classes)
+            docs = classes.get(model.__qualname__)
+        if docs is None:
+            docs = _extract_docs(model)
+            with self._lock:
+                classes[model.__qualname__] = docs
+                self._write(source_file, mtime, classes)
+        return docs
+
+    def clear(self) -> None:
+        """
+        Forget the docs read in this process and delete the cache files.
+        """
+        with self._lock:
+            self._modules = {}
+            for cache_file in self.cache_dir.glob('*.json'):
+                try:
+                    cache_file.unlink()
+                except OSError:
+                    pass
+
+    def _cache_file(self, source_file: str) -> Path:
+        return self.cache_dir / (
+            sha256(source_file.encode('utf-8', 'surrogateescape')).hexdigest()
+            + '.json'
+        )
+
+    def _read(self, source_file: str, mtime: int) -> Dict[str, AttributesDocs]:
+        try:
+            cached = json.loads(
+                self._cache_file(source_file).read_text(encoding='utf-8')
+            )
+            if cached['path'] == source_file and cached['mtime'] == mtime:
+                return cached['classes']
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return {}
+
+    def _write(
+        self, source_file: str, mtime: int, classes: Dict[str, AttributesDocs]
+    ) -> None:
+        cache_file = self._cache_file(source_file)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # replaced atomically, so concurrent processes never read a partial file
+            temporary_file = cache_file.with_name(
+                f'{cache_file.name}.{os.getpid()}.tmp'
+            )
+            temporary_file.write_text(
+                json.dumps({'path': source_file, 'mtime': mtime, 'classes': classes}),
+                encoding='utf-8',
+            )
+            os.replace(str(temporary_file), str(cache_file))
+        except OSError as error:
+            logger.debug('Cannot write attribute docs cache %s: %s', cache_file, error)
+
+
+#: cache used by :py:func:`.apply_attributes_docs` unless another one is given
+default_docs_cache = AttributesDocsCache()
+
+_USE_DEFAULT_CACHE: Any = object()
+
+
 def apply_attributes_docs(
-    model: Type[AnyPydanticModel], *, override_existing: bool = True
+    model: Type[AnyPydanticModel],
+    *,
+    override_existing: bool = True,
+    docs_cache: Optional[AttributesDocsCache] = _USE_DEFAULT_CACHE,
 ) -> None:
     """
     Apply model attributes documentation in-place. Resulted docs are placed
     inside :code:`field.schema.description` for *pydantic* model field.
     :param model: any pydantic model
     :param override_existing: override existing descriptions
+    :param docs_cache: cache of extracted docs, :py:obj:`.default_docs_cache`
+        if not given; None to extract the docs from the source every time
     """
     if is_pydantic_dataclass(model):
         apply_attributes_docs(
-            model.__pydantic_model__, override_existing=override_existing
+            model.__pydantic_model__,
+            override_existing=override_existing,
+            docs_cache=docs_cache,
         )
         return
 
-    docs = extract_docs_from_cls_obj(model)
+    if docs_cache is _USE_DEFAULT_CACHE:
+        docs_cache = default_docs_cache
+    docs = docs_cache.get(model) if docs_cache is not None else _extract_docs(model)
 
     for field in model.__fields__.values():
         if field.field_info.description and not override_existing:
@@ -129,6 +260,95 @@ def apply_attributes_docs(
             field.field_info.description = '\n'.join(docs[field.name])
         except KeyError:
             pass
+    # schemas generated before hold the former descriptions
+    model.__dict__.get('__schema_cache__', {}).clear()
+
+
+# all models decorated with with_attrs_docs, eg. for pre-rendering their docs
+_documented_models: 'weakref.WeakSet[Type[Any]]' = weakref.WeakSet()
+
+
+def documented_models() -> List[Type[Any]]:
+    """
+    Return the models decorated with :py:func:`.with_attrs_docs` so far,
+    ordered by module and qualified name.
+    """
+    return sorted(
+        _documented_models, key=lambda model: (model.__module__, model.__qualname__)
+    )
+
+
+# models decorated lazily, whose docs are not applied yet -> override_existing
+_pending_docs: Dict[Type[Any], bool] = {}
+_pending_lock = threading.RLock()
+
+
+# applies the docs of a model instead of extracting them, see SettingsArtifact.install()
+_docs_source: Optional[Callable[[Type[Any], bool], Any]] = None
+
+
+def set_docs_source(source: Optional[Callable[[Type[Any], bool], Any]]) -> None:
+    """
+    Set the function applying the docs of models decorated with
+    :py:func:`.with_attrs_docs`, called with the model and ``override_existing``;
+    None restores extracting them with :py:func:`.apply_attributes_docs`.
+    """
+    global _docs_source
+    _docs_source = source
+
+
+def _apply_docs(model: Type[Any], override_existing: bool) -> None:
+    source = _docs_source
+    if source is None:
+        apply_attributes_docs(model, override_existing=override_existing)
+    else:
+        source(model, override_existing)
+
+
+def _remove_schema_wrapper(model: Type[Any]) -> None:
+    schema_model = model.__pydantic_model__ if is_pydantic_dataclass(model) else model
+    if 'schema' in schema_model.__dict__:
+        del schema_model.schema
+
+
+def _discard_pending_docs(model: Type[Any]) -> None:
+    """Drop model from the pending docs, eg. as its docs were applied otherwise."""
+    with _pending_lock:
+        if _pending_docs.pop(model, None) is not None:
+            _remove_schema_wrapper(model)
+
+
+def _defer_attributes_docs(model: Type[AnyPydanticModel], override_existing: bool) -> None:
+    """
+    Register model for :py:func:`.apply_pending_attributes_docs` and make its
+    ``schema()`` apply the pending docs before the first schema is generated.
+    """
+    with _pending_lock:
+        _pending_docs[model] = override_existing
+    schema_model = model.__pydantic_model__ if is_pydantic_dataclass(model) else model
+    if 'schema' in schema_model.__dict__:
+        return
+
+    def schema(cls: Type[Any], *args: Any, **kwargs: Any) -> Any:
+        apply_pending_attributes_docs()
+        return cls.schema(*args, **kwargs)
+
+    schema_model.schema = classmethod(schema)
+
+
+def apply_pending_attributes_docs() -> None:
+    """
+    Apply the docs of all models decorated with
+    ``with_attrs_docs(lazy=True)`` that are still pending, eg. before
+    generating the help text of a command line. Called by the first
+    ``schema()`` call of a lazily decorated model.
+    """
+    with _pending_lock:
+        pending = list(_pending_docs.items())
+        _pending_docs.clear()
+        for model, override_existing in pending:
+            _remove_schema_wrapper(model)
+            _apply_docs(model, override_existing)
 
 
 MC = TypeVar('MC', bound=AnyPydanticModel)
@@ -142,24 +362,34 @@ def with_attrs_docs(model_cls: Type[MC]) -> Type[MC]:
 
 @overload
 def with_attrs_docs(
-    *, override_existing: bool = True
+    *, override_existing: bool = True, lazy: bool = False
 ) -> Callable[[Type[MC]], Type[MC]]:
     ...
 
 
 def with_attrs_docs(
-    model_cls: Optional[Type[MC]] = None, *, override_existing: bool = True
+    model_cls: Optional[Type[MC]] = None,
+    *,
+    override_existing: bool = True,
+    lazy: bool = False,
 ) -> Union[Callable[[Type[MC]], Type[MC]], Type[MC]]:
     """
     Applies :py:func:`.apply_attributes_docs`.
+    :param override_existing: override existing descriptions
+    :param lazy: defer extracting and applying the docs until they are needed,
+        ie. until the model's ``schema()`` is generated or
+        :py:func:`.apply_pending_attributes_docs` is called, eg. only when
+        ``--help`` is given
     """
 
     def decorator(maybe_model_cls: Type[_MC]) -> Type[_MC]:
-        apply_attributes_docs(
-            maybe_model_cls, override_existing=override_existing
-        )
+        _documented_models.add(maybe_model_cls)
+        if lazy:
+            _defer_attributes_docs(maybe_model_cls, override_existing)
+        else:
+            _apply_docs(maybe_model_cls, override_existing)
         return maybe_model_cls
 
     if model_cls is None:
         return decorator
-    return decorator(model_cls)
\ No newline at end of file
+    return decorator(model_cls)
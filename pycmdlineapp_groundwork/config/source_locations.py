@@ -0,0 +1,557 @@
+"""Text locations of the values in JSON, YAML and TOML config files, so that errors found
+in loaded config data, eg. pydantic validation errors, can point to file:line:col.
+
+The index is built in the same pass as the data: JSON and TOML are parsed with position-tracking
+scanners producing the same values as `json.loads` and `toml.loads`, YAML documents are composed
+into nodes carrying start and end marks before they are constructed.
+
+Locations are kept compactly: the nodes of the index are numbered, their start and end
+offsets and the links to their first child and next sibling are stored in arrays of integers,
+the keys in a list sharing the key objects of the parsed data. Line and column of an offset are
+computed on lookup from an array of line start offsets.
+"""
+
+import json
+import re
+from array import array
+from bisect import bisect_right
+from json.decoder import JSONDecodeError, scanstring
+from json.scanner import NUMBER_RE
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, MutableMapping, Optional, Sequence, Tuple, Union
+
+import toml
+import yaml
+from pydantic import ValidationError
+
+from ..utility.memory_profile import memory_profiler
+from .config_data_types import ConfigDataTypes
+from .config_file_loaders import (
+    MAX_CONFIG_FILE_SIZE,
+    _determine_config_file_type,
+    _read_config_text,
+    load_dict_from_file,
+)
+from .settings_doc import JsonLocation, TextLocation
+
+_ROOT = 0
+
+
+class SourceLocationIndex:
+    """Index of the text spans of the values of a parsed config file by their path, implements the
+    `SourceValueLocationProvider` protocol for `TextLocation`.
+    Args:
+        text: the parsed text, line and column numbers are computed from it
+    Example:
+    ```python
+    >>> data, index= parse_json_with_locations('{"server": {"port": 80,\\n  "hosts": ["a", "b"]}}')
+    >>> location= index.get_location(("server", "hosts", 1))
+    >>> location.line, location.col, location.end_col
+    (2, 18, 21)
+
+    ```
+    """
+
+    __slots__ = ("_line_starts", "_starts", "_ends", "_keys", "_first_child", "_next_sibling", "_child_maps")
+
+    def __init__(self, text: str):
+        line_starts = array("q", [0])
+        position = text.find("\n")
+        while position >= 0:
+            line_starts.append(position + 1)
+            position = text.find("\n", position + 1)
+        self._line_starts = line_starts
+        # node 0 is the document's root value
+        self._starts = array("q", [0])
+        self._ends = array("q", [len(text)])
+        # the children of a node are linked from its first child on, newest first
+        self._keys: List[Any] = [None]
+        self._first_child = array("q", [-1])
+        self._next_sibling = array("q", [-1])
+        # key to child of the nodes looked up so far
+        self._child_maps: Dict[int, Dict[Any, int]] = {}
+
+    def add(self, parent: int, key: Union[str, int], start: int, end: int = -1) -> int:
+        """Add the span of the value under key of the value of node parent; a key added twice refers to the
+        span added last, like the value of a duplicate key does.
+        Returns:
+            the number of the new node
+        """
+        node = len(self._starts)
+        self._starts.append(start)
+        self._ends.append(end)
+        self._keys.append(key)
+        self._first_child.append(-1)
+        self._next_sibling.append(self._first_child[parent])
+        self._first_child[parent] = node
+        return node
+
+    def set_span(self, node: int, start: int, end: int) -> None:
+        """Set the span of node, eg. the end once the value has been parsed."""
+        self._starts[node] = start
+        self._ends[node] = end
+
+    def _child(self, node: int, key: Any) -> int:
+        """Return the child of node under key, the one added last for a duplicate key, or -1 if there is none.
+        Lookups are only needed to report errors, so the children of a node are mapped by key on its first lookup."""
+        child_map = self._child_maps.get(node)
+        if child_map is None:
+            child_map = self._child_maps[node] = {}
+            child = self._first_child[node]
+            while child >= 0:
+                child_map.setdefault(self._keys[child], child)
+                child = self._next_sibling[child]
+        return child_map.get(key, -1)
+
+    def _node(self, val_loc: JsonLocation) -> Tuple[int, int]:
+        """Return the node of the longest known prefix of val_loc and the length of this prefix."""
+        node = _ROOT
+        for depth, key in enumerate(val_loc):
+            child = self._child(node, key)
+            if child < 0 and isinstance(key, str) and key.lstrip("-").isdigit():
+                # paths of validation errors hold list indexes as int, paths from click or env vars as str
+                child = self._child(node, int(key))
+            if child < 0:
+                return node, depth
+            node = child
+        return node, len(val_loc)
+
+    def get_location(self, val_loc: JsonLocation) -> TextLocation:
+        """Return the span of the value at path val_loc.
+        Raises:
+            KeyError: if there is no value at val_loc
+        """
+        node, depth = self._node(val_loc)
+        if depth < len(val_loc):
+            raise KeyError(tuple(val_loc))
+        return self._location(node)
+
+    def find(self, val_loc: JsonLocation) -> Tuple[TextLocation, int]:
+        """Return the span of the value at path val_loc or, if there is none, eg. for a missing field, the span
+        of the innermost value containing it, together with the length of the path found."""
+        node, depth = self._node(val_loc)
+        return self._location(node), depth
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def _location(self, node: int) -> TextLocation:
+        start = self._starts[node]
+        end = max(self._ends[node], start)
+        line, col = self._line_col(start)
+        end_line, end_col = self._line_col(end)
+        return TextLocation(line=line, col=col, end_line=end_line, end_col=end_col, pos=start, end_pos=end)
+
+    def _line_col(self, position: int) -> Tuple[int, int]:
+        line = bisect_right(self._line_starts, position)
+        return line, position - self._line_starts[line - 1] + 1
+
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_CONSTANTS = {"null": None, "true": True, "false": False, "NaN": float("nan"), "Infinity": float("inf")}
+
+
+def parse_json_with_locations(text: str) -> Tuple[Any, SourceLocationIndex]:
+    """Parse a JSON document like `json.loads` does and index the spans of its values.
+    Raises:
+        json.JSONDecodeError: if text is not valid JSON, with the same messages as `json.loads`
+    """
+    index = SourceLocationIndex(text)
+    skip = _WHITESPACE.match
+    add = index.add
+    set_span = index.set_span
+
+    def scan_value(position: int, node: int) -> Tuple[Any, int]:
+        char = text[position : position + 1]
+        if char == '"':
+            return scanstring(text, position + 1)
+        if char == "{":
+            return scan_object(position + 1, node)
+        if char == "[":
+            return scan_array(position + 1, node)
+        match = NUMBER_RE.match(text, position)
+        if match is not None:
+            integer, fraction, exponent = match.groups()
+            if fraction or exponent:
+                return float(integer + (fraction or "") + (exponent or "")), match.end()
+            return int(integer), match.end()
+        for constant, value in _CONSTANTS.items():
+            if text.startswith(constant, position):
+                return value, position + len(constant)
+        if text.startswith("-Infinity", position):
+            return float("-inf"), position + 9
+        raise JSONDecodeError("Expecting value", text, position)
+
+    def scan_object(position: int, node: int) -> Tuple[Dict[str, Any], int]:
+        result: Dict[str, Any] = {}
+        position = skip(text, position).end()
+        if text[position : position + 1] == "}":
+            return result, position + 1
+        while True:
+            if text[position : position + 1] != '"':
+                raise JSONDecodeError("Expecting property name enclosed in double quotes", text, position)
+            key, position = scanstring(text, position + 1)
+            position = skip(text, position).end()
+            if text[position : position + 1] != ":":
+                raise JSONDecodeError("Expecting ':' delimiter", text, position)
+            start = skip(text, position + 1).end()
+            child = add(node, key, start)
+            result[key], position = scan_value(start, child)
+            set_span(child, start, position)
+            position = skip(text, position).end()
+            char = text[position : position + 1]
+            if char == "}":
+                return result, position + 1
+            if char != ",":
+                raise JSONDecodeError("Expecting ',' delimiter", text, position)
+            position = skip(text, position + 1).end()
+
+    def scan_array(position: int, node: int) -> Tuple[List[Any], int]:
+        result: List[Any] = []
+        position = skip(text, position).end()
+        if text[position : position + 1] == "]":
+            return result, position + 1
+        while True:
+            child = add(node, len(result), position)
+            value, end = scan_value(position, child)
+            set_span(child, position, end)
+            result.append(value)
+            position = skip(text, end).end()
+            char = text[position : position + 1]
+            if char == "]":
+                return result, position + 1
+            if char != ",":
+                raise JSONDecodeError("Expecting ',' delimiter", text, position)
+            position = skip(text, position + 1).end()
+
+    start = skip(text, 0).end()
+    value, end = scan_value(start, _ROOT)
+    set_span(_ROOT, start, end)
+    end = skip(text, end).end()
+    if end != len(text):
+        raise JSONDecodeError("Extra data", text, end)
+    return value, index
+
+
+def parse_yaml_with_locations(text: str) -> Tuple[Any, SourceLocationIndex]:
+    """Parse a YAML document like `yaml.safe_load` does and index the spans of its values from the marks of the
+    document's nodes.
+    Raises:
+        yaml.YAMLError: if text is not valid YAML
+    """
+    index = SourceLocationIndex(text)
+    loader = yaml.SafeLoader(text)
+    try:
+        root = loader.get_single_node()
+        if root is None:
+            return None, index
+        value = loader.construct_document(root)
+        index.set_span(_ROOT, root.start_mark.index, root.end_mark.index)
+        # mapping nodes are flattened by construction, merged keys (<<) are thus indexed as well
+        pending = [(root, _ROOT)]
+        visited = set()
+        while pending:
+            node, number = pending.pop()
+            if id(node) in visited:
+                continue
+            visited.add(id(node))
+            if isinstance(node, yaml.MappingNode):
+                children = []
+                for key_node, value_node in node.value:
+                    if isinstance(key_node, yaml.ScalarNode):
+                        children.append((loader.construct_object(key_node), value_node))
+            elif isinstance(node, yaml.SequenceNode):
+                children = list(enumerate(node.value))
+            else:
+                continue
+            for key, value_node in children:
+                child = index.add(number, key, value_node.start_mark.index, value_node.end_mark.index)
+                pending.append((value_node, child))
+    finally:
+        loader.dispose()
+    return value, index
+
+
+_TOML_SPACE = re.compile(r"[ \t]*")
+_TOML_BLANK = re.compile(r"(?:[ \t\r\n]|#[^\n]*)*")
+_TOML_LINE_END = re.compile(r"[ \t]*(?:#[^\n]*)?(?:\r?\n|$)")
+_TOML_BARE_KEY = re.compile(r"[A-Za-z0-9_-]+")
+_TOML_STRINGS = (
+    ('"""', re.compile(r'"""\r?\n?((?:[^"\\]|\\.|"(?!""))*)"""', re.S), True),
+    ("'''", re.compile(r"'''\r?\n?(.*?)'''", re.S), False),
+    ('"', re.compile(r'"((?:[^"\\\n]|\\.)*)"'), True),
+    ("'", re.compile(r"'([^'\n]*)'"), False),
+)
+_TOML_ESCAPE = re.compile(r"\\(?:u([0-9A-Fa-f]{4})|U([0-9A-Fa-f]{8})|([ \t]*\r?\n\s*)|(.))", re.S)
+_TOML_ESCAPES = {"b": "\b", "t": "\t", "n": "\n", "f": "\f", "r": "\r", '"': '"', "\\": "\\"}
+# date-times may separate date and time by a space
+_TOML_SCALAR = re.compile(r"\d{4}-\d{2}-\d{2}[Tt ]\d{2}:\d{2}:\d{2}[^\s,\]}#]*|[^\s,\]}#=]+")
+
+
+def _toml_unescape(match: "re.Match[str]") -> str:
+    short, long, line_end, char = match.groups()
+    if short or long:
+        return chr(int(short or long, 16))
+    if line_end is not None:
+        return ""
+    try:
+        return _TOML_ESCAPES[char]
+    except KeyError:
+        raise ValueError("Reserved escape sequence used") from None
+
+
+def parse_toml_with_locations(text: str) -> Tuple[Any, SourceLocationIndex]:
+    """Parse a TOML document like `toml.loads` does and index the spans of its tables, keys and array elements.
+    Strings and the structure are scanned here, scalars such as numbers and date-times are converted by the
+    `toml` decoder, so that they get the same types.
+    Raises:
+        toml.TomlDecodeError: if text is not valid TOML
+    """
+    index = SourceLocationIndex(text)
+    decoder = toml.TomlDecoder()
+    add = index.add
+    set_span = index.set_span
+    root: Dict[str, Any] = {}
+    # nodes of the tables and arrays of tables, by id, and the tables not to be opened by a header again
+    nodes: Dict[int, int] = {id(root): _ROOT}
+    defined = {id(root)}
+
+    def error(message: str, position: int) -> toml.TomlDecodeError:
+        return toml.TomlDecodeError(message, text, position)
+
+    def scan_string(position: int) -> Optional[Tuple[str, int]]:
+        for quote, pattern, escapes in _TOML_STRINGS:
+            if text.startswith(quote, position):
+                match = pattern.match(text, position)
+                if match is None:
+                    raise error("Unterminated string found", position)
+                value, end = match.group(1), match.end()
+                if len(quote) == 3:
+                    # up to two quotes right before the closing ones belong to the string
+                    extra = len(text[end : end + 2]) - len(text[end : end + 2].lstrip(quote[0]))
+                    value, end = value + quote[0] * extra, end + extra
+                if escapes:
+                    try:
+                        value = _TOML_ESCAPE.sub(_toml_unescape, value)
+                    except ValueError as e:
+                        raise error(str(e), position) from None
+                return value, end
+        return None
+
+    def scan_key(position: int) -> Tuple[List[str], int]:
+        keys = []
+        while True:
+            position = _TOML_SPACE.match(text, position).end()
+            string = scan_string(position) if text[position : position + 1] in "\"'" else None
+            if string is not None:
+                key, position = string
+            else:
+                match = _TOML_BARE_KEY.match(text, position)
+                if match is None:
+                    raise error("Invalid key", position)
+                key, position = match.group(), match.end()
+            keys.append(key)
+            position = _TOML_SPACE.match(text, position).end()
+            if text[position : position + 1] != ".":
+                return keys, position
+            position += 1
+
+    def sub_table(table: Dict[str, Any], key: str, start: int, end: int, position: int) -> Dict[str, Any]:
+        """Return the table under key of table, created if missing, or the last table of an array of tables."""
+        value = table.get(key)
+        if value is None:
+            value = table[key] = {}
+            nodes[id(value)] = add(nodes[id(table)], key, start, end)
+        elif isinstance(value, list) and id(value) in nodes:
+            value = value[-1]
+        if not isinstance(value, dict):
+            raise error(f"What? {key} already exists?", position)
+        return value
+
+    def assign(table: Dict[str, Any], keys: List[str], start: int, position: int) -> Tuple[Dict[str, Any], int]:
+        """Return the table to assign the value of a dotted key to and the node of the value."""
+        for key in keys[:-1]:
+            table = sub_table(table, key, start, start, position)
+            defined.add(id(table))
+        if keys[-1] in table:
+            raise error("Duplicate keys!", position)
+        return table, add(nodes[id(table)], keys[-1], start)
+
+    def scan_value(position: int, node: int) -> Tuple[Any, int]:
+        string = scan_string(position)
+        if string is not None:
+            return string
+        char = text[position : position + 1]
+        if char == "[":
+            return scan_array(position + 1, node)
+        if char == "{":
+            return scan_inline_table(position + 1, node)
+        match = _TOML_SCALAR.match(text, position)
+        if match is None:
+            raise error("Expecting a value", position)
+        try:
+            value, _ = decoder.load_value(match.group())
+        except ValueError as e:
+            raise error(str(e), position) from None
+        return value, match.end()
+
+    def scan_array(position: int, node: int) -> Tuple[List[Any], int]:
+        result: List[Any] = []
+        while True:
+            position = _TOML_BLANK.match(text, position).end()
+            if text[position : position + 1] == "]":
+                return result, position + 1
+            child = add(node, len(result), position)
+            value, end = scan_value(position, child)
+            set_span(child, position, end)
+            result.append(value)
+            position = _TOML_BLANK.match(text, end).end()
+            char = text[position : position + 1]
+            if char == "]":
+                return result, position + 1
+            if char != ",":
+                raise error("Expecting ',' delimiter", position)
+            position += 1
+
+    def scan_inline_table(position: int, node: int) -> Tuple[Dict[str, Any], int]:
+        result: Dict[str, Any] = {}
+        nodes[id(result)] = node
+        position = _TOML_SPACE.match(text, position).end()
+        if text[position : position + 1] == "}":
+            return result, position + 1
+        while True:
+            position = scan_statement(result, position)
+            position = _TOML_SPACE.match(text, position).end()
+            char = text[position : position + 1]
+            if char == "}":
+                return result, position + 1
+            if char != ",":
+                raise error("Expecting ',' delimiter", position)
+            position += 1
+
+    def scan_statement(table: Dict[str, Any], position: int) -> int:
+        keys, position = scan_key(position)
+        if text[position : position + 1] != "=":
+            raise error("Expecting '=' after a key", position)
+        start = _TOML_SPACE.match(text, position + 1).end()
+        target, child = assign(table, keys, start, position)
+        target[keys[-1]], end = scan_value(start, child)
+        set_span(child, start, end)
+        return end
+
+    table = root
+    position = 0
+    while True:
+        position = _TOML_BLANK.match(text, position).end()
+        if position >= len(text):
+            return root, index
+        start = position
+        if text.startswith("[[", position):
+            keys, position = scan_key(position + 2)
+            if not text.startswith("]]", position):
+                raise error("Expecting ']]' after a table name", position)
+            position += 2
+            table = root
+            for key in keys[:-1]:
+                table = sub_table(table, key, start, position, start)
+            tables = table.setdefault(keys[-1], [])
+            if not isinstance(tables, list) or (tables and id(tables) not in nodes):
+                raise error(f"What? {keys[-1]} already exists?", start)
+            if id(tables) not in nodes:
+                nodes[id(tables)] = add(nodes[id(table)], keys[-1], start, position)
+            table = {}
+            nodes[id(table)] = add(nodes[id(tables)], len(tables), start, position)
+            defined.add(id(table))
+            tables.append(table)
+        elif text[position] == "[":
+            keys, position = scan_key(position + 1)
+            if text[position : position + 1] != "]":
+                raise error("Expecting ']' after a table name", position)
+            position += 1
+            table = root
+            for key in keys:
+                table = sub_table(table, key, start, position, start)
+            if id(table) in defined:
+                raise error(f"What? {keys[-1]} already exists?", start)
+            defined.add(id(table))
+        else:
+            position = scan_statement(table, position)
+        match = _TOML_LINE_END.match(text, position)
+        if match is None:
+            raise error("Expecting a new line after a value", position)
+        position = match.end()
+
+
+_PARSERS = {
+    ConfigDataTypes.json: parse_json_with_locations,
+    ConfigDataTypes.yaml: parse_yaml_with_locations,
+    ConfigDataTypes.toml: parse_toml_with_locations,
+}
+
+
+def load_dict_with_locations(
+    file_path: Union[str, Path],
+    data_type: ConfigDataTypes = ConfigDataTypes.infer,
+    encoding: str = "utf-8",
+    max_file_size: int = MAX_CONFIG_FILE_SIZE,
+) -> Tuple[MutableMapping[str, Any], Optional[SourceLocationIndex]]:
+    """Load a config file like `load_dict_from_file` does and index the locations of its values while parsing.
+    Files whose format is neither given nor known from their suffix, or which do not parse as their format,
+    are loaded by `load_dict_from_file` without index, which tries the other formats or reports the error.
+    Args:
+        file_path: path to the file to be parsed
+        data_type: optional, pre-defines the data type to be parsed
+        encoding: encoding used to decode the file's content
+        max_file_size: maximum size a config file may have, otherwise an exception is raised
+    Returns:
+        the loaded dictionary and the index of its values' locations, None if the file was not indexed
+    Raises:
+        see `load_dict_from_file`
+    """
+    file_path = Path(file_path).resolve()
+    determined_data_type = (
+        _determine_config_file_type(file_path) if data_type == ConfigDataTypes.infer else data_type
+    )
+    parse = _PARSERS.get(determined_data_type)
+    if parse is not None and file_path.is_file() and file_path.stat().st_size <= max_file_size:
+        text = _read_config_text(file_path, "utf-8" if determined_data_type == ConfigDataTypes.toml else encoding)
+        try:
+            with memory_profiler.stage("parsed_dict", file_path, determined_data_type.value):
+                result, index = parse(text)
+        except (ValueError, yaml.YAMLError, RecursionError):
+            # toml.TomlDecodeError and json.JSONDecodeError are ValueErrors
+            pass
+        else:
+            if isinstance(result, MutableMapping):
+                return result, index
+    return load_dict_from_file(file_path, data_type, encoding, max_file_size), None
+
+
+def format_error_locations(
+    error: ValidationError, locations: Mapping[Union[str, Path], Optional[SourceLocationIndex]]
+) -> List[str]:
+    """Return one line per error of a pydantic validation error of data merged from config files, with the location
+    of the invalid value, or of the innermost value containing a missing one, as `file:line:col`. A value is located
+    in the file that supplied it, ie. the last file holding it in merge order.
+    Args:
+        error: the validation error of the merged data
+        locations: the indexes of the merged files in merge order, None for files loaded without index
+    """
+    indexed = [(file_path, index) for file_path, index in locations.items() if index is not None]
+    lines = []
+    for error_entry in error.errors():
+        loc: Sequence[Union[str, int]] = [key for key in error_entry["loc"] if key != "__root__"]
+        found: Optional[Tuple[Union[str, Path], TextLocation, int]] = None
+        for file_path, index in reversed(indexed):
+            location, depth = index.find(loc)
+            if found is None or depth > found[2]:
+                found = (file_path, location, depth)
+            if depth == len(loc):
+                break
+        if found is None:
+            continue
+        file_path, location, depth = found
+        path = ".".join(str(key) for key in error_entry["loc"])
+        inside = "" if depth == len(loc) else " (in the enclosing value)"
+        lines.append(f"{file_path}:{location.line}:{location.col}: {path}: {error_entry['msg']}{inside}")
+    return lines
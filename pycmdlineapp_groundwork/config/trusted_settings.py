@@ -0,0 +1,369 @@
+"""Trust mode for loading large configs: settings are built with pydantic's `construct()`,
+skipping validation, if the same config data was validated for the same settings model before.
+
+A digest of the config data and of the source of the settings models is recorded in a
+`TrustStore` after each successful full validation. As long as the digest of the data to
+load matches the recorded one, the settings are constructed recursively without validating
+them. For defence in depth, a random sample of the nested models can still be validated on
+every load. Whenever the data or a settings model changes, the digest differs and the data
+is validated in full again.
+
+Construction skips coercion of values. When the data is validated in full, the store also
+records whether validation left it unchanged; if not, the values of trusted data that are
+not already of their field's type, eg. strings of `Path` fields, are validated as usual.
+Models with custom validators are always validated. For settings classes, the data is merged
+with the values of their sources, eg. environment variables, before digesting and constructing it.
+"""
+
+import hashlib
+import json
+import logging
+import math
+import os
+import random
+import threading
+import weakref
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Type, TypeVar, Union
+
+from pydantic import BaseModel, BaseSettings, Extra, ValidationError
+from pydantic.fields import SHAPE_DICT, SHAPE_LIST, SHAPE_MAPPING, SHAPE_SEQUENCE, SHAPE_SINGLETON, ModelField
+
+from ..utility.cache_dir import user_cache_dir
+from .settings_artifact import model_classes, model_key, source_hash
+
+logger = logging.getLogger(__name__)
+
+#: :obj:`int` :
+#: Version of the trust store layout, stores of other versions are treated as empty
+TRUST_STORE_FORMAT_VERSION: int = 1
+
+TModel = TypeVar("TModel", bound=BaseModel)
+
+_PLAIN_TYPES = (str, int, float, bool)
+
+
+class TrustStore:
+    """Digests of config data validated in full, persisted as JSON file, keyed by an identifier of the
+    config, eg. the settings class and the config files it was loaded from.
+    Args:
+        file_path: path of the store, defaults to `trusted_settings.json` in the user's cache directory
+    """
+
+    def __init__(self, file_path: Optional[Union[str, Path]] = None):
+        self.file_path = (
+            Path(file_path) if file_path is not None else user_cache_dir() / "trusted_settings.json"
+        )
+        # key -> [digest, canonical]
+        self._digests: Optional[Dict[str, List[Any]]] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, List[Any]]:
+        if self._digests is None:
+            try:
+                store = json.loads(self.file_path.read_text(encoding="utf-8"))
+                self._digests = (
+                    dict(store["digests"]) if store["format_version"] == TRUST_STORE_FORMAT_VERSION else {}
+                )
+            except (OSError, ValueError, KeyError, TypeError):
+                self._digests = {}
+        return self._digests
+
+    def _save(self) -> None:
+        try:
+            self.file_path.parent.mkdir(parents=True, exist_ok=True)
+            temporary_path = self.file_path.with_name(f"{self.file_path.name}.{os.getpid()}.tmp")
+            temporary_path.write_text(
+                json.dumps({"format_version": TRUST_STORE_FORMAT_VERSION, "digests": self._digests}),
+                encoding="utf-8",
+            )
+            os.replace(str(temporary_path), str(self.file_path))
+        except OSError as error:
+            logger.debug("Cannot write trust store %s: %s", self.file_path, error)
+
+    def trusted(self, key: str, digest: str) -> Optional[bool]:
+        """Return None if digest is not the one recorded for key, otherwise whether the data was canonical,
+        ie. left unchanged by validation."""
+        with self._lock:
+            entry = self._load().get(key)
+        if entry is None or entry[0] != digest:
+            return None
+        return entry[1]
+
+    def is_trusted(self, key: str, digest: str) -> bool:
+        """Whether digest is the one recorded for key."""
+        return self.trusted(key, digest) is not None
+
+    def record(self, key: str, digest: str, canonical: bool = False) -> None:
+        """Record digest of config data validated in full for key, replacing the digest recorded before.
+        Args:
+            key: identifier of the config
+            digest: digest of the config data, see `settings_digest`
+            canonical: whether validation left the data unchanged
+        """
+        with self._lock:
+            digests = self._load()
+            if digests.get(key) != [digest, canonical]:
+                digests[key] = [digest, canonical]
+                self._save()
+
+    def forget(self, key: str) -> None:
+        """Drop the digest recorded for key, so that its config is validated in full on next load."""
+        with self._lock:
+            if self._load().pop(key, None) is not None:
+                self._save()
+
+
+def settings_digest(settings_class: Type[BaseModel], data: Dict[str, Any]) -> str:
+    """Return the SHA-256 digest identifying data loaded into settings_class: it changes with the data and
+    with the source of settings_class or any model used in its fields."""
+    digest = hashlib.sha256()
+    for model in model_classes(settings_class):
+        digest.update(f"{model_key(model)}\0{source_hash(model)}\0".encode("utf-8"))
+    try:
+        canonical = json.dumps(data, sort_keys=True, separators=(",", ":"), default=repr)
+    except TypeError:
+        # keys of different types cannot be sorted
+        canonical = repr(data)
+    digest.update(canonical.encode("utf-8", "surrogatepass"))
+    return digest.hexdigest()
+
+
+def _has_validators(model: Type[BaseModel]) -> bool:
+    return bool(model.__validators__ or model.__pre_root_validators__ or model.__post_root_validators__)
+
+
+def _is_plain(model: Type[BaseModel], field: ModelField, value: Any) -> bool:
+    """Whether value needs no coercion for field, tested in time linear in the size of value."""
+    type_ = field.type_
+    if type_ is not Any and type_ not in _PLAIN_TYPES:
+        return False
+    if type_ is str and (
+        model.__config__.anystr_strip_whitespace
+        or getattr(model.__config__, "anystr_lower", False)
+        or model.__config__.max_anystr_length is not None
+        or model.__config__.min_anystr_length
+    ):
+        return False
+
+    def plain(item: Any) -> bool:
+        # exact types, as eg. a bool is an int and an int is converted for float fields
+        return type_ is Any or type(item) is type_
+
+    if field.shape == SHAPE_SINGLETON:
+        return plain(value) or (value is None and field.allow_none)
+    if field.shape in (SHAPE_LIST, SHAPE_SEQUENCE) and isinstance(value, list):
+        return type_ is Any or all(plain(item) for item in value)
+    if field.shape in (SHAPE_DICT, SHAPE_MAPPING) and isinstance(value, dict):
+        key_type = field.key_field.type_ if field.key_field is not None else Any
+        return all(
+            (key_type is Any or type(key) is key_type) and plain(item) for key, item in value.items()
+        )
+    return False
+
+
+_NESTED_SINGLE, _NESTED_LIST, _NESTED_DICT = 1, 2, 3
+
+
+class _ModelPlan:
+    """How to construct a model, computed once per model class: per field its name, alias and, for fields of
+    nested models that are constructed recursively, the nested model and the kind of container."""
+
+    __slots__ = ("parse_only", "fields", "extra", "by_name")
+
+    def __init__(self, model: Type[BaseModel]):
+        self.parse_only = _has_validators(model)
+        self.extra = model.__config__.extra
+        self.by_name = model.__config__.allow_population_by_field_name
+        fields = []
+        for name, field in model.__fields__.items():
+            type_ = field.type_
+            nested, kind = None, 0
+            if isinstance(type_, type) and issubclass(type_, BaseModel):
+                if field.shape == SHAPE_SINGLETON:
+                    nested, kind = type_, _NESTED_SINGLE
+                elif field.shape in (SHAPE_LIST, SHAPE_SEQUENCE):
+                    nested, kind = type_, _NESTED_LIST
+                elif field.shape in (SHAPE_DICT, SHAPE_MAPPING) and (
+                    field.key_field is None or field.key_field.type_ in (str, Any)
+                ):
+                    nested, kind = type_, _NESTED_DICT
+            fields.append((name, field.alias, field, nested, kind))
+        self.fields = tuple(fields)
+
+
+_plans: "weakref.WeakKeyDictionary[Type[BaseModel], _ModelPlan]" = weakref.WeakKeyDictionary()
+
+
+def _plan(model: Type[BaseModel]) -> _ModelPlan:
+    plan = _plans.get(model)
+    if plan is None:
+        plan = _plans[model] = _ModelPlan(model)
+    return plan
+
+
+class _Constructor:
+    """Builds models recursively with construct(), collecting the constructed subtrees for sampling.
+    Args:
+        check_values: validate values that are not of their field's type, otherwise take all values as they are
+    """
+
+    def __init__(self, check_values: bool = True) -> None:
+        self.check_values = check_values
+        self.subtrees: List[Tuple[Type[BaseModel], Dict[str, Any], BaseModel]] = []
+        # whether a value not of its field's type was validated
+        self.coerced = False
+
+    def model(self, model: Type[TModel], data: Any) -> TModel:
+        plan = _plan(model)
+        if plan.parse_only or not isinstance(data, dict):
+            return model.parse_obj(data)
+        values: Dict[str, Any] = {}
+        for name, alias, field, nested, kind in plan.fields:
+            if alias in data:
+                value = data[alias]
+            elif plan.by_name and name in data:
+                value = data[name]
+            elif field.required:
+                # reported by pydantic exactly like a full validation would do
+                return model.parse_obj(data)
+            else:
+                continue
+            if kind == _NESTED_SINGLE and isinstance(value, dict):
+                value = self.model(nested, value)
+            elif kind == _NESTED_LIST and isinstance(value, list):
+                value = [self.model(nested, item) for item in value]  # type: ignore
+            elif kind == _NESTED_DICT and isinstance(value, dict):
+                value = {key: self.model(nested, item) for key, item in value.items()}  # type: ignore
+            elif self.check_values and not _is_plain(model, field, value):
+                self.coerced = True
+                value, errors = field.validate(value, {}, loc=alias, cls=model)
+                if errors:
+                    raise ValidationError([errors], model)
+            values[name] = value
+        if len(values) < len(data):
+            known = {alias for _, alias, _, _, _ in plan.fields} | (set(values) if plan.by_name else set())
+            unknown = [key for key in data if key not in known]
+            if unknown and plan.extra == Extra.forbid:
+                return model.parse_obj(data)
+            if plan.extra == Extra.allow:
+                for key in unknown:
+                    values[key] = data[key]
+        constructed = model.construct(_fields_set=set(values), **values)
+        self.subtrees.append((model, data, constructed))
+        return constructed
+
+
+def _with_settings_sources(settings_class: Type[TModel], data: Dict[str, Any]) -> Dict[str, Any]:
+    """Return data merged with the values of the sources of a settings class, eg. environment variables, like
+    instantiating it does; construct() skips the sources. Data of other models is returned as it is."""
+    if not issubclass(settings_class, BaseSettings):
+        return data
+    return settings_class._build_values(settings_class.__new__(settings_class), data)
+
+
+class TrustedSampleMismatch(ValueError):
+    """A sampled subtree of trusted settings differs from its fully validated counterpart."""
+
+
+def construct_settings(
+    settings_class: Type[TModel],
+    data: Dict[str, Any],
+    sample_rate: float = 0.0,
+    rng: Optional[random.Random] = None,
+    check_values: bool = True,
+) -> TModel:
+    """Build settings from data with construct(), recursively for nested models. For settings classes, data is
+    merged with the values of their sources, eg. environment variables, first, like instantiating them does.
+    Args:
+        settings_class: a pydantic model or settings class
+        data: the config data, eg. as returned by `_settings_config_load`
+        sample_rate: fraction of the constructed models, at least one if above 0, validated in full and compared
+            with the constructed ones
+        rng: random number generator drawing the sample
+        check_values: validate the values that are not of their field's type, eg. strings of `Path` fields;
+            if False, values are taken as they are, which is only correct for data that validation leaves
+            unchanged
+    Raises:
+        ValidationError: if a value not of its field's type is invalid
+        TrustedSampleMismatch: if a sampled model fails validation or differs from its validated counterpart
+    """
+    return _construct(settings_class, _with_settings_sources(settings_class, data), sample_rate, rng, check_values)
+
+
+def _construct(
+    settings_class: Type[TModel],
+    data: Dict[str, Any],
+    sample_rate: float = 0.0,
+    rng: Optional[random.Random] = None,
+    check_values: bool = True,
+) -> TModel:
+    """construct_settings() for data already merged with the values of the settings sources."""
+    constructor = _Constructor(check_values)
+    settings = constructor.model(settings_class, data)
+    if sample_rate > 0 and constructor.subtrees:
+        count = min(len(constructor.subtrees), max(1, math.ceil(sample_rate * len(constructor.subtrees))))
+        for model, raw, constructed in (rng or random).sample(constructor.subtrees, count):
+            try:
+                validated = model.parse_obj(raw)
+            except ValidationError as error:
+                raise TrustedSampleMismatch(f"Sampled {model.__name__} is invalid:\n{error}") from error
+            if validated != constructed:
+                raise TrustedSampleMismatch(f"Sampled {model.__name__} differs from its validated counterpart.")
+    return settings
+
+
+def parse_trusted(
+    settings_class: Type[TModel],
+    data: Dict[str, Any],
+    trust_store: TrustStore,
+    trust_key: Optional[str] = None,
+    sample_rate: float = 0.0,
+) -> TModel:
+    """Load data into settings_class like `parse_obj()` does, but skip validation if the digest of data, merged
+    with the values of the settings sources for settings classes, and the settings models is recorded as
+    validated in trust_store; data that is not trusted is validated in full
+    and trusted afterwards. Trusted data that validation left unchanged is constructed without looking at its
+    values, other trusted data with the values not of their field's type validated.
+    Args:
+        settings_class: a pydantic model or settings class
+        data: the config data, eg. as returned by `_settings_config_load`
+        trust_store: store of the digests of validated configs
+        trust_key: identifier of the config in the store, defaults to the settings class' `model_key()`
+        sample_rate: fraction of the nested models of trusted data validated anyway, see `construct_settings`
+    Raises:
+        ValidationError: if data is invalid
+    Example:
+    ```python
+    >>> from tempfile import mkdtemp
+    >>> from pydantic import BaseModel
+    >>> class Settings(BaseModel):
+    ...     port: int = 1234
+    >>> store= TrustStore(Path(mkdtemp()) / "trusted.json")
+    >>> parse_trusted(Settings, {"port": "80"}, store)  # validated in full and recorded
+    Settings(port=80)
+    >>> parse_trusted(Settings, {"port": "80"}, store)  # trusted, constructed
+    Settings(port=80)
+
+    ```
+    """
+    key = trust_key if trust_key is not None else model_key(settings_class)
+    # the digest covers the values of the settings sources, eg. changed environment variables invalidate it
+    merged = _with_settings_sources(settings_class, data)
+    digest = settings_digest(settings_class, merged)
+    canonical = trust_store.trusted(key, digest)
+    if canonical is not None:
+        try:
+            return _construct(settings_class, merged, sample_rate, check_values=not canonical)
+        except (ValidationError, TrustedSampleMismatch) as error:
+            logger.warning("Trusted config %s failed checks, validating it in full: %s", key, error)
+            trust_store.forget(key)
+    settings = settings_class.parse_obj(data)
+    # canonical only if every value is exactly of its field's type: equality alone takes eg. 1 for 1.0 or True
+    constructor = _Constructor()
+    try:
+        canonical = constructor.model(settings_class, merged) == settings and not constructor.coerced
+    except ValidationError:
+        canonical = False
+    trust_store.record(key, digest, canonical)
+    return settings
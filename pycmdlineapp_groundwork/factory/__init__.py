@@ -1,4 +1,13 @@
-from .generic_build_artefact import GenericBuildArtifact, TGenericBuildArtifact
+from .generic_build_artefact import GenericBuildArtifact, SlottedBuildArtifact, TGenericBuildArtifact
 from .builder import GenericBuilder, TGenericBuilder 
+from .pooled_builder import PooledBuilder
+from .caching_builder import CachingBuilder
+from .instrumentation import BuildInstrumentation
+from .lazy_reference import LazyReference
 from .descriptor import IntDescriptor, StrDescriptor, AutoStrDescriptor, auto
-from .factory import Factory
\ No newline at end of file
+from .descriptor_generation import descriptor_from_dict, descriptor_from_file
+from .factory import Factory
+from .process_pool_factory import ProcessPoolFactory
+from .async_builder import AsyncBuilder, TAsyncBuilder
+from .async_factory import AsyncFactory
+from .plugin_discovery import PluginIndex, discover_plugins
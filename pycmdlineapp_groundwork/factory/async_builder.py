@@ -0,0 +1,244 @@
+import asyncio
+import inspect
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Type, TypeVar, Union
+
+from .builder import GenericBuilder, _zip_columns
+from .descriptor import StrDescriptor, IntDescriptor, auto
+from .generic_build_artefact import GenericBuildArtifact, TGenericBuildArtifact
+
+#: :obj:`int` : default maximum number of constructions build_many() and build_columns() run concurrently
+DEFAULT_CONCURRENCY: int = 16
+
+
+async def _gather_limited(
+    calls: Iterable[Callable[[], Awaitable[Any]]], concurrency: Optional[int]
+) -> List[Any]:
+    """Run the awaitables created by calls concurrently, at most concurrency at a time, and return their results
+    in order. With a limit, as many workers as allowed pull the calls from the iterable, so that only the running
+    awaitables exist at a time; without a limit, all awaitables are created at once."""
+    if concurrency is None:
+        return list(await asyncio.gather(*(call() for call in calls)))
+    if concurrency < 1:
+        raise ValueError(f"concurrency must be at least 1 or None, got {concurrency}.")
+    results: List[Any] = []
+    # shared by the workers; pulling the next call never suspends, so each call is pulled by exactly one worker
+    pending = iter(calls)
+    failed = False
+
+    async def worker() -> None:
+        nonlocal failed
+        while not failed:
+            call = next(pending, None)
+            if call is None:
+                return
+            index = len(results)
+            results.append(None)
+            try:
+                results[index] = await call()
+            except BaseException:
+                failed = True
+                raise
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return results
+
+
+class AsyncBuilder(GenericBuilder):
+    """Builder for objects that need asynchronous initialization, eg. opening connections. Building is a coroutine:
+    `await builder(key, ...)`. The registered artifact type is called with the fixed and per-build arguments as with
+    GenericBuilder. If that call returns an awaitable, eg. because an async factory function or classmethod is
+    registered, it is awaited. If the built object has an `async_init()` coroutine method, it is awaited, too.
+    The coroutine async_init_hook() is run once, before the first build.
+    Example:
+    ```python
+    >>> class Connection(GenericBuildArtifact):
+    ...     def __init__(self, host):
+    ...         self.host= host
+    ...         self.connected= False
+    ...     async def async_init(self):
+    ...         await asyncio.sleep(0)
+    ...         self.connected= True
+    >>> class Resources(IntDescriptor):
+    ...     connection= auto()
+    >>> builder= AsyncBuilder(Resources.connection, Connection)
+    >>> connection= asyncio.run(builder(Resources.connection, "localhost"))
+    >>> connection.host, connection.connected
+    ('localhost', True)
+
+    ```
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._async_initialized = False
+        self._async_init_lock: Optional[asyncio.Lock] = None
+        super().__init__(*args, **kwargs)
+
+    async def __call__(  # type: ignore[override]
+        self,
+        type_descriptor_key: Union[StrDescriptor, IntDescriptor, None] = None,
+        *args,
+        **kwargs,
+    ) -> TGenericBuildArtifact:
+        """Build and initialize an object of the type identified by type_descriptor_key, see GenericBuilder.__call__().
+        Args:
+            type_descriptor_key (Union[StrDescriptor,IntDescriptor]): The enum-derived descriptor identifying the class-object
+                to be built. If None, the first registered class type is built.
+            *args, **kwargs: per-build arguments, passed to the constructor after the fixed arguments
+        Returns:
+            object of the class type registered for type_descriptor_key
+        Raises:
+            ValueError: if type_decriptor_key is not registered or registry is accidentally empty
+        """
+        if not self._async_initialized:
+            await self._run_async_init_hook()
+        self._counter.increment()
+        build = self._compiled_build(type_descriptor_key)
+        if kwargs and self._fixed_kwargs:
+            self._check_duplicate_kwargs(kwargs)
+        return await build(*args, **kwargs)
+
+    def _compile_entry(self, type_descriptor_key: Any, artifact_type: Type[TGenericBuildArtifact]) -> Callable[..., Any]:
+        """Return a coroutine function constructing and initializing the artifact, so that instrumentation times
+        the awaited initialization, too."""
+        construct = self._compile(artifact_type)
+
+        async def build(*args, **kwargs):
+            return await self._initialize(construct(*args, **kwargs))
+
+        return build
+
+    async def _initialize(self, artifact: Any) -> Any:
+        """Await the constructor result if needed and run the object's async_init()."""
+        if inspect.isawaitable(artifact):
+            artifact = await artifact
+        async_init = getattr(artifact, "async_init", None)
+        if async_init is not None:
+            await async_init()
+        return artifact
+
+    async def _run_async_init_hook(self) -> None:
+        # the lock is created in the coroutine, so that it belongs to the running event loop
+        if self._async_init_lock is None:
+            self._async_init_lock = asyncio.Lock()
+        async with self._async_init_lock:
+            if not self._async_initialized:
+                await self.async_init_hook()
+                self._async_initialized = True
+
+    async def async_init_hook(self) -> None:
+        """Coroutine run once before the first build, for asynchronous setup of the builder itself,
+        eg. creating a connection pool the built objects share. The synchronous init_hook() still runs
+        at the end of __init__().
+        Example:
+        ```python
+        >>> class Session(GenericBuildArtifact):
+        ...     def __init__(self, pool):
+        ...         self.pool= pool
+        >>> class Resources(IntDescriptor):
+        ...     session= auto()
+        >>> class SessionBuilder(AsyncBuilder):
+        ...     async def async_init_hook(self):
+        ...         await asyncio.sleep(0)
+        ...         self.set_fixed_args(pool= "shared pool")
+        >>> builder= SessionBuilder(Resources.session, Session)
+        >>> asyncio.run(builder()).pool
+        'shared pool'
+
+        ```
+        """
+        pass
+
+    async def build_many(  # type: ignore[override]
+        self,
+        type_descriptor_key: Union[StrDescriptor, IntDescriptor, None] = None,
+        iterable_of_kwargs: Iterable[Mapping[str, Any]] = (),
+        concurrency: Optional[int] = DEFAULT_CONCURRENCY,
+    ) -> List[TGenericBuildArtifact]:
+        """Build and initialize one object per keyword-argument mapping, running the asynchronous
+        initializations concurrently.
+        Args:
+            type_descriptor_key (Union[StrDescriptor,IntDescriptor]): The enum-derived descriptor identifying the class-object
+                to be built. If None, the first registered class type is built.
+            iterable_of_kwargs: per-build keyword arguments, one mapping per object to be built
+            concurrency: maximum number of initializations running at the same time, the mappings are pulled from
+                iterable_of_kwargs as constructions finish; None for no limit, creating all constructions at once
+        Returns:
+            list of built objects, in the order of the mappings
+        Raises:
+            ValueError: if type_decriptor_key is not registered or concurrency is less than 1
+        Example:
+        ```python
+        >>> class Connection(GenericBuildArtifact):
+        ...     def __init__(self, host):
+        ...         self.host= host
+        ...     async def async_init(self):
+        ...         await asyncio.sleep(0.01)
+        >>> class Resources(IntDescriptor):
+        ...     connection= auto()
+        >>> builder= AsyncBuilder(Resources.connection, Connection)
+        >>> connections= asyncio.run(builder.build_many(None, [{"host": "a"}, {"host": "b"}], concurrency= 2))
+        >>> [connection.host for connection in connections]
+        ['a', 'b']
+
+        ```
+        """
+        return await self._build_calls(
+            type_descriptor_key, (((), kwargs) for kwargs in iterable_of_kwargs), concurrency
+        )
+
+    async def build_columns(  # type: ignore[override]
+        self,
+        type_descriptor_key: Union[StrDescriptor, IntDescriptor, None] = None,
+        *columns: Sequence[Any],
+        concurrency: Optional[int] = DEFAULT_CONCURRENCY,
+        **keyword_columns: Sequence[Any],
+    ) -> List[TGenericBuildArtifact]:
+        """Build and initialize one object per row of parallel argument sequences, see GenericBuilder.build_columns(),
+        running the asynchronous initializations concurrently.
+        Args:
+            concurrency: maximum number of initializations running at the same time, None for no limit,
+                creating all constructions at once
+        Raises:
+            ValueError: if type_decriptor_key is not registered, the columns differ in length or concurrency is less than 1
+        """
+        rows = _zip_columns(self.__class__.__name__, columns + tuple(keyword_columns.values()))
+        names = tuple(keyword_columns)
+        positional_count = len(columns)
+        return await self._build_calls(
+            type_descriptor_key,
+            (
+                (row[:positional_count], dict(zip(names, row[positional_count:])))
+                for row in rows
+            ),
+            concurrency,
+        )
+
+    async def _build_calls(
+        self,
+        type_descriptor_key: Union[StrDescriptor, IntDescriptor, None],
+        calls: Iterable[Tuple[Sequence[Any], Mapping[str, Any]]],
+        concurrency: Optional[int],
+    ) -> List[TGenericBuildArtifact]:
+        if not self._async_initialized:
+            await self._run_async_init_hook()
+        build = self._compiled_build(type_descriptor_key)
+        check = bool(self._fixed_kwargs)
+
+        def construct(args: Sequence[Any], kwargs: Mapping[str, Any]) -> Callable[[], Awaitable[Any]]:
+            # counted before the checks, as in __call__()
+            self._counter.increment()
+            if check:
+                self._check_duplicate_kwargs(kwargs)  # type: ignore
+            return lambda: build(*args, **kwargs)
+
+        return await _gather_limited(
+            (construct(args, kwargs) for args, kwargs in calls), concurrency
+        )
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = super().__getstate__()
+        state["_async_init_lock"] = None
+        return state
+
+
+TAsyncBuilder = TypeVar("TAsyncBuilder", bound=AsyncBuilder)
@@ -0,0 +1,138 @@
+import asyncio
+import inspect
+from typing import Any, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+from .async_builder import AsyncBuilder, DEFAULT_CONCURRENCY
+from .builder import GenericBuilder
+from .descriptor import StrDescriptor, IntDescriptor, auto
+from .factory import Factory
+from .generic_build_artefact import GenericBuildArtifact, TGenericBuildArtifact
+
+
+class AsyncFactory(Factory):
+    """Factory whose builds are coroutines: `await factory(key, ...)`. Builders are registered as with Factory.
+    AsyncBuilders build and initialize their objects asynchronously, other builders build synchronously.
+    Example:
+    ```python
+    >>> class Connection(GenericBuildArtifact):
+    ...     def __init__(self, host):
+    ...         self.host= host
+    ...     async def async_init(self):
+    ...         await asyncio.sleep(0)
+    >>> class Message(GenericBuildArtifact):
+    ...     def __init__(self, text):
+    ...         self.text= text
+    >>> class Resources(IntDescriptor):
+    ...     connection= auto()
+    ...     message= auto()
+    >>> factory= AsyncFactory()
+    >>> factory.register_builder(AsyncBuilder, Resources.connection, Connection)
+    >>> factory.register_builder(GenericBuilder, Resources.message, Message)
+    >>> async def main():
+    ...     connection= await factory(Resources.connection, "localhost")
+    ...     message= await factory(Resources.message, "hello")
+    ...     return connection.host, message.text
+    >>> asyncio.run(main())
+    ('localhost', 'hello')
+
+    ```
+    """
+
+    async def __call__(  # type: ignore[override]
+        self,
+        type_descriptor_key: Union[StrDescriptor, IntDescriptor, None] = None,
+        *args,
+        **kwargs,
+    ) -> TGenericBuildArtifact:
+        """Build and return an object referred to by type_descriptor_key using the builder registered for this object type.
+        Args:
+            type_descriptor_key: The enum-derived descriptor identifying the class-object to be built.
+            *args: Positional arguments passed to the registered object builder.
+            **kwargs: Keyword arguments passed to the registered object builder.
+        Returns:
+            instance of class type (descendant of GenericBuildArtefact) associated with type_descriptor_key
+        Raises:
+            ValueError: if type_descriptor_key is not registered
+        """
+        type_descriptor_key, builder = self._builder_for(type_descriptor_key)
+        artifact = builder(type_descriptor_key, *args, **kwargs)
+        if inspect.isawaitable(artifact):
+            artifact = await artifact
+        return artifact
+
+    async def build_many(  # type: ignore[override]
+        self,
+        type_descriptor_key: Union[StrDescriptor, IntDescriptor, None] = None,
+        iterable_of_kwargs: Iterable[Mapping[str, Any]] = (),
+        concurrency: Optional[int] = DEFAULT_CONCURRENCY,
+    ) -> List[TGenericBuildArtifact]:
+        """Build one object per keyword-argument mapping, see AsyncBuilder.build_many(). Objects of
+        synchronous builders are built in one go.
+        Args:
+            type_descriptor_key: The enum-derived descriptor identifying the class-object to be built.
+            iterable_of_kwargs: per-build keyword arguments, one mapping per object to be built
+            concurrency: maximum number of asynchronous initializations running at the same time, None for no limit
+        Returns:
+            list of built objects, in the order of the mappings
+        """
+        type_descriptor_key, builder = self._builder_for(type_descriptor_key)
+        if isinstance(builder, AsyncBuilder):
+            return await builder.build_many(type_descriptor_key, iterable_of_kwargs, concurrency)
+        return builder.build_many(type_descriptor_key, iterable_of_kwargs)  # type: ignore
+
+    async def build_columns(  # type: ignore[override]
+        self,
+        type_descriptor_key: Union[StrDescriptor, IntDescriptor, None] = None,
+        *columns: Sequence[Any],
+        concurrency: Optional[int] = DEFAULT_CONCURRENCY,
+        **keyword_columns: Sequence[Any],
+    ) -> List[TGenericBuildArtifact]:
+        """Build one object per row of parallel argument sequences, see AsyncBuilder.build_columns().
+        Args:
+            concurrency: maximum number of asynchronous initializations running at the same time, None for no limit
+        Returns:
+            list of built objects, in row order
+        """
+        type_descriptor_key, builder = self._builder_for(type_descriptor_key)
+        if isinstance(builder, AsyncBuilder):
+            return await builder.build_columns(
+                type_descriptor_key, *columns, concurrency=concurrency, **keyword_columns
+            )
+        return builder.build_columns(type_descriptor_key, *columns, **keyword_columns)  # type: ignore
+
+    async def build_from_value(self, type_descriptor_value: Any, *args, **kwargs) -> TGenericBuildArtifact:  # type: ignore[override]
+        """Build an object for the raw value of a registered descriptor, see Factory.build_from_value().
+        Raises:
+            ValueError: if no registered descriptor has this value or several registered descriptors have it
+        """
+        type_descriptor_key, builder = self._builder_for_value(type_descriptor_value)
+        artifact = builder(type_descriptor_key, *args, **kwargs)
+        if inspect.isawaitable(artifact):
+            artifact = await artifact
+        return artifact
+
+    async def build_many_from_values(  # type: ignore[override]
+        self,
+        requests: Iterable[Tuple[Any, Mapping[str, Any]]],
+        concurrency: Optional[int] = DEFAULT_CONCURRENCY,
+    ) -> List[TGenericBuildArtifact]:
+        """Build one object per (raw descriptor value, keyword arguments) request, see Factory.build_many_from_values().
+        The groups of requests are built one after the other, the objects of a group concurrently.
+        Args:
+            requests: pairs of descriptor value and per-build keyword arguments
+            concurrency: maximum number of asynchronous initializations running at the same time, None for no limit
+        Returns:
+            list of built objects, in the order of the requests
+        Raises:
+            ValueError: if a value belongs to no or several registered descriptors
+        """
+        groups, count = self._group_by_value(requests)
+        built: List[Any] = [None] * count
+        for type_descriptor_key, builder, positions, kwargs_list in groups:
+            if isinstance(builder, AsyncBuilder):
+                artifacts = await builder.build_many(type_descriptor_key, kwargs_list, concurrency)
+            else:
+                artifacts = builder.build_many(type_descriptor_key, kwargs_list)  # type: ignore
+            for position, artifact in zip(positions, artifacts):
+                built[position] = artifact
+        return built
@@ -1,7 +1,50 @@
-from typing import Type, TypeVar, Union, List, Dict
+import threading
+from functools import partial
+from itertools import starmap, zip_longest
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
 
+from ..utility.concurrent_counter import ConcurrentCounter
 from .descriptor import StrDescriptor, IntDescriptor, auto
 from .generic_build_artefact import GenericBuildArtifact, TGenericBuildArtifact
+from .instrumentation import BuildInstrumentation
+from .lazy_reference import LazyReference, as_artifact_type
+
+# marks an exhausted column in _zip_columns()
+_EXHAUSTED = object()
+
+
+def _zip_columns(owner: str, columns: Sequence[Iterable[Any]]) -> Iterator[Tuple[Any, ...]]:
+    """Zip the argument columns of build_columns() into rows, raising ValueError if they differ in length.
+    Sized columns are compared up front; iterators are checked while the rows are taken, as zip(strict=True)
+    does from Python 3.10 on.
+    """
+    lengths = {len(column) for column in columns if hasattr(column, "__len__")}  # type: ignore[arg-type]
+    if len(lengths) > 1:
+        raise ValueError(f"{owner}: argument columns differ in length {sorted(lengths)}.")
+    if all(hasattr(column, "__len__") for column in columns):
+        return zip(*columns)
+    return _strict_rows(owner, columns)
+
+
+def _strict_rows(owner: str, columns: Sequence[Iterable[Any]]) -> Iterator[Tuple[Any, ...]]:
+    for row in zip_longest(*columns, fillvalue=_EXHAUSTED):
+        if any(value is _EXHAUSTED for value in row):
+            raise ValueError(f"{owner}: argument columns differ in length.")
+        yield row
 
 
 class GenericBuilder:
@@ -31,14 +74,15 @@ class GenericBuilder:
     def __init__(
         self,
         type_descriptor_key: Union[None, StrDescriptor, IntDescriptor] = None,
-        artifact_type: Union[None, Type[TGenericBuildArtifact]] = None,
+        artifact_type: Union[None, Type[TGenericBuildArtifact], str, LazyReference] = None,
         *args,
         **kwargs,
     ):
         """Initialize the generic object builder class and register a first Descriptor/Class-to-be-built pair.
         Args:
             type_descriptor_key (Union[StrDescriptor,IntDescriptor]): The enum-derived descriptor identifying the class-object to be built.
-            artifact_type: (Type[TGenericBuildArtifact]): The class type to be built. Must be derived from GenericBuildArtifact
+            artifact_type: (Type[TGenericBuildArtifact]): The class type to be built. Must be derived from GenericBuildArtifact.
+                Can be given as lazy reference, see register().
             *args, *kwargs: arbitrary positional and/or keyword arguments that are stored and handed to the class-constructor when creating
                 one of the registered objects. Kind of fixed arguments that any class built by this builder receives.
         Raises:
@@ -46,11 +90,20 @@ class GenericBuilder:
         Returns:
             builder object
         """
-        self._count: int = 0
+        self._counter = ConcurrentCounter()
+        self._counter_cells = self._counter.thread_local
+        # registration is serialized by the lock and replaces the registries and fixed arguments
+        # by updated copies, so builds read consistent snapshots without locking
+        self._lock = threading.RLock()
+        self._registry: Dict = {}
+        # per registered key: the artifact type with the fixed arguments already bound;
+        # key None maps to the first registered artifact type
+        self._compiled_registry: Dict[Any, Callable[..., Any]] = {}
         self._fixed_args: List = list()
         self._fixed_kwargs: Dict = {}
+        # wraps the compiled entries if enabled, so uninstrumented builds have no overhead
+        self._instrumentation: Optional[BuildInstrumentation] = None
         self.set_fixed_args(*args, **kwargs)
-        self._registry: Dict = {}
         if type_descriptor_key is not None and artifact_type is not None:
             self.register(type_descriptor_key, artifact_type)
         elif (type_descriptor_key is not None and artifact_type is None) or (
@@ -69,6 +122,8 @@ class GenericBuilder:
     ) -> TGenericBuildArtifact:
         """Creates an object identified by type_descriptor_key. The object type has to be registered using register().
         Increases the internal counter counting how many objects the builder has built so far.
+        The constructor call including the fixed arguments is precompiled by register() and set_fixed_args(),
+        so a build is a single lookup and call.
         Args:
             type_descriptor_key (Union[StrDescriptor,IntDescriptor]): The enum-derived descriptor identifying the class-object
                 to be built. If type_descriptor_key is left out, the first registered class type is built. In case you leave out
@@ -99,21 +154,311 @@ class GenericBuilder:
 
         ```
         """
-        self._count += 1
+        # ConcurrentCounter.increment() inlined, builds are counted on every call
+        try:
+            self._counter_cells.cell.value += 1
+        except AttributeError:
+            self._counter.increment()
+        try:
+            build = self._compiled_registry[type_descriptor_key]
+        except KeyError:
+            build = self._compiled_registry[self._resolve_key(type_descriptor_key)]
+        if kwargs and self._fixed_kwargs and not self._fixed_kwargs.keys().isdisjoint(kwargs):
+            self._raise_duplicate_kwargs(kwargs)
+        return build(*args, **kwargs)
+
+    def _resolve_key(
+        self, type_descriptor_key: Union[StrDescriptor, IntDescriptor, None]
+    ) -> Union[StrDescriptor, IntDescriptor]:
+        """Slow path of __call__(): map a missing key to the first registered one or
+        raise the appropriate error.
+        """
         if type_descriptor_key is None:
             if self._registry == {}:
                 raise ValueError(
                     f"{self.__class__.__name__}: No build artifacts registered, don't know what to build."
                 )
-            type_descriptor_key = next(iter(self._registry))
-        if type_descriptor_key not in self._registry:
-            raise ValueError(
-                f"{self.__class__.__name__}: type_descriptor_key {type_descriptor_key} not yet registered, don't know what to build."
-            )
-        return self._registry[type_descriptor_key](
-            *self._fixed_args, *args, **self._fixed_kwargs, **kwargs
+            return next(iter(self._registry))
+        raise ValueError(
+            f"{self.__class__.__name__}: type_descriptor_key {type_descriptor_key} not yet registered, don't know what to build."
         )
 
+    def _check_duplicate_kwargs(self, kwargs: Dict[str, Any]) -> None:
+        """Raise the same TypeError as a call with keyword arguments given both as fixed and as per-build argument."""
+        if not self._fixed_kwargs.keys().isdisjoint(kwargs):
+            self._raise_duplicate_kwargs(kwargs)
+
+    def _raise_duplicate_kwargs(self, kwargs: Mapping[str, Any]) -> None:
+        """Raise the TypeError for keyword arguments known to overlap the fixed keyword arguments."""
+        duplicate = next(key for key in kwargs if key in self._fixed_kwargs)
+        raise TypeError(
+            f"{self.__class__.__name__}: got multiple values for keyword argument '{duplicate}'"
+        )
+
+    def _compile(self, artifact_type: Type[TGenericBuildArtifact]) -> Callable[..., Any]:
+        """Return the callable building artifact_type with the fixed arguments bound,
+        so that a build is a single call.
+        """
+        if not self._fixed_args and not self._fixed_kwargs:
+            return artifact_type
+        return partial(artifact_type, *self._fixed_args, **self._fixed_kwargs)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Support pickling, eg. to replicate builders into worker processes: the lock and the
+        compiled registry are not pickled but recreated when unpickling.
+        """
+        state = self.__dict__.copy()
+        del state["_lock"]
+        del state["_compiled_registry"]
+        del state["_counter_cells"]
+        # copies record no metrics, eg. builds in worker processes are not included
+        state["_instrumentation"] = None
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._counter_cells = self._counter.thread_local
+        self._lock = threading.RLock()
+        self._recompile()
+
+    def _compile_entry(self, type_descriptor_key: Any, artifact_type: Type[TGenericBuildArtifact]) -> Callable[..., Any]:
+        """Return the compiled registry entry for a registered pair; hook for derived builders."""
+        return self._compile(artifact_type)
+
+    def _recompile(self) -> None:
+        """Rebuild the compiled registry, eg. after the fixed arguments changed. The new registry
+        replaces the old one in a single assignment, so concurrent builds never see a partial update.
+        """
+        compiled_registry = {
+            key: self._compile_lazy(key, artifact_type)
+            if isinstance(artifact_type, LazyReference)
+            else self._compile_entry(key, artifact_type)
+            for key, artifact_type in self._registry.items()
+        }
+        instrumentation = self._instrumentation
+        if instrumentation is not None:
+            # lazy entries are left as they are, they build through the instrumented entry once resolved
+            compiled_registry = {
+                key: build
+                if isinstance(self._registry[key], LazyReference)
+                else instrumentation.instrument(key, build)
+                for key, build in compiled_registry.items()
+            }
+        if compiled_registry:
+            compiled_registry[None] = next(iter(compiled_registry.values()))
+        self._compiled_registry = compiled_registry
+
+    def _compile_lazy(self, type_descriptor_key: Any, reference: LazyReference) -> Callable[..., Any]:
+        """Return the registry entry of a lazy reference: on the first build, resolve it and replace it
+        by the referenced class, then build through the regular compiled entry.
+        """
+
+        def build(*args, **kwargs):
+            self._resolve_reference(type_descriptor_key, reference)
+            return self._compiled_registry[type_descriptor_key](*args, **kwargs)
+
+        return build
+
+    def _resolve_reference(self, type_descriptor_key: Any, reference: LazyReference) -> None:
+        artifact_type = reference.resolve()
+        with self._lock:
+            if self._registry.get(type_descriptor_key) is reference:
+                registry = dict(self._registry)
+                registry[type_descriptor_key] = artifact_type
+                self._registry = registry
+                self._recompile()
+
+    def prewarm(self, background: bool = False) -> Optional[threading.Thread]:
+        """Resolve all lazily registered artifact classes now instead of on their first build.
+        Args:
+            background: resolve in a daemon thread; errors are ignored there and raised again on the first build
+        Returns:
+            the started thread if background is True, else None
+        Raises:
+            ImportError, AttributeError: if a reference cannot be resolved and background is False
+
+        Example:
+        ```python
+        >>> class MyDescriptor(IntDescriptor):
+        ...     fraction= auto()
+        >>> builder= GenericBuilder(MyDescriptor.fraction, "fractions:Fraction")
+        >>> builder.prewarm()
+        >>> print(builder)
+        Builder 'GenericBuilder' building [fraction: 1 => Fraction]
+        >>> builder(numerator= 3, denominator= 4)
+        Fraction(3, 4)
+
+        ```
+        """
+
+        def resolve_all() -> None:
+            for key, artifact_type in list(self._registry.items()):
+                if isinstance(artifact_type, LazyReference):
+                    self._resolve_reference(key, artifact_type)
+
+        if not background:
+            resolve_all()
+            return None
+
+        def resolve_all_quietly() -> None:
+            try:
+                resolve_all()
+            except Exception:
+                # the unresolved reference raises the same error again on its first build
+                pass
+
+        thread = threading.Thread(
+            target=resolve_all_quietly, name=f"{self.__class__.__name__}-prewarm", daemon=True
+        )
+        thread.start()
+        return thread
+
+    def build_many(
+        self,
+        type_descriptor_key: Union[StrDescriptor, IntDescriptor, None] = None,
+        iterable_of_kwargs: Iterable[Mapping[str, Any]] = (),
+        lazy: bool = False,
+    ) -> Union[List[TGenericBuildArtifact], Iterator[TGenericBuildArtifact]]:
+        """Build one object of the type identified by type_descriptor_key per keyword-argument mapping.
+        The registry entry is resolved once for the whole batch and the build counter is increased
+        once by the batch size.
+        Args:
+            type_descriptor_key (Union[StrDescriptor,IntDescriptor]): The enum-derived descriptor identifying the class-object
+                to be built. If None, the first registered class type is built.
+            iterable_of_kwargs: per-build keyword arguments, one mapping per object to be built
+            lazy: if True, return a generator building the objects on iteration; the counter is increased
+                when the generator is exhausted or closed
+        As with single builds, a failing build is counted, too.
+        Returns:
+            list of built objects or, if lazy, a generator of built objects
+        Raises:
+            ValueError: if type_decriptor_key is not registered or registry is accidentally empty
+
+        Example:
+        ```python
+        >>> class MyClass(GenericBuildArtifact):
+        ...     def __init__(self, context, some_arg):
+        ...         self._some= f"{context}-{some_arg}"
+        >>> class MyDescriptor(IntDescriptor):
+        ...     myclass= auto()
+        >>> builder= GenericBuilder(MyDescriptor.myclass, MyClass, "ctx")
+        >>> objs= builder.build_many(MyDescriptor.myclass, [{"some_arg": 1}, {"some_arg": 2}])
+        >>> [obj._some for obj in objs]
+        ['ctx-1', 'ctx-2']
+        >>> builder.get_count()
+        2
+
+        ```
+        """
+        build = self._compiled_build(type_descriptor_key)
+        if self._fixed_kwargs:
+            iterable_of_kwargs = self._checked_kwargs(iterable_of_kwargs)
+        built = (build(**kwargs) for kwargs in iterable_of_kwargs)
+        if lazy:
+            return self._counting(built)
+        return self._counted_list(built)
+
+    def build_columns(
+        self,
+        type_descriptor_key: Union[StrDescriptor, IntDescriptor, None] = None,
+        *columns: Sequence[Any],
+        lazy: bool = False,
+        **keyword_columns: Sequence[Any],
+    ) -> Union[List[TGenericBuildArtifact], Iterator[TGenericBuildArtifact]]:
+        """Columnar variant of build_many(): build one object per row of parallel argument sequences.
+        The i-th object receives the i-th element of every positional column as positional argument
+        and the i-th element of every keyword column as keyword argument.
+        Args:
+            type_descriptor_key (Union[StrDescriptor,IntDescriptor]): The enum-derived descriptor identifying the class-object
+                to be built. If None, the first registered class type is built.
+            *columns: sequences or iterators of positional arguments, all of the same length
+            lazy: if True, return a generator building the objects on iteration
+            **keyword_columns: sequences or iterators of keyword arguments, named like the keyword, all of the same length
+        Returns:
+            list of built objects or, if lazy, a generator of built objects
+        Raises:
+            ValueError: if type_decriptor_key is not registered or the columns differ in length; for iterator columns
+                the error is raised when the shortest one is exhausted
+
+        Example:
+        ```python
+        >>> class MyClass(GenericBuildArtifact):
+        ...     def __init__(self, x, y, label= ""):
+        ...         self.point= (label, x, y)
+        >>> class MyDescriptor(IntDescriptor):
+        ...     myclass= auto()
+        >>> builder= GenericBuilder(MyDescriptor.myclass, MyClass)
+        >>> objs= builder.build_columns(MyDescriptor.myclass, [1, 2], [3, 4], label= ["a", "b"])
+        >>> [obj.point for obj in objs]
+        [('a', 1, 3), ('b', 2, 4)]
+
+        ```
+        """
+        rows = _zip_columns(self.__class__.__name__, columns + tuple(keyword_columns.values()))
+        if keyword_columns:
+            if self._fixed_kwargs:
+                self._check_duplicate_kwargs(keyword_columns)
+            build = self._compiled_build(type_descriptor_key)
+            names = tuple(keyword_columns)
+            positional_count = len(columns)
+            built: Iterator[TGenericBuildArtifact]
+            if positional_count == 0:
+                built = (build(**dict(zip(names, row))) for row in rows)
+            else:
+                built = (
+                    build(*row[:positional_count], **dict(zip(names, row[positional_count:])))
+                    for row in rows
+                )
+        else:
+            built = starmap(self._compiled_build(type_descriptor_key), rows)
+        if lazy:
+            return self._counting(built)
+        return self._counted_list(built)
+
+    def _compiled_build(
+        self, type_descriptor_key: Union[StrDescriptor, IntDescriptor, None]
+    ) -> Callable[..., Any]:
+        """Return the compiled constructor call for type_descriptor_key."""
+        try:
+            return self._compiled_registry[type_descriptor_key]
+        except KeyError:
+            return self._compiled_registry[self._resolve_key(type_descriptor_key)]
+
+    def _checked_kwargs(
+        self, iterable_of_kwargs: Iterable[Mapping[str, Any]]
+    ) -> Iterator[Mapping[str, Any]]:
+        """Pass keyword-argument mappings through, checking each against the fixed keyword arguments."""
+        for kwargs in iterable_of_kwargs:
+            self._check_duplicate_kwargs(kwargs)
+            yield kwargs
+
+    def _counting(
+        self, built: Iterator[TGenericBuildArtifact]
+    ) -> Iterator[TGenericBuildArtifact]:
+        """Pass built objects through and increase the counter once when done, counting a failing build, too."""
+        count = 0
+        try:
+            for artifact in built:
+                count += 1
+                yield artifact
+        except Exception:
+            count += 1
+            raise
+        finally:
+            self._counter.increment(count)
+
+    def _counted_list(self, built: Iterator[TGenericBuildArtifact]) -> List[TGenericBuildArtifact]:
+        """Build all objects and increase the counter once, counting a failing build, too."""
+        result: List[TGenericBuildArtifact] = []
+        try:
+            # extend() keeps the objects built before a failure
+            result.extend(built)
+        except Exception:
+            self._counter.increment(len(result) + 1)
+            raise
+        self._counter.increment(len(result))
+        return result
+
     def __str__(self):
         """Return a string showing what this builder can build, ie. showing registered Descriptors and class types.
         ```python
@@ -134,12 +479,13 @@ class GenericBuilder:
     def register(
         self,
         type_descriptor_key: Union[StrDescriptor, IntDescriptor],
-        artifact_type: Type[TGenericBuildArtifact],
+        artifact_type: Union[Type[TGenericBuildArtifact], str, LazyReference],
     ):
         """Register a type descriptor and its associated class to be built.
         Args:
             type_descriptor_key (Union[StrDescriptor,IntDescriptor]): The enum-derived descriptor identifying the class-object to be built.
-            artifact_type: (Type[TGenericBuildArtifact]): The class type to be built. Must be derived from GenericBuildArtifact
+            artifact_type: (Type[TGenericBuildArtifact]): The class type to be built. Must be derived from GenericBuildArtifact.
+                To defer importing the class until its first build, give a `"module:Class"` string or a LazyReference.
         Returns:
             None
         Raises:
@@ -165,15 +511,19 @@ class GenericBuilder:
             raise ValueError(
                 f"{self.__class__.__name__}: type_descriptor_key cannot be None."
             )
-        if type_descriptor_key in self._registry:
-            raise ValueError(
-                f"{self.__class__.__name__}: type_descriptor_key {type_descriptor_key} already registered to build {self._registry[type_descriptor_key]}."
-            )
         if artifact_type is None:
             raise ValueError(
                 f"{self.__class__.__name__}: artifact_type cannot be None."
             )
-        self._registry[type_descriptor_key] = artifact_type
+        with self._lock:
+            if type_descriptor_key in self._registry:
+                raise ValueError(
+                    f"{self.__class__.__name__}: type_descriptor_key {type_descriptor_key} already registered to build {self._registry[type_descriptor_key]}."
+                )
+            registry = dict(self._registry)
+            registry[type_descriptor_key] = as_artifact_type(artifact_type)
+            self._registry = registry
+            self._recompile()
 
     def set_fixed_args(self, *args, **kwargs) -> None:
         """Add positional and/or key-word arguments to the arguments that will be passed on each build of an
@@ -209,11 +559,12 @@ class GenericBuilder:
 
         ```
         """
-        for arg in args:
-            self._fixed_args.append(arg)
-
-        for key, value in kwargs.items():
-            self._fixed_kwargs[key] = value
+        with self._lock:
+            self._fixed_args = self._fixed_args + list(args)
+            fixed_kwargs = dict(self._fixed_kwargs)
+            fixed_kwargs.update(kwargs)
+            self._fixed_kwargs = fixed_kwargs
+            self._recompile()
 
     def init_hook(self) -> None:
         """Called at the end of __init__(). Avoids the need to overwrite __init__() in most cases.
@@ -238,7 +589,8 @@ class GenericBuilder:
         pass
 
     def get_count(self) -> int:
-        """Get number of object built so far by this builder instance.
+        """Get number of object built so far by this builder instance. Builds from all threads are counted,
+        the per-thread counts are summed on each call.
         Returns:
             built object count
 
@@ -258,7 +610,54 @@ class GenericBuilder:
 
         ```
         """
-        return self._count
+        return self._counter.value()
+
+    def enable_instrumentation(
+        self, instrumentation: Optional[BuildInstrumentation] = None
+    ) -> BuildInstrumentation:
+        """Record build counts, failures and construction latencies per descriptor, see BuildInstrumentation.
+        The compiled constructor calls are replaced by instrumented ones, builds of builders without
+        instrumentation are not slowed down at all.
+        Args:
+            instrumentation: collector of the metrics, eg. shared with other builders; a new one if None
+        Returns:
+            the collector of this builder's metrics
+        Example:
+        ```python
+        >>> class MyClass(GenericBuildArtifact):
+        ...     pass
+        >>> class MyDescriptor(IntDescriptor):
+        ...     myclass= auto()
+        >>> builder= GenericBuilder(MyDescriptor.myclass, MyClass)
+        >>> instrumentation= builder.enable_instrumentation()
+        >>> obj= builder(MyDescriptor.myclass)
+        >>> instrumentation.as_dict()["MyDescriptor.myclass"]["count"]
+        1
+
+        ```
+        """
+        with self._lock:
+            if instrumentation is None:
+                instrumentation = BuildInstrumentation()
+            self._instrumentation = instrumentation
+            self._recompile()
+        return instrumentation
+
+    def disable_instrumentation(self) -> None:
+        """Stop recording build metrics and restore the uninstrumented constructor calls."""
+        with self._lock:
+            self._instrumentation = None
+            self._recompile()
+
+    @property
+    def _count(self) -> int:
+        """The build count, same as get_count(); assigning it, eg. in init_hook(), restarts counting at the value."""
+        return self._counter.value()
+
+    @_count.setter
+    def _count(self, value: int) -> None:
+        self._counter = ConcurrentCounter(value)
+        self._counter_cells = self._counter.thread_local
 
 
 TGenericBuilder = TypeVar("TGenericBuilder", bound=GenericBuilder)
@@ -0,0 +1,158 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple, Type
+
+from ..utility.concurrent_counter import ConcurrentCounter
+from .builder import GenericBuilder
+from .descriptor import StrDescriptor, IntDescriptor, auto
+from .generic_build_artefact import GenericBuildArtifact, TGenericBuildArtifact
+
+_UNCHANGED = object()
+
+
+class CachingBuilder(GenericBuilder):
+    """Builder returning shared objects for repeated builds with equal arguments. Built objects are cached by
+    (type descriptor, positional arguments, keyword arguments) in a cache bounded by max_size entries, evicting the
+    least recently used entry, and optionally expiring entries ttl seconds after they were built.
+    Only use it for immutable objects or objects that can safely be shared. Builds with unhashable arguments are
+    not cached, they build a new object each time. As with functools.lru_cache, arguments comparing equal, eg. 1 and 1.0,
+    share the cached object. Changing the fixed arguments clears the cache.
+    A cache hit costs about as much as constructing a small object, caching pays off for objects costly to build.
+    Example:
+    ```python
+    >>> class Color(GenericBuildArtifact):
+    ...     def __init__(self, red, green, blue):
+    ...         self.rgb= (red, green, blue)
+    >>> class Palette(IntDescriptor):
+    ...     color= auto()
+    >>> builder= CachingBuilder(Palette.color, Color)
+    >>> builder(red= 255, green= 0, blue= 0) is builder(Palette.color, red= 255, green= 0, blue= 0)
+    True
+    >>> stats= builder.get_cache_stats()
+    >>> stats["hits"], stats["misses"], builder.get_count()
+    (1, 1, 2)
+
+    ```
+    """
+
+    #: :obj:`int` : default maximum number of cached objects
+    max_size: int = 128
+    #: :obj:`Optional[float]` : default time in seconds after which cached objects expire, None for never
+    ttl: Optional[float] = None
+
+    def __init__(self, *args, **kwargs):
+        """Initialize the caching builder, see GenericBuilder. The cache bounds are taken from the class
+        attributes max_size and ttl and can be changed with set_cache_options().
+        """
+        self._cache: "OrderedDict[Any, Tuple[Any, Optional[float]]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._hits = ConcurrentCounter()
+        self._misses = ConcurrentCounter()
+        self._evictions = ConcurrentCounter()
+        self._expirations = ConcurrentCounter()
+        self._uncached = ConcurrentCounter()
+        super().__init__(*args, **kwargs)
+
+    def _compile_entry(self, type_descriptor_key: Any, artifact_type: Type[TGenericBuildArtifact]) -> Callable[..., Any]:
+        """Return the build function for a registered pair: look up the cache, build on a miss."""
+        construct = self._compile(artifact_type)
+        cache = self._cache
+        cache_lock = self._cache_lock
+
+        def build(*args, **kwargs):
+            cache_key = (type_descriptor_key, args, tuple(sorted(kwargs.items())) if kwargs else ())
+            # entries are looked up without the lock, they are replaced as a whole; reordering the entries
+            # is left to holders of the lock, as it is not atomic without a global interpreter lock
+            try:
+                entry = cache.get(cache_key)
+            except TypeError:
+                self._uncached.increment()
+                return construct(*args, **kwargs)
+            if entry is not None:
+                if entry[1] is None or entry[1] > time.monotonic():
+                    with cache_lock:
+                        if cache_key in cache:
+                            cache.move_to_end(cache_key)
+                    self._hits.increment()
+                    return entry[0]
+                with cache_lock:
+                    if cache.get(cache_key) is entry:
+                        del cache[cache_key]
+                        self._expirations.increment()
+            self._misses.increment()
+            artifact = construct(*args, **kwargs)
+            if self.max_size == 0:
+                return artifact
+            ttl = self.ttl
+            expiry = time.monotonic() + ttl if ttl is not None else None
+            with cache_lock:
+                cache[cache_key] = (artifact, expiry)
+                cache.move_to_end(cache_key)
+                while len(cache) > self.max_size:
+                    cache.popitem(last=False)
+                    self._evictions.increment()
+            return artifact
+
+        return build
+
+    def set_fixed_args(self, *args, **kwargs) -> None:
+        """Add fixed arguments, see GenericBuilder.set_fixed_args(), and drop the objects built with the former
+        arguments. Registering further artifact types or resolving lazy references keeps the cached objects."""
+        with self._lock:
+            # builds running concurrently with the former arguments fill the dropped cache
+            self._cache = OrderedDict()
+            super().set_fixed_args(*args, **kwargs)
+
+    def set_cache_options(self, max_size: Optional[int] = None, ttl: Any = _UNCHANGED) -> None:
+        """Change the cache bounds of this builder; entries exceeding a smaller max_size are evicted.
+        Args:
+            max_size: maximum number of cached objects, 0 disables caching; unchanged if None
+            ttl: time in seconds after which newly cached objects expire, None for never; unchanged if not given
+        Raises:
+            ValueError: if max_size is negative or ttl is not positive
+        """
+        if max_size is not None and max_size < 0:
+            raise ValueError(f"{self.__class__.__name__}: max_size must not be negative, got {max_size}.")
+        if ttl is not _UNCHANGED and ttl is not None and ttl <= 0:
+            raise ValueError(f"{self.__class__.__name__}: ttl must be positive, got {ttl}.")
+        with self._cache_lock:
+            if max_size is not None:
+                self.max_size = max_size
+                while len(self._cache) > max_size:
+                    self._cache.popitem(last=False)
+                    self._evictions.increment()
+            if ttl is not _UNCHANGED:
+                self.ttl = ttl
+
+    def clear_cache(self) -> None:
+        """Drop all cached objects; the statistics are kept."""
+        with self._cache_lock:
+            self._cache.clear()
+
+    def get_cache_stats(self) -> Dict[str, int]:
+        """Get the cache statistics, eg. to size the cache. get_count() counts all builds, cached or not.
+        Returns:
+            numbers of builds served from the cache (hits), newly built and cached (misses), built without caching
+            because of unhashable arguments (uncached), of entries evicted to keep max_size (evictions) or dropped
+            because they expired (expirations) and the current number of cached objects (size)
+        """
+        return {
+            "hits": self._hits.value(),
+            "misses": self._misses.value(),
+            "uncached": self._uncached.value(),
+            "evictions": self._evictions.value(),
+            "expirations": self._expirations.value(),
+            "size": len(self._cache),
+        }
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Support pickling; cached objects are not pickled."""
+        state = super().__getstate__()
+        del state["_cache_lock"]
+        state["_cache"] = OrderedDict()
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self._cache_lock = threading.Lock()
+        super().__setstate__(state)
@@ -1,7 +1,38 @@
-from enum import Enum, IntEnum, auto
+from enum import Enum, EnumMeta, IntEnum, auto
+from typing import Any, Optional
 
 
-class StrDescriptor(str, Enum):
+class _DescriptorMeta(EnumMeta):
+    """Metaclass of StrDescriptor and IntDescriptor computing the allowed values and names and the reverse
+    lookup tables once, when the enum class is created, instead of on every call."""
+
+    def __new__(metacls, cls, bases, classdict, **kwargs):
+        enum_class = super().__new__(metacls, cls, bases, classdict, **kwargs)
+        _index_members(enum_class)
+        return enum_class
+
+
+def _index_members(enum_class: Any) -> None:
+    """Compute the cached allowed values and names and the lookup tables of a descriptor class."""
+    members = list(enum_class)
+    enum_class._allowed_values = tuple(member.value for member in members)
+    enum_class._allowed_names = tuple(member.name for member in members)
+    enum_class._allowed_value_set = frozenset(enum_class._allowed_values)
+    enum_class._allowed_name_set = frozenset(enum_class._allowed_names)
+    enum_class._member_by_value = {member.value: member for member in members}
+    # includes aliases, resolving them to their canonical member like cls[name]
+    enum_class._member_by_name = dict(enum_class.__members__)
+
+
+def _lookup(table: Any, key: Any, default: Any) -> Any:
+    try:
+        return table.get(key, default)
+    except TypeError:
+        # unhashable keys are no member
+        return default
+
+
+class StrDescriptor(str, Enum, metaclass=_DescriptorMeta):
     """Defines a str-based enum to be used with command-line options and
     in dict-like configurations validated with the [schema library](https://pypi.org/project/schema/)"""
 
@@ -21,7 +52,8 @@ class StrDescriptor(str, Enum):
 
     @classmethod
     def allowed_values(cls):
-        """Return the _values_ defined in an enum based on StrDescriptor class. This is useful for
+        """Return the _values_ defined in an enum based on StrDescriptor class as a tuple, computed once when the enum class
+        is created. This is useful for
         feeding the allowed values list into a check of command line arguments 
         and to translate them into enum-types instead of working with str throughout the application.
         Example:
@@ -33,7 +65,7 @@ class StrDescriptor(str, Enum):
         ...     john="doe"
         >>> allowed= FooBar.allowed_values()
         >>> allowed
-        ['bar', 'doe']
+        ('bar', 'doe')
         >>> @click.command()
         ... @click.argument('reporttype')
         ... def report(reporttype, type=FooBar):
@@ -46,11 +78,12 @@ class StrDescriptor(str, Enum):
 
         ```
         """
-        return [item.value for item in list(cls)]
+        return cls._allowed_values
 
     @classmethod
     def allowed_names(cls):
-        """Return the _names_ defined in an enum based on StrDescriptor class. This is useful for
+        """Return the _names_ defined in an enum based on StrDescriptor class as a tuple, computed once when the enum class
+        is created. This is useful for
         feeding the allowed names list into a [schema](https://pypi.org/project/schema/) definition
         and to translate them into enum-types instead of working with str throughout the application.
         Pendant to allowed_values() and useful when values shall have a different purpose. For example,
@@ -64,9 +97,9 @@ class StrDescriptor(str, Enum):
         ...     john="The guy who is named doe"
         >>> allowed= FooBar.allowed_names()
         >>> allowed
-        ['foo', 'john']
+        ('foo', 'john')
         >>> # Create a schema that accepts a dict with a key 'name' of type str, lowercases it, checks it against
-        >>> # the names defined in enum (['foo', 'john']) and returns the respective enum-type instead of the original str
+        >>> # the names defined in enum (('foo', 'john')) and returns the respective enum-type instead of the original str
         >>> # note the [] in 'FooBar[v]' in the last 'Use'-term, where the names are retrieved from the enum.
         >>> schema= Schema({'name': And(str, Use(str.lower), Or(*allowed), Use(lambda v: FooBar[v]))})
         >>> schema.validate({'name': 'FOO'})
@@ -74,7 +107,62 @@ class StrDescriptor(str, Enum):
 
         ```
         """
-        return [item.name for item in list(cls)]
+        return cls._allowed_names
+
+    @classmethod
+    def is_allowed_value(cls, value: Any) -> bool:
+        """Return whether value is one of the _values_ defined in an enum based on StrDescriptor class, in constant time.
+        Example:
+        ```python
+        >>> class FooBar(StrDescriptor):
+        ...     foo="bar"
+        >>> FooBar.is_allowed_value("bar"), FooBar.is_allowed_value(["unhashable"])
+        (True, False)
+
+        ```
+        """
+        try:
+            return value in cls._allowed_value_set
+        except TypeError:
+            return False
+
+    @classmethod
+    def is_allowed_name(cls, name: Any) -> bool:
+        """Return whether name is one of the _names_ defined in an enum based on StrDescriptor class, in constant time."""
+        try:
+            return name in cls._allowed_name_set
+        except TypeError:
+            return False
+
+    @classmethod
+    def from_value(cls, value: Any, default: Optional[Any] = None) -> Any:
+        """Return the member with the given _value_ or default, in constant time. Other than `cls(value)`, an unknown
+        value raises no exception, which makes it suitable for parsing loops.
+        Args:
+            value: value of the member to look up
+            default: returned if no member has this value
+        Example:
+        ```python
+        >>> class FooBar(StrDescriptor):
+        ...     foo="bar"
+        >>> FooBar.from_value("bar")
+        <FooBar.foo: 'bar'>
+        >>> FooBar.from_value("unknown") is None
+        True
+
+        ```
+        """
+        return _lookup(cls._member_by_value, value, default)
+
+    @classmethod
+    def from_name(cls, name: Any, default: Optional[Any] = None) -> Any:
+        """Return the member with the given _name_ or default, in constant time. Other than `cls[name]`, an unknown
+        name raises no exception.
+        Args:
+            name: name of the member to look up
+            default: returned if no member has this name
+        """
+        return _lookup(cls._member_by_name, name, default)
 
 
 class AutoStrDescriptor(StrDescriptor):
@@ -89,9 +177,9 @@ class AutoStrDescriptor(StrDescriptor):
     ...     john=auto()
     >>> allowed= FooBar.allowed_names()
     >>> allowed
-    ['foo', 'john']
+    ('foo', 'john')
     >>> # Create a schema that accepts a dict with a key 'name' of type str, lowercases it, checks it against
-    >>> # the names defined in enum (['foo', 'john']) and returns the respective enum-type instead of the original str
+    >>> # the names defined in enum (('foo', 'john')) and returns the respective enum-type instead of the original str
     >>> # note the [] in 'FooBar[v]' in the last 'Use'-term, where the names are retrieved from the enum.
     >>> schema= Schema({'name': And(str, Use(str.lower), Or(*allowed), Use(lambda v: FooBar[v]))})
     >>> schema.validate({'name': 'FOO'})
@@ -107,7 +195,7 @@ class AutoStrDescriptor(StrDescriptor):
         return name
 
 
-class IntDescriptor(IntEnum):
+class IntDescriptor(IntEnum, metaclass=_DescriptorMeta):
     """Defines an int-based enum to be used with command-line options and
     in dict-like configurations validated with the [schema library](https://pypi.org/project/schema/)"""
 
@@ -128,7 +216,8 @@ class IntDescriptor(IntEnum):
 
     @classmethod
     def allowed_values(cls):
-        """Return the _values_ defined in an enum based on IntDescriptor class. This is useful for
+        """Return the _values_ defined in an enum based on IntDescriptor class as a tuple, computed once when the enum class
+        is created. This is useful for
         feeding the allowed values list into a [schema](https://pypi.org/project/schema/) definition
         and to translate them into enum-types instead of working with int's throughout the application.
         Pendant to allowed_values() in StrDescriptor class.
@@ -140,9 +229,9 @@ class IntDescriptor(IntEnum):
         ...     john=auto()
         >>> allowed= FooBar.allowed_values()
         >>> allowed
-        [42, 43]
+        (42, 43)
         >>> # Create a schema that accepts a dict with a key 'name' of type int, checks it against
-        >>> # the values defined in enum ([42, 43]) and returns the respective enum-type instead of the original int
+        >>> # the values defined in enum ((42, 43)) and returns the respective enum-type instead of the original int
         >>> # note the () in 'FooBar(v)' in the last 'Use'-term, where the names are retrieved from the enum.
         >>> schema= Schema({'name': And(int, Or(*allowed), Use(lambda v: FooBar(v)))})
         >>> schema.validate({'name': 42})
@@ -150,11 +239,12 @@ class IntDescriptor(IntEnum):
 
         ```
         """
-        return [item.value for item in list(cls)]
+        return cls._allowed_values
 
     @classmethod
     def allowed_names(cls):
-        """Return the _names_ defined in an enum based on IntDescriptor class. This is useful for
+        """Return the _names_ defined in an enum based on IntDescriptor class as a tuple, computed once when the enum class
+        is created. This is useful for
         feeding the allowed names list into a [schema](https://pypi.org/project/schema/) definition
         and to translate them into enum-types instead of working with int's throughout the application.
         Pendant to allowed_names() in StrDescriptor class.
@@ -166,9 +256,9 @@ class IntDescriptor(IntEnum):
         ...     john=auto()
         >>> allowed= FooBar.allowed_names()
         >>> allowed
-        ['foo', 'john']
+        ('foo', 'john')
         >>> # Create a schema that accepts a dict with a key 'name' of type int, checks it against
-        >>> # the names defined in enum (['foo', 'john']) and returns the respective enum-type instead of the original int
+        >>> # the names defined in enum (('foo', 'john')) and returns the respective enum-type instead of the original int
         >>> # note the [] in 'FooBar[v]' in the last 'Use'-term, where the names are retrieved from the enum.
         >>> schema= Schema({'name': And(str, Or(*allowed), Use(lambda v: FooBar[v]))})
         >>> schema.validate({'name': 'foo'})
@@ -176,4 +266,59 @@ class IntDescriptor(IntEnum):
 
         ```
         """
-        return [item.name for item in list(cls)]
+        return cls._allowed_names
+
+    @classmethod
+    def is_allowed_value(cls, value: Any) -> bool:
+        """Return whether value is one of the _values_ defined in an enum based on IntDescriptor class, in constant time.
+        Example:
+        ```python
+        >>> class FooBar(IntDescriptor):
+        ...     foo=42
+        >>> FooBar.is_allowed_value(42), FooBar.is_allowed_value(["unhashable"])
+        (True, False)
+
+        ```
+        """
+        try:
+            return value in cls._allowed_value_set
+        except TypeError:
+            return False
+
+    @classmethod
+    def is_allowed_name(cls, name: Any) -> bool:
+        """Return whether name is one of the _names_ defined in an enum based on IntDescriptor class, in constant time."""
+        try:
+            return name in cls._allowed_name_set
+        except TypeError:
+            return False
+
+    @classmethod
+    def from_value(cls, value: Any, default: Optional[Any] = None) -> Any:
+        """Return the member with the given _value_ or default, in constant time. Other than `cls(value)`, an unknown
+        value raises no exception, which makes it suitable for parsing loops.
+        Args:
+            value: value of the member to look up
+            default: returned if no member has this value
+        Example:
+        ```python
+        >>> class FooBar(IntDescriptor):
+        ...     foo=42
+        >>> FooBar.from_value(42)
+        <FooBar.foo: 42>
+        >>> FooBar.from_value("unknown") is None
+        True
+
+        ```
+        """
+        return _lookup(cls._member_by_value, value, default)
+
+    @classmethod
+    def from_name(cls, name: Any, default: Optional[Any] = None) -> Any:
+        """Return the member with the given _name_ or default, in constant time. Other than `cls[name]`, an unknown
+        name raises no exception.
+        Args:
+            name: name of the member to look up
+            default: returned if no member has this name
+        """
+        return _lookup(cls._member_by_name, name, default)
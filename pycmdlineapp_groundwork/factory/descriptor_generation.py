@@ -0,0 +1,226 @@
+"""Descriptor enums generated at run time from configuration data, eg. catalogues of
+thousands of artifact types kept in a config file instead of an enum class written in code.
+
+Generated classes are cached in the process by their content, so generating
+the same descriptor again returns the same class. Descriptors generated from files
+additionally cache the parsed members on disk, keyed by a hash of the file content,
+so that later invocations of an application skip parsing the file.
+
+Before Python 3.11, the enum functional API takes time quadratic in the number of
+members, as every new member is compared with all members defined before to detect
+aliases. Descriptors are therefore generated by adding the members to an empty
+descriptor class, detecting aliases with the value lookup table in constant time.
+"""
+
+import hashlib
+import logging
+import marshal
+import os
+import sys
+import threading
+from enum import Enum
+from pathlib import Path
+from types import DynamicClassAttribute
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional, Tuple, Type, TypeVar, Union
+
+from ..utility.cache_dir import user_cache_dir
+from .descriptor import AutoStrDescriptor, IntDescriptor, StrDescriptor, _index_members
+
+logger = logging.getLogger(__name__)
+
+#: :obj:`int` :
+#: Version of the on-disk member cache layout, caches of other versions are ignored
+MEMBER_CACHE_FORMAT_VERSION: int = 1
+
+TDescriptor = TypeVar("TDescriptor", StrDescriptor, IntDescriptor)
+_MemberPairs = Tuple[Tuple[str, Any], ...]
+
+_generated: Dict[Tuple[Any, ...], Type[Enum]] = {}
+_generated_lock = threading.Lock()
+
+
+def _member_pairs(
+    members: Union[Mapping[str, Any], Iterable[str]], descriptor_type: Type[Enum]
+) -> _MemberPairs:
+    """Return (name, value) pairs, with values of None generated like auto() would."""
+    items = members.items() if isinstance(members, Mapping) else ((name, None) for name in members)
+    pairs = []
+    previous: list = []
+    for name, value in items:
+        if not isinstance(name, str):
+            raise TypeError(f"{descriptor_type.__name__}: member names need to be str, got {name!r}.")
+        if value is None:
+            # only the previous value is passed, newer Pythons sort all former values on every call
+            value = descriptor_type._generate_next_value_(name, 1, len(pairs), previous)  # type: ignore
+        pairs.append((name, value))
+        previous = [value]
+    return tuple(pairs)
+
+
+def _create_descriptor(
+    name: str, pairs: _MemberPairs, descriptor_type: Type[TDescriptor], module: Optional[str]
+) -> Type[TDescriptor]:
+    """Create the descriptor class, in time linear in the number of members."""
+    if sys.version_info >= (3, 11) or hasattr(descriptor_type, "__new_member__"):
+        # linear with the functional API, or a custom __new__ the members need to be created with
+        return descriptor_type(name, list(pairs), module=module or __name__)  # type: ignore
+
+    enum_class: Any = descriptor_type(name, [], module=module or __name__)  # type: ignore
+    member_type = enum_class._member_type_
+    dynamic_attributes = {
+        attribute
+        for base in enum_class.mro()
+        for attribute, value in base.__dict__.items()
+        if isinstance(value, DynamicClassAttribute)
+    }
+    # same steps as EnumMeta.__new__ of Python 3.7 to 3.10, except for the alias lookup
+    for member_name, value in pairs:
+        if member_name in enum_class._member_map_:
+            raise TypeError(f"Attempted to reuse key: {member_name!r}")
+        if member_name in ("mro", "") or (member_name[:1] == "_" and member_name[-1:] == "_"):
+            raise ValueError(f"Invalid enum member name: {member_name!r}")
+        args = value if isinstance(value, tuple) else (value,)
+        enum_member = member_type.__new__(enum_class, *args)
+        if not hasattr(enum_member, "_value_"):
+            enum_member._value_ = member_type(*args)
+        value = enum_member._value_
+        enum_member._name_ = member_name
+        enum_member.__objclass__ = enum_class
+        enum_member.__init__(*args)
+        canonical_member = enum_class._value2member_map_.get(value)
+        if canonical_member is not None:
+            enum_member = canonical_member
+        else:
+            enum_class._member_names_.append(member_name)
+            enum_class._value2member_map_[value] = enum_member
+        if member_name not in dynamic_attributes:
+            setattr(enum_class, member_name, enum_member)
+        enum_class._member_map_[member_name] = enum_member
+    _index_members(enum_class)
+    return enum_class
+
+
+def _cached_descriptor(key: Tuple[Any, ...], create: Callable[[], Type[TDescriptor]]) -> Type[TDescriptor]:
+    with _generated_lock:
+        descriptor = _generated.get(key)
+    if descriptor is None:
+        descriptor = create()
+        with _generated_lock:
+            # a class created concurrently for the same content wins, so that all callers share one class
+            descriptor = _generated.setdefault(key, descriptor)
+    return descriptor  # type: ignore
+
+
+def _type_id(descriptor_type: Type[Enum]) -> str:
+    return f"{descriptor_type.__module__}.{descriptor_type.__qualname__}"
+
+
+def descriptor_from_dict(
+    name: str,
+    members: Union[Mapping[str, Any], Iterable[str]],
+    descriptor_type: Type[TDescriptor] = AutoStrDescriptor,  # type: ignore
+    module: Optional[str] = None,
+) -> Type[TDescriptor]:
+    """Generate a descriptor enum class with the given members. Generating a descriptor with the same name, members,
+    descriptor type and module again returns the class generated before.
+    Args:
+        name: name of the generated class
+        members: mapping of member names to values, or member names only; values of None are generated like
+            auto() does, eg. the name for AutoStrDescriptor or the previous value + 1 for IntDescriptor
+        descriptor_type: StrDescriptor, AutoStrDescriptor, IntDescriptor or a subclass without members
+        module: module name the generated class is assigned to, for pickling the class needs to be
+            an attribute of this module under its name
+    Returns:
+        the generated descriptor class
+    Raises:
+        TypeError: if a member name is not a str or used twice
+        ValueError: if a member name is not allowed in enums, eg. `_sunder_` names
+    Example:
+    ```python
+    >>> Messages= descriptor_from_dict("Messages", ["message1", "message2"])
+    >>> Messages.message2, Messages.allowed_values()
+    (<Messages.message2: 'message2'>, ('message1', 'message2'))
+    >>> Levels= descriptor_from_dict("Levels", {"low": 10, "medium": None, "high": 30}, IntDescriptor)
+    >>> Levels.from_value(11)
+    <Levels.medium: 11>
+    >>> descriptor_from_dict("Messages", ["message1", "message2"]) is Messages
+    True
+
+    ```
+    """
+    pairs = _member_pairs(members, descriptor_type)
+    # keyed by the pairs themselves: serializations like marshal's depend on object identity, not only content
+    return _cached_descriptor(
+        (descriptor_type, name, module, pairs),
+        lambda: _create_descriptor(name, pairs, descriptor_type, module),
+    )
+
+
+def descriptor_from_file(
+    name: str,
+    file_path: Union[str, Path],
+    section: Optional[str] = None,
+    descriptor_type: Type[TDescriptor] = AutoStrDescriptor,  # type: ignore
+    module: Optional[str] = None,
+    cache_dir: Optional[Union[str, Path]] = None,
+    use_disk_cache: bool = True,
+) -> Type[TDescriptor]:
+    """Generate a descriptor enum class from the members in a config file loaded with
+    [load_dict_from_file][pycmdlineapp_groundwork.config.config_file_loaders.load_dict_from_file],
+    see descriptor_from_dict(). The parsed members are cached on disk by a hash of the file content, so
+    unchanged files are not parsed again, also not by later invocations of the application.
+    Args:
+        name: name of the generated class
+        file_path: path of a JSON, TOML or YAML file
+        section: selector of the members' mapping or list in the file, eg. `"catalogue.messages"`,
+            see [Selector][pycmdlineapp_groundwork.config.config_query.Selector]; the whole file if None
+        descriptor_type: StrDescriptor, AutoStrDescriptor, IntDescriptor or a subclass without members
+        module: module name the generated class is assigned to
+        cache_dir: directory of the member cache, defaults to `descriptors` in the user's cache directory
+        use_disk_cache: whether to read and write the member cache
+    Returns:
+        the generated descriptor class
+    Raises:
+        DictLoadError: if the file cannot be parsed
+        KeyError: if section does not exist in the file
+    """
+    file_path = Path(file_path)
+    digest = hashlib.sha256(
+        f"{MEMBER_CACHE_FORMAT_VERSION}\0{_type_id(descriptor_type)}\0{section}\0".encode("utf-8")
+        + file_path.read_bytes()
+    ).hexdigest()
+    cache_path = Path(cache_dir) if cache_dir is not None else user_cache_dir() / "descriptors"
+    cache_path = cache_path / f"{digest}.marshal"
+
+    def create() -> Type[TDescriptor]:
+        pairs = _read_member_cache(cache_path) if use_disk_cache else None
+        if pairs is None:
+            # imported here, so that generating from dicts does not import the config loaders
+            from ..config.config_file_loaders import load_dict_from_file
+            from ..config.config_query import select
+
+            data = load_dict_from_file(file_path)
+            pairs = _member_pairs(select(data, section) if section else data, descriptor_type)
+            if use_disk_cache:
+                _write_member_cache(cache_path, pairs)
+        return _create_descriptor(name, pairs, descriptor_type, module)
+
+    return _cached_descriptor((descriptor_type, name, module, digest), create)
+
+
+def _read_member_cache(cache_path: Path) -> Optional[_MemberPairs]:
+    try:
+        return marshal.loads(cache_path.read_bytes())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+
+
+def _write_member_cache(cache_path: Path, pairs: _MemberPairs) -> None:
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        # write to a temporary file and rename, so that concurrent invocations never read a partial cache
+        temporary_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        temporary_path.write_bytes(marshal.dumps(pairs))
+        os.replace(str(temporary_path), str(cache_path))
+    except (OSError, ValueError) as error:
+        logger.debug("Cannot write descriptor member cache %s: %s", cache_path, error)
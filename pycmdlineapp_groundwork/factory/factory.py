@@ -1,8 +1,14 @@
-from typing import Type, TypeVar, Union
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, Type, TypeVar, Union
 
 from .descriptor import StrDescriptor, IntDescriptor, auto
 from .generic_build_artefact import GenericBuildArtifact, TGenericBuildArtifact
 from .builder import GenericBuilder, TGenericBuilder
+from .instrumentation import BuildInstrumentation
+from .lazy_reference import LazyReference
+
+# dispatch table entry of a raw value shared by several registered descriptors
+_AMBIGUOUS = object()
 
 
 class Factory:
@@ -48,13 +54,20 @@ class Factory:
     """
 
     def __init__(self):
+        # replaced by an updated copy on registration (serialized by the lock), so builds
+        # read a consistent snapshot without locking
         self._builder_registry = {}
+        # raw descriptor values mapped to (descriptor, builder), updated along with the builder registry
+        self._dispatch_table: Dict[Any, Any] = {}
+        # enabled on all builders, also on builders registered later
+        self._instrumentation: Optional[BuildInstrumentation] = None
+        self._lock = threading.RLock()
 
     def register_builder(
         self,
         builder_type: Union[Type[TGenericBuilder], GenericBuilder],
         type_descriptor_key: Union[StrDescriptor, IntDescriptor, None] = None,
-        artifact_type: Union[Type[TGenericBuildArtifact], None] = None,
+        artifact_type: Union[Type[TGenericBuildArtifact], str, LazyReference, None] = None,
     ) -> None:
         """Register a builder, either by giving the builders class, the descriptor and the class type it shall create
         or by giving an already instantiated builder object. After registering, calling the factory with a descriptor uses
@@ -62,7 +75,8 @@ class Factory:
         Args:
             type_descriptor_key: The enum-derived descriptor identifying the class-object to be built.
             builder_type: The builder used to create instances of the artifact type. Must be derived from GenericBuilder.
-            artifact_type: The class type to be built. Must be derived from GenericBuildArtifact.
+            artifact_type: The class type to be built. Must be derived from GenericBuildArtifact. To defer importing
+                the class until its first build, give a `"module:Class"` string or a LazyReference.
 
         Example:
         ```python
@@ -111,32 +125,42 @@ class Factory:
                 f"{self.__class__.__name__}: artifact_type cannot be None, if"
                 " builder_type is not an instance of GenericBuilder."
             )
-        if (
-            type_descriptor_key is not None
-            and type_descriptor_key in self._builder_registry
-        ):
-            raise ValueError(
-                f"{self.__class__.__name__}: type_descriptor_key {type_descriptor_key}"
-                " already registered to build"
-                f" {self._builder_registry[type_descriptor_key]}."
-            )
-        if isinstance(builder_type, GenericBuilder):
-            for type_descriptor_key in builder_type._registry.keys():
-                if type_descriptor_key in self._builder_registry:
-                    raise ValueError(
-                        f"{self.__class__.__name__}: trying to register builder"
-                        f" '{builder_type}', but type_descriptor_key"
-                        f" {type_descriptor_key} already registered in factory to build"
-                        f" {self._builder_registry[type_descriptor_key]}."
-                    )
-                else:
-                    self._builder_registry[type_descriptor_key] = builder_type
-        else:
-            # artifact_type creates an error from mypy. Reason unknown. 
-            # Suspicion: mypy cannot deal with having builder_type either as "normal" variable or type-variable
-            self._builder_registry[type_descriptor_key] = builder_type(
-                type_descriptor_key, artifact_type  # type: ignore
-            )
+        with self._lock:
+            if (
+                type_descriptor_key is not None
+                and type_descriptor_key in self._builder_registry
+            ):
+                raise ValueError(
+                    f"{self.__class__.__name__}: type_descriptor_key {type_descriptor_key}"
+                    " already registered to build"
+                    f" {self._builder_registry[type_descriptor_key]}."
+                )
+            builder_registry = dict(self._builder_registry)
+            registered_count = len(builder_registry)
+            if isinstance(builder_type, GenericBuilder):
+                for type_descriptor_key in builder_type._registry.keys():
+                    if type_descriptor_key in builder_registry:
+                        raise ValueError(
+                            f"{self.__class__.__name__}: trying to register builder"
+                            f" '{builder_type}', but type_descriptor_key"
+                            f" {type_descriptor_key} already registered in factory to build"
+                            f" {builder_registry[type_descriptor_key]}."
+                        )
+                    else:
+                        builder_registry[type_descriptor_key] = builder_type
+            else:
+                # artifact_type creates an error from mypy. Reason unknown. 
+                # Suspicion: mypy cannot deal with having builder_type either as "normal" variable or type-variable
+                builder_registry[type_descriptor_key] = builder_type(
+                    type_descriptor_key, artifact_type  # type: ignore
+                )
+            dispatch_table = dict(self._dispatch_table)
+            for type_descriptor_key, builder in list(builder_registry.items())[registered_count:]:
+                _add_dispatch_entry(dispatch_table, type_descriptor_key, builder)
+                if self._instrumentation is not None:
+                    builder.enable_instrumentation(self._instrumentation)
+            self._dispatch_table = dispatch_table
+            self._builder_registry = builder_registry
 
     def __call__(
         self,
@@ -170,20 +194,363 @@ class Factory:
         >>> print(message1)
         foobar: johndoe
 
+        ```
+        """
+        try:
+            builder = self._builder_registry[type_descriptor_key]
+        except KeyError:
+            type_descriptor_key = self._resolve_key(type_descriptor_key)
+            builder = self._builder_registry[type_descriptor_key]
+        return builder(type_descriptor_key, *args, **kwargs)
+
+    def build_many(
+        self,
+        type_descriptor_key: Union[StrDescriptor, IntDescriptor, None] = None,
+        iterable_of_kwargs: Iterable[Mapping[str, Any]] = (),
+        lazy: bool = False,
+    ) -> Union[List[TGenericBuildArtifact], Iterator[TGenericBuildArtifact]]:
+        """Build one object referred to by type_descriptor_key per keyword-argument mapping.
+        The builder is looked up once for the whole batch, see `GenericBuilder.build_many`.
+        Args:
+            type_descriptor_key: The enum-derived descriptor identifying the class-object to be built.
+            iterable_of_kwargs: per-build keyword arguments, one mapping per object to be built
+            lazy: if True, return a generator building the objects on iteration
+        Returns:
+            list of built objects or, if lazy, a generator of built objects
+        Example:
+        ```python
+        >>> class MyMessage(GenericBuildArtifact):
+        ...     def __init__(self, context, text):
+        ...         self._text= f"{context}: {text}"
+        >>> class MyMessageTypes(IntDescriptor):
+        ...     message1= auto()
+        >>> message_provider= Factory()
+        >>> message_provider.register_builder(GenericBuilder(MyMessageTypes.message1, MyMessage, "foobar"))
+        >>> messages= message_provider.build_many(MyMessageTypes.message1, ({"text": text} for text in "ab"))
+        >>> [message._text for message in messages]
+        ['foobar: a', 'foobar: b']
+
+        ```
+        """
+        type_descriptor_key, builder = self._builder_for(type_descriptor_key)
+        return builder.build_many(type_descriptor_key, iterable_of_kwargs, lazy=lazy)
+
+    def build_columns(
+        self,
+        type_descriptor_key: Union[StrDescriptor, IntDescriptor, None] = None,
+        *columns: Sequence[Any],
+        lazy: bool = False,
+        **keyword_columns: Sequence[Any],
+    ) -> Union[List[TGenericBuildArtifact], Iterator[TGenericBuildArtifact]]:
+        """Build one object referred to by type_descriptor_key per row of parallel argument sequences,
+        see `GenericBuilder.build_columns`.
+        Args:
+            type_descriptor_key: The enum-derived descriptor identifying the class-object to be built.
+            *columns: sequences of positional arguments, all of the same length
+            lazy: if True, return a generator building the objects on iteration
+            **keyword_columns: sequences of keyword arguments, named like the keyword, all of the same length
+        Returns:
+            list of built objects or, if lazy, a generator of built objects
+        Example:
+        ```python
+        >>> class MyMessage(GenericBuildArtifact):
+        ...     def __init__(self, context, text):
+        ...         self._text= f"{context}: {text}"
+        >>> class MyMessageTypes(IntDescriptor):
+        ...     message1= auto()
+        >>> message_provider= Factory()
+        >>> message_provider.register_builder(GenericBuilder(MyMessageTypes.message1, MyMessage))
+        >>> messages= message_provider.build_columns(MyMessageTypes.message1, ["x", "y"], text= ["a", "b"])
+        >>> [message._text for message in messages]
+        ['x: a', 'y: b']
+
+        ```
+        """
+        type_descriptor_key, builder = self._builder_for(type_descriptor_key)
+        return builder.build_columns(
+            type_descriptor_key, *columns, lazy=lazy, **keyword_columns
+        )
+
+    def build_from_value(self, type_descriptor_value: Any, *args, **kwargs) -> TGenericBuildArtifact:
+        """Build an object for the raw value of a registered descriptor, eg. a str or int received from a queue
+        or another process, without converting it into the descriptor first. The builder is found in a
+        dispatch table of descriptor values, updated on registration.
+        Args:
+            type_descriptor_value: value of the descriptor identifying the class-object to be built, eg.
+                `MyMessageTypes.message1.value`
+            *args: Positional arguments passed to the registered object builder.
+            **kwargs: Keyword arguments passed to the registered object builder.
+        Returns:
+            instance of class type associated with the descriptor of this value
+        Raises:
+            ValueError: if no registered descriptor has this value or several registered descriptors have it
+        Example:
+        ```python
+        >>> class MyMessage(GenericBuildArtifact):
+        ...     def __init__(self, text):
+        ...         self._text= text
+        >>> class MyMessageTypes(StrDescriptor):
+        ...     message1= "msg1"
+        >>> message_provider= Factory()
+        >>> message_provider.register_builder(GenericBuilder, MyMessageTypes.message1, MyMessage)
+        >>> message_provider.build_from_value("msg1", text= "johndoe")._text
+        'johndoe'
+
+        ```
+        """
+        type_descriptor_key, builder = self._builder_for_value(type_descriptor_value)
+        return builder(type_descriptor_key, *args, **kwargs)
+
+    def build_many_from_values(
+        self, requests: Iterable[Tuple[Any, Mapping[str, Any]]]
+    ) -> List[TGenericBuildArtifact]:
+        """Build one object per (raw descriptor value, keyword arguments) request, see build_from_value().
+        Requests are grouped by value, so that each builder builds all its objects in one `build_many` run;
+        the objects are returned in the order of the requests. All values are checked before any object is built.
+        Args:
+            requests: pairs of descriptor value and per-build keyword arguments
+        Returns:
+            list of built objects, in the order of the requests
+        Raises:
+            ValueError: if a value belongs to no or several registered descriptors
+        Example:
+        ```python
+        >>> class MyMessage(GenericBuildArtifact):
+        ...     def __init__(self, text):
+        ...         self._text= text
+        >>> class MyMessageTypes(IntDescriptor):
+        ...     message1= auto()
+        ...     message2= auto()
+        >>> message_provider= Factory()
+        >>> message_provider.register_builder(GenericBuilder, MyMessageTypes.message1, MyMessage)
+        >>> message_provider.register_builder(GenericBuilder, MyMessageTypes.message2, MyMessage)
+        >>> messages= message_provider.build_many_from_values([(1, {"text": "a"}), (2, {"text": "b"}), (1, {"text": "c"})])
+        >>> [message._text for message in messages]
+        ['a', 'b', 'c']
+
+        ```
+        """
+        groups, count = self._group_by_value(requests)
+        built: List[Any] = [None] * count
+        for type_descriptor_key, builder, positions, kwargs_list in groups:
+            for position, artifact in zip(positions, builder.build_many(type_descriptor_key, kwargs_list)):
+                built[position] = artifact
+        return built
+
+    def _group_by_value(
+        self, requests: Iterable[Tuple[Any, Mapping[str, Any]]]
+    ) -> Tuple[List[Tuple[Any, GenericBuilder, List[int], List[Mapping[str, Any]]]], int]:
+        """Group requests by value into (descriptor, builder, positions, keyword arguments) and count them."""
+        groups: Dict[Any, Tuple[Any, GenericBuilder, List[int], List[Mapping[str, Any]]]] = {}
+        count = 0
+        for count, (value, kwargs) in enumerate(requests, 1):
+            try:
+                group = groups[value]
+            except (KeyError, TypeError):
+                group = groups[value] = (*self._builder_for_value(value), [], [])
+            group[2].append(count - 1)
+            group[3].append(kwargs)
+        return list(groups.values()), count
+
+    def _builder_for_value(self, value: Any) -> Tuple[Any, GenericBuilder]:
+        """Return the descriptor with this raw value and the builder registered for it."""
+        try:
+            entry = self._dispatch_table[value]
+        except (KeyError, TypeError):
+            raise ValueError(
+                f"{self.__class__.__name__}: no type_descriptor_key with value {value!r} registered,"
+                " don't know which builder to use."
+            ) from None
+        if entry is _AMBIGUOUS:
+            raise ValueError(
+                f"{self.__class__.__name__}: several registered type_descriptor_keys have value {value!r},"
+                " build with the descriptor instead."
+            )
+        return entry
+
+    def release(
+        self,
+        artifact: TGenericBuildArtifact,
+        type_descriptor_key: Union[StrDescriptor, IntDescriptor, None] = None,
+    ) -> bool:
+        """Hand an object back to the builder that built it for recycling, if that builder pools
+        its objects (see PooledBuilder). Objects of other builders are left to the garbage collector.
+        Args:
+            artifact: the object not used anymore
+            type_descriptor_key: The descriptor the object was built with. If None, it is looked up by the object's class.
+        Returns:
+            True if the object was put into a free list for recycling, False otherwise
+        Raises:
+            ValueError: if no registered builder builds objects of this descriptor or class
+        Example:
+        ```python
+        >>> from pycmdlineapp_groundwork.factory.pooled_builder import PooledBuilder
+        >>> class MyMessage(GenericBuildArtifact):
+        ...     def __init__(self, text):
+        ...         self._text= text
+        ...     def recycle_build_artifact(self, text):
+        ...         self._text= text
+        >>> class MyMessageTypes(IntDescriptor):
+        ...     message1= auto()
+        >>> message_provider= Factory()
+        >>> message_provider.register_builder(PooledBuilder, MyMessageTypes.message1, MyMessage)
+        >>> message= message_provider(MyMessageTypes.message1, text= "johndoe")
+        >>> message_provider.release(message)
+        True
+        >>> message_provider(MyMessageTypes.message1, text= "janedoe") is message
+        True
+
         ```
         """
         if type_descriptor_key is None:
-            if self._builder_registry == {}:
+            artifact_type = type(artifact)
+            for key, builder in self._builder_registry.items():
+                if builder._registry.get(key) is artifact_type:
+                    type_descriptor_key = key
+                    break
+            else:
                 raise ValueError(
-                    f"{self.__class__.__name__}: No build artifacts registered, don't"
-                    " know which builder to use."
+                    f"{self.__class__.__name__}: no builder registered for artifact type {artifact_type.__name__}."
                 )
-            type_descriptor_key = next(iter(self._builder_registry))
-        if type_descriptor_key not in self._builder_registry:
+        try:
+            builder = self._builder_registry[type_descriptor_key]
+        except KeyError:
             raise ValueError(
                 f"{self.__class__.__name__}: type_descriptor_key {type_descriptor_key}"
                 " not yet registered, don't know which builder to use."
-            )
-        return self._builder_registry[type_descriptor_key](
-            type_descriptor_key, *args, **kwargs
+            ) from None
+        release = getattr(builder, "release", None)
+        if release is None:
+            return False
+        return release(artifact, type_descriptor_key)
+
+    def prewarm(self, background: bool = False) -> Optional[threading.Thread]:
+        """Resolve the lazily registered artifact classes of all builders now instead of on their first build,
+        eg. while the command line is still being parsed.
+        Args:
+            background: resolve in a daemon thread; errors are ignored there and raised again on the first build
+        Returns:
+            the started thread if background is True, else None
+        Raises:
+            ImportError, AttributeError: if a reference cannot be resolved and background is False
+        Example:
+        ```python
+        >>> class MyTypes(IntDescriptor):
+        ...     fraction= auto()
+        ...     decimal= auto()
+        >>> factory= Factory()
+        >>> factory.register_builder(GenericBuilder, MyTypes.fraction, "fractions:Fraction")
+        >>> factory.register_builder(GenericBuilder, MyTypes.decimal, "decimal:Decimal")
+        >>> factory.prewarm()
+        >>> factory(MyTypes.decimal, "1.5")
+        Decimal('1.5')
+
+        ```
+        """
+        builders = self._builders()
+
+        def prewarm_all() -> None:
+            for builder in builders:
+                builder.prewarm()
+
+        if not background:
+            prewarm_all()
+            return None
+
+        def prewarm_all_quietly() -> None:
+            try:
+                prewarm_all()
+            except Exception:
+                # the unresolved reference raises the same error again on its first build
+                pass
+
+        thread = threading.Thread(
+            target=prewarm_all_quietly, name=f"{self.__class__.__name__}-prewarm", daemon=True
         )
+        thread.start()
+        return thread
+
+    def enable_instrumentation(
+        self, instrumentation: Optional[BuildInstrumentation] = None
+    ) -> BuildInstrumentation:
+        """Record build counts, failures and construction latencies per descriptor for all registered builders
+        and builders registered later, see GenericBuilder.enable_instrumentation().
+        Args:
+            instrumentation: collector of the metrics; a new one if None
+        Returns:
+            the collector of the factory's metrics, to export them with `as_dict()` or `to_prometheus()`
+        Example:
+        ```python
+        >>> class MyMessage(GenericBuildArtifact):
+        ...     def __init__(self, text):
+        ...         self._text= text
+        >>> class MyMessageTypes(IntDescriptor):
+        ...     message1= auto()
+        >>> message_provider= Factory()
+        >>> instrumentation= message_provider.enable_instrumentation()
+        >>> message_provider.register_builder(GenericBuilder, MyMessageTypes.message1, MyMessage)
+        >>> messages= message_provider.build_many(MyMessageTypes.message1, [{"text": "a"}, {"text": "b"}])
+        >>> instrumentation.as_dict()["MyMessageTypes.message1"]["count"]
+        2
+        >>> print(instrumentation.to_prometheus().splitlines()[-1])
+        pycmdlineapp_build_failures_total{descriptor="MyMessageTypes.message1"} 0
+
+        ```
+        """
+        with self._lock:
+            if instrumentation is None:
+                instrumentation = BuildInstrumentation()
+            self._instrumentation = instrumentation
+            for builder in self._builders():
+                builder.enable_instrumentation(instrumentation)
+        return instrumentation
+
+    def disable_instrumentation(self) -> None:
+        """Stop recording build metrics for all registered builders."""
+        with self._lock:
+            self._instrumentation = None
+            for builder in self._builders():
+                builder.disable_instrumentation()
+
+    def _builders(self) -> List[GenericBuilder]:
+        """Return the registered builders, each once."""
+        return list({id(builder): builder for builder in self._builder_registry.values()}.values())
+
+    def _builder_for(
+        self, type_descriptor_key: Union[StrDescriptor, IntDescriptor, None]
+    ):
+        """Return the resolved key and the builder registered for it."""
+        try:
+            return type_descriptor_key, self._builder_registry[type_descriptor_key]
+        except KeyError:
+            type_descriptor_key = self._resolve_key(type_descriptor_key)
+            return type_descriptor_key, self._builder_registry[type_descriptor_key]
+
+    def _resolve_key(
+        self, type_descriptor_key: Union[StrDescriptor, IntDescriptor, None]
+    ) -> Union[StrDescriptor, IntDescriptor]:
+        """Slow path of __call__(): map a missing key to the first registered one or
+        raise the appropriate error.
+        """
+        if type_descriptor_key is None:
+            if self._builder_registry == {}:
+                raise ValueError(
+                    f"{self.__class__.__name__}: No build artifacts registered, don't"
+                    " know which builder to use."
+                )
+            return next(iter(self._builder_registry))
+        raise ValueError(
+            f"{self.__class__.__name__}: type_descriptor_key {type_descriptor_key}"
+            " not yet registered, don't know which builder to use."
+        )
+
+
+def _add_dispatch_entry(dispatch_table: Dict[Any, Any], type_descriptor_key: Any, builder: GenericBuilder) -> None:
+    """Map the raw value of type_descriptor_key to the descriptor and its builder, marking values shared
+    by several descriptors, eg. members of different enums, as ambiguous."""
+    value = getattr(type_descriptor_key, "value", type_descriptor_key)
+    try:
+        dispatch_table[value] = _AMBIGUOUS if value in dispatch_table else (type_descriptor_key, builder)
+    except TypeError:
+        # unhashable values cannot be dispatched, the descriptor itself still can
+        pass
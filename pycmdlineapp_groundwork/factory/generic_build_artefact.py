@@ -1,4 +1,5 @@
-from typing import TypeVar
+from abc import ABCMeta
+from typing import Any, ClassVar, Dict, Tuple, TypeVar, Union
 
 
 class GenericBuildArtifact:
@@ -9,4 +10,73 @@ class GenericBuildArtifact:
     pass
 
 
-TGenericBuildArtifact = TypeVar("TGenericBuildArtifact", bound=GenericBuildArtifact)
+def _is_class_var(annotation: Any) -> bool:
+    if isinstance(annotation, str):
+        return annotation.replace("typing.", "").startswith("ClassVar")
+    return annotation is ClassVar or getattr(annotation, "__origin__", None) is ClassVar
+
+
+class _SlotsFromAnnotations(ABCMeta):
+    """Metaclass turning the annotated instance attributes of a class body into __slots__. Derived from ABCMeta,
+    so that abstract base classes can be mixed into slotted artifacts.
+    """
+
+    def __new__(
+        metacls, name: str, bases: Tuple[type, ...], namespace: Dict[str, Any], **kwargs
+    ):
+        if "__slots__" not in namespace:
+            annotations = namespace.get("__annotations__", {})
+            inherited = {
+                slot
+                for base in bases
+                for klass in base.__mro__
+                for slot in getattr(klass, "__slots__", ())
+            }
+            slots = tuple(
+                attribute
+                for attribute, annotation in annotations.items()
+                if not _is_class_var(annotation) and attribute not in inherited
+            )
+            conflicting = [attribute for attribute in slots if attribute in namespace]
+            if conflicting:
+                raise TypeError(
+                    f"{name}: annotated instance attributes {conflicting} must not have class-level defaults"
+                    " in a SlottedBuildArtifact, set them in __init__() or annotate them as ClassVar."
+                )
+            namespace["__slots__"] = slots
+        return super().__new__(metacls, name, bases, namespace, **kwargs)
+
+
+class SlottedBuildArtifact(metaclass=_SlotsFromAnnotations):
+    """Base class for compact build artifacts: the annotated instance attributes of each subclass become its
+    __slots__, so that objects carry no per-instance __dict__ and need considerably less memory. Annotations
+    wrapped in ClassVar stay class attributes; classes declaring __slots__ themselves are left as they are.
+    As with any slotted class, only the annotated attributes can be set on the objects, and every base class
+    mixed in needs __slots__ as well, otherwise the objects get a __dict__ again. For that reason this class
+    does not derive from GenericBuildArtifact; the builders accept both.
+    Example:
+    ```python
+    >>> from pycmdlineapp_groundwork.factory.builder import GenericBuilder
+    >>> from pycmdlineapp_groundwork.factory.descriptor import IntDescriptor, auto
+    >>> class Point(SlottedBuildArtifact):
+    ...     dimensions: ClassVar[int] = 2
+    ...     x: float
+    ...     y: float
+    ...     def __init__(self, x, y):
+    ...         self.x= x
+    ...         self.y= y
+    >>> class Shapes(IntDescriptor):
+    ...     point= auto()
+    >>> point= GenericBuilder(Shapes.point, Point)(x= 1.0, y= 2.0)
+    >>> Point.__slots__, hasattr(point, "__dict__")
+    (('x', 'y'), False)
+
+    ```
+    """
+
+    __slots__ = ()
+
+
+TGenericBuildArtifact = TypeVar(
+    "TGenericBuildArtifact", bound=Union[GenericBuildArtifact, SlottedBuildArtifact]
+)
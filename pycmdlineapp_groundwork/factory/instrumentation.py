@@ -0,0 +1,247 @@
+"""Optional build metrics for `GenericBuilder` and `Factory`: per-descriptor build and failure
+counts and construction latencies in fixed-bucket histograms.
+
+Instrumentation wraps the compiled constructor calls of a builder when it is enabled, so
+builds of uninstrumented builders run exactly the same code as before. Recording a build
+costs two clock reads, a bisection over the bucket bounds and a short locked update.
+"""
+
+import inspect
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+#: :obj:`Tuple[float, ...]` :
+#: Default upper bounds in seconds of the latency histogram buckets, from 1 microsecond to 10 seconds
+DEFAULT_LATENCY_BUCKETS: Tuple[float, ...] = (
+    1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+    1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+def descriptor_label(type_descriptor_key: Any) -> str:
+    """Return the name metrics of type_descriptor_key are reported under, eg. `"MyMessageTypes.message1"`."""
+    name = getattr(type_descriptor_key, "name", None)
+    if name is None:
+        return str(type_descriptor_key)
+    return f"{type(type_descriptor_key).__name__}.{name}"
+
+
+class BuildMetrics:
+    """Build metrics of one descriptor. Latencies are counted in fixed buckets, each counting the builds
+    that took at most its upper bound and more than the bound of the bucket before, plus a last bucket
+    for builds slower than all bounds.
+    Args:
+        buckets: ascending upper bounds of the histogram buckets in seconds
+    """
+
+    __slots__ = ("buckets", "counts", "failures", "total_seconds", "max_seconds", "_lock")
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts: List[int] = [0] * (len(self.buckets) + 1)
+        self.failures = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        """Count a successful build that took seconds."""
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            self.counts[index] += 1
+            self.total_seconds += seconds
+            if seconds > self.max_seconds:
+                self.max_seconds = seconds
+
+    def record_failure(self) -> None:
+        """Count a build that raised an exception."""
+        with self._lock:
+            self.failures += 1
+
+    @property
+    def count(self) -> int:
+        """Number of successful builds."""
+        return sum(self.counts)
+
+    def percentile(self, fraction: float) -> float:
+        """Estimate a latency percentile as the upper bound of the bucket it falls into; builds slower than
+        all bounds are estimated with the slowest build seen.
+        Args:
+            fraction: percentile as fraction between 0 and 1, eg. 0.99
+        Returns:
+            latency in seconds, NaN if nothing was built yet
+        """
+        with self._lock:
+            counts = list(self.counts)
+            max_seconds = self.max_seconds
+        total = sum(counts)
+        if total == 0:
+            return math.nan
+        rank = max(1, math.ceil(fraction * total))
+        cumulative = 0
+        for bound, count in zip(self.buckets, counts):
+            cumulative += count
+            if cumulative >= rank:
+                return min(bound, max_seconds)
+        return max_seconds
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the metrics as dict of plain values, eg. for JSON export."""
+        with self._lock:
+            counts = list(self.counts)
+            failures = self.failures
+            total_seconds = self.total_seconds
+        count = sum(counts)
+        cumulative = 0
+        buckets: Dict[str, int] = {}
+        for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+            cumulative += bucket_count
+            buckets[_format_bound(bound)] = cumulative
+        return {
+            "count": count,
+            "failures": failures,
+            "total_seconds": total_seconds,
+            "mean_seconds": total_seconds / count if count else math.nan,
+            "p50_seconds": self.percentile(0.5),
+            "p90_seconds": self.percentile(0.9),
+            "p99_seconds": self.percentile(0.99),
+            "buckets": buckets,
+        }
+
+
+class BuildInstrumentation:
+    """Collects the build metrics of the builders it is enabled on, per descriptor. One instance can be
+    shared by several builders, eg. all builders of a factory, see `Factory.enable_instrumentation()`.
+    Args:
+        buckets: ascending upper bounds of the latency histogram buckets in seconds
+    Raises:
+        ValueError: if buckets are not ascending
+    Example:
+    ```python
+    >>> from pycmdlineapp_groundwork.factory import GenericBuilder, GenericBuildArtifact, IntDescriptor, auto
+    >>> class Message(GenericBuildArtifact):
+    ...     def __init__(self, text):
+    ...         self.text= text
+    >>> class MessageTypes(IntDescriptor):
+    ...     message= auto()
+    >>> builder= GenericBuilder(MessageTypes.message, Message)
+    >>> instrumentation= builder.enable_instrumentation()
+    >>> _= builder(text= "hello")
+    >>> metrics= instrumentation.as_dict()["MessageTypes.message"]
+    >>> metrics["count"], metrics["failures"]
+    (1, 0)
+
+    ```
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        if any(lower >= upper for lower, upper in zip(buckets, buckets[1:])):
+            raise ValueError(f"{self.__class__.__name__}: buckets need to be ascending, got {buckets}.")
+        self.buckets = tuple(buckets)
+        self._metrics: Dict[str, BuildMetrics] = {}
+        self._lock = threading.Lock()
+
+    def metrics_for(self, type_descriptor_key: Any) -> BuildMetrics:
+        """Return the metrics of type_descriptor_key, created on first use."""
+        label = descriptor_label(type_descriptor_key)
+        metrics = self._metrics.get(label)
+        if metrics is None:
+            with self._lock:
+                metrics = self._metrics.setdefault(label, BuildMetrics(self.buckets))
+        return metrics
+
+    def instrument(self, type_descriptor_key: Any, build: Callable[..., Any]) -> Callable[..., Any]:
+        """Return build wrapped to record its latency and failures under type_descriptor_key; builds by coroutine
+        functions are timed until their coroutine finished."""
+        metrics = self.metrics_for(type_descriptor_key)
+        record = metrics.record
+        record_failure = metrics.record_failure
+        clock = time.perf_counter
+
+        if inspect.iscoroutinefunction(build):
+
+            async def instrumented_async_build(*args, **kwargs):
+                start = clock()
+                try:
+                    artifact = await build(*args, **kwargs)
+                except Exception:
+                    record_failure()
+                    raise
+                record(clock() - start)
+                return artifact
+
+            return instrumented_async_build
+
+        def instrumented_build(*args, **kwargs):
+            start = clock()
+            try:
+                artifact = build(*args, **kwargs)
+            except Exception:
+                record_failure()
+                raise
+            record(clock() - start)
+            return artifact
+
+        return instrumented_build
+
+    def as_dict(self) -> Dict[str, Dict[str, Any]]:
+        """Return the metrics of all descriptors, see BuildMetrics.as_dict(), keyed by descriptor label."""
+        return {label: metrics.as_dict() for label, metrics in list(self._metrics.items())}
+
+    def to_prometheus(self, prefix: str = "pycmdlineapp_build") -> str:
+        """Return the metrics in the Prometheus text exposition format: a histogram `<prefix>_duration_seconds`
+        and a counter `<prefix>_failures_total`, both labeled by descriptor.
+        Args:
+            prefix: prefix of the metric names
+        """
+        lines = [
+            f"# HELP {prefix}_duration_seconds Construction latency of built objects.",
+            f"# TYPE {prefix}_duration_seconds histogram",
+        ]
+        snapshot = sorted(self.as_dict().items())
+        for label, metrics in snapshot:
+            descriptor = _escape_label(label)
+            for bound, cumulative in metrics["buckets"].items():
+                lines.append(f'{prefix}_duration_seconds_bucket{{descriptor="{descriptor}",le="{bound}"}} {cumulative}')
+            lines.append(f'{prefix}_duration_seconds_sum{{descriptor="{descriptor}"}} {metrics["total_seconds"]!r}')
+            lines.append(f'{prefix}_duration_seconds_count{{descriptor="{descriptor}"}} {metrics["count"]}')
+        lines.append(f"# HELP {prefix}_failures_total Builds that raised an exception.")
+        lines.append(f"# TYPE {prefix}_failures_total counter")
+        for label, metrics in snapshot:
+            lines.append(f'{prefix}_failures_total{{descriptor="{_escape_label(label)}"}} {metrics["failures"]}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, file_path: Union[str, Path], prefix: str = "pycmdlineapp_build") -> None:
+        """Write the metrics in Prometheus text format to file_path, eg. for the textfile collector of the
+        node exporter. The file is replaced atomically, so collectors never read a partial file.
+        Args:
+            file_path: path of the `.prom` file to write
+            prefix: prefix of the metric names
+        """
+        file_path = Path(file_path)
+        temporary_path = file_path.with_name(f"{file_path.name}.{os.getpid()}.tmp")
+        temporary_path.write_text(self.to_prometheus(prefix), encoding="utf-8")
+        os.replace(str(temporary_path), str(file_path))
+
+    def reset(self) -> None:
+        """Drop all recorded metrics."""
+        with self._lock:
+            for metrics in self._metrics.values():
+                with metrics._lock:
+                    metrics.counts = [0] * len(metrics.counts)
+                    metrics.failures = 0
+                    metrics.total_seconds = 0.0
+                    metrics.max_seconds = 0.0
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == math.inf else repr(bound)
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,108 @@
+import importlib
+import threading
+from typing import Any, Callable, Dict, Optional, Type, Union
+
+
+class LazyReference:
+    """Reference to an artifact class that is imported or loaded on first use only. Can be registered with
+    GenericBuilder.register() and Factory.register_builder() in place of the class itself, so that registering
+    does not pay for importing every artifact module; `"module:Class"` strings are wrapped automatically.
+    The resolved class is cached.
+    Args:
+        target: either a `"package.module:Class"` string (nested attributes separated by dots, eg.
+            `"module:Outer.Inner"`) or a callable without arguments returning the class
+    Raises:
+        ValueError: if target is a string without module or attribute part
+        TypeError: if target is neither a string nor callable
+    Example:
+    ```python
+    >>> reference= LazyReference("fractions:Fraction")
+    >>> reference.__name__, reference.resolved
+    ('Fraction', False)
+    >>> reference.resolve()(3, 4)
+    Fraction(3, 4)
+    >>> reference.resolved
+    True
+
+    ```
+    """
+
+    __slots__ = ("_target", "_resolved", "_lock")
+
+    def __init__(self, target: Union[str, Callable[[], Type]]):
+        if isinstance(target, str):
+            module_name, _, attribute = target.partition(":")
+            if not module_name or not attribute:
+                raise ValueError(
+                    f"{self.__class__.__name__}: reference '{target}' needs the form 'module:Class'."
+                )
+        elif not callable(target):
+            raise TypeError(
+                f"{self.__class__.__name__}: reference needs to be a 'module:Class' string or a callable loader, got {target!r}."
+            )
+        self._target = target
+        self._resolved: Optional[Type] = None
+        self._lock = threading.Lock()
+
+    @property
+    def __name__(self) -> str:  # type: ignore[override]
+        """Name of the referenced class, known without resolving it for string references."""
+        if self._resolved is not None:
+            return self._resolved.__name__
+        if isinstance(self._target, str):
+            return self._target.rpartition(":")[2].rpartition(".")[2]
+        return getattr(self._target, "__name__", repr(self._target))
+
+    @property
+    def resolved(self) -> bool:
+        """Whether the reference has already been resolved."""
+        return self._resolved is not None
+
+    def resolve(self) -> Type:
+        """Import or load the referenced class, once.
+        Returns:
+            the referenced class
+        Raises:
+            ImportError: if the module cannot be imported
+            AttributeError: if the module has no such attribute
+        """
+        resolved = self._resolved
+        if resolved is None:
+            with self._lock:
+                if self._resolved is None:
+                    self._resolved = self._load()
+                resolved = self._resolved
+        return resolved
+
+    def _load(self) -> Type:
+        if not isinstance(self._target, str):
+            return self._target()
+        module_name, _, attribute = self._target.partition(":")
+        loaded: Any = importlib.import_module(module_name)
+        for name in attribute.split("."):
+            loaded = getattr(loaded, name)
+        return loaded
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self._target!r})"
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, LazyReference) and self._target == other._target
+
+    def __hash__(self) -> int:
+        return hash(self._target)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"_target": self._target, "_resolved": self._resolved}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self._target = state["_target"]
+        self._resolved = state["_resolved"]
+        self._lock = threading.Lock()
+
+
+def as_artifact_type(artifact_type: Any) -> Any:
+    """Wrap `"module:Class"` strings into a LazyReference, return anything else as it is."""
+    if isinstance(artifact_type, str):
+        return LazyReference(artifact_type)
+    return artifact_type
@@ -0,0 +1,218 @@
+"""Discovery of artifact classes from entry points of installed distributions.
+
+Scanning the entry points of all installed distributions reads the metadata of every
+distribution and is slow compared to the start-up time of a short command. Therefore
+`PluginIndex` stores the scan result in a JSON file together with a fingerprint of the
+installed distributions, made of the modification times of their metadata directories.
+As long as no distribution is installed, updated or removed, the index is read instead
+of scanning again.
+
+Plugins declare their artifact classes as entry points named like the type descriptor
+members they provide, eg. in a plugin's `pyproject.toml`:
+
+```toml
+[tool.poetry.plugins."my_app.messages"]
+"message1" = "my_plugin.messages:Message1"
+```
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sys
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type, Union
+
+from ..utility.cache_dir import user_cache_dir
+from .builder import GenericBuilder
+from .descriptor import IntDescriptor, StrDescriptor, auto
+from .factory import Factory
+from .lazy_reference import LazyReference
+
+logger = logging.getLogger(__name__)
+
+#: :obj:`str` :
+#: Version of the index file layout, indexes of other versions are rebuilt
+INDEX_FORMAT_VERSION: str = "1"
+
+_METADATA_SUFFIXES = (".dist-info", ".egg-info")
+
+
+def default_index_path() -> Path:
+    """Return the default location of the plugin index in the user's cache directory."""
+    return user_cache_dir() / "plugin_index.json"
+
+
+def distributions_fingerprint(paths: Optional[Sequence[str]] = None) -> str:
+    """Return a fingerprint of the distributions installed on the search path, made of the
+    names and modification times of their metadata directories. Only directory entries are
+    listed, no metadata is read, so this is cheap compared to an entry point scan.
+    Args:
+        paths: directories to look for distributions, defaults to sys.path
+    """
+    digest = hashlib.sha256()
+    for path in sys.path if paths is None else paths:
+        try:
+            entries = sorted(
+                (entry.name, entry.stat().st_mtime_ns)
+                for entry in os.scandir(path or ".")
+                if entry.name.endswith(_METADATA_SUFFIXES)
+            )
+        except OSError:
+            # not existing or no directory, eg. a zip archive
+            continue
+        digest.update(f"{path}\0".encode("utf-8", "surrogateescape"))
+        for name, mtime in entries:
+            digest.update(f"{name}\0{mtime}\0".encode("utf-8", "surrogateescape"))
+    return digest.hexdigest()
+
+
+def _scan_entry_points(paths: Optional[Sequence[str]] = None) -> Dict[str, List[Tuple[str, str]]]:
+    """Read the entry points of all installed distributions, grouped by entry point group."""
+    try:
+        from importlib import metadata
+    except ImportError:  # Python < 3.8
+        import importlib_metadata as metadata  # type: ignore
+
+    groups: Dict[str, List[Tuple[str, str]]] = {}
+    seen = set()
+    search = {} if paths is None else {"path": list(paths)}
+    for distribution in metadata.distributions(**search):
+        for entry_point in distribution.entry_points:
+            key = (entry_point.group, entry_point.name)
+            # the first distribution on the search path wins, as for imports
+            if key in seen:
+                continue
+            seen.add(key)
+            groups.setdefault(entry_point.group, []).append(
+                (entry_point.name, entry_point.value)
+            )
+    return groups
+
+
+class PluginIndex:
+    """Entry points of the installed distributions, cached in a JSON index file that is
+    rebuilt only if the fingerprint of the installed distributions changed.
+    Args:
+        index_path: location of the index file, defaults to `default_index_path()`
+        paths: directories to look for distributions, defaults to sys.path
+    """
+
+    def __init__(
+        self,
+        index_path: Optional[Union[str, Path]] = None,
+        paths: Optional[Sequence[str]] = None,
+    ):
+        self.index_path = Path(index_path) if index_path is not None else default_index_path()
+        self.paths = paths
+        self._groups: Optional[Dict[str, List[Tuple[str, str]]]] = None
+
+    def entry_points(self, group: str) -> List[Tuple[str, str]]:
+        """Return the entry points of group as (name, "module:attr") pairs.
+        Args:
+            group: entry point group, eg. "my_app.messages"
+        """
+        if self._groups is None:
+            self._groups = self._load()
+        return list(self._groups.get(group, []))
+
+    def _load(self) -> Dict[str, List[Tuple[str, str]]]:
+        fingerprint = distributions_fingerprint(self.paths)
+        try:
+            index = json.loads(self.index_path.read_text(encoding="utf-8"))
+            if (
+                index.get("format_version") == INDEX_FORMAT_VERSION
+                and index.get("fingerprint") == fingerprint
+            ):
+                return {
+                    group: [tuple(entry) for entry in entries]  # type: ignore
+                    for group, entries in index["groups"].items()
+                }
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+        logger.debug("Plugin index %s outdated or missing, scanning entry points.", self.index_path)
+        groups = _scan_entry_points(self.paths)
+        self._write(fingerprint, groups)
+        return groups
+
+    def _write(self, fingerprint: str, groups: Dict[str, List[Tuple[str, str]]]) -> None:
+        index = {"format_version": INDEX_FORMAT_VERSION, "fingerprint": fingerprint, "groups": groups}
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            # write to a temporary file and rename, so that concurrent commands never read a partial index
+            temporary_path = self.index_path.with_name(f"{self.index_path.name}.{os.getpid()}.tmp")
+            temporary_path.write_text(json.dumps(index), encoding="utf-8")
+            os.replace(str(temporary_path), str(self.index_path))
+        except OSError as error:
+            logger.debug("Cannot write plugin index %s: %s", self.index_path, error)
+
+    def invalidate(self) -> None:
+        """Forget the loaded entry points and delete the index file, forcing a new scan."""
+        self._groups = None
+        try:
+            self.index_path.unlink()
+        except OSError:
+            pass
+
+
+def discover_plugins(
+    factory: Factory,
+    group: str,
+    descriptor_type: Type[Enum],
+    builder_type: Type[GenericBuilder] = GenericBuilder,
+    index: Optional[PluginIndex] = None,
+) -> List[Any]:
+    """Register the artifact classes declared as entry points of group with factory. Entry point names are the
+    names of descriptor_type members, their values the `"module:Class"` of the artifact class. The classes are
+    registered as LazyReference, so no plugin module is imported before its first build.
+    Entry points whose names are no member of descriptor_type or whose descriptor is already registered with the
+    factory are skipped with a log message.
+    Args:
+        factory: factory to register the builders with
+        group: entry point group, eg. "my_app.messages"
+        descriptor_type: the StrDescriptor or IntDescriptor enum whose members the entry point names refer to
+        builder_type: builder class to register for each artifact class
+        index: plugin index to use, defaults to a PluginIndex at the default location
+    Returns:
+        the registered descriptors
+    Example:
+    ```python
+    >>> import tempfile
+    >>> class Numbers(IntDescriptor):
+    ...     fraction= auto()
+    >>> with tempfile.TemporaryDirectory() as distributions:
+    ...     dist_info= Path(distributions, "numbers_plugin-1.0.dist-info")
+    ...     dist_info.mkdir()
+    ...     _= (dist_info / "METADATA").write_text("Name: numbers_plugin\\nVersion: 1.0\\n")
+    ...     _= (dist_info / "entry_points.txt").write_text("[my_app.numbers]\\nfraction = fractions:Fraction\\n")
+    ...     factory= Factory()
+    ...     index= PluginIndex(Path(distributions, "index.json"), paths= [distributions])
+    ...     discover_plugins(factory, "my_app.numbers", Numbers, index= index)
+    [<Numbers.fraction: 1>]
+    >>> factory(Numbers.fraction, 1, 3)
+    Fraction(1, 3)
+
+    ```
+    """
+    index = index if index is not None else PluginIndex()
+    registered = []
+    for name, value in index.entry_points(group):
+        try:
+            type_descriptor_key = descriptor_type[name]
+        except KeyError:
+            logger.warning(
+                "Entry point '%s = %s' of group %s names no member of %s, skipped.",
+                name, value, group, descriptor_type.__name__,
+            )
+            continue
+        if type_descriptor_key in factory._builder_registry:
+            logger.warning(
+                "Entry point '%s = %s' of group %s: %s already registered, skipped.",
+                name, value, group, type_descriptor_key,
+            )
+            continue
+        factory.register_builder(builder_type, type_descriptor_key, LazyReference(value))
+        registered.append(type_descriptor_key)
+    return registered
@@ -0,0 +1,179 @@
+from typing import Any, Callable, Dict, List, Type, Union
+
+from ..utility.concurrent_counter import ConcurrentCounter
+from .builder import GenericBuilder
+from .descriptor import StrDescriptor, IntDescriptor, auto
+from .generic_build_artefact import GenericBuildArtifact, TGenericBuildArtifact
+
+
+class _PoolStats:
+    """Counters of one free list."""
+
+    __slots__ = ("hits", "misses", "released", "discarded")
+
+    def __init__(self):
+        self.hits = ConcurrentCounter()
+        self.misses = ConcurrentCounter()
+        self.released = ConcurrentCounter()
+        self.discarded = ConcurrentCounter()
+
+
+class PooledBuilder(GenericBuilder):
+    """Builder recycling released objects instead of allocating new ones. Objects handed back with
+    release() are kept in a bounded free list per type descriptor. A later build of the same type takes
+    an object from the free list and re-initializes it, only if the free list is empty a new object is
+    constructed. Use it for large numbers of short-lived objects.
+    Recycling is opt-in: the artifact class has to define a method recycle_build_artifact(), which receives
+    the same arguments as the constructor and re-initializes the object in place. Objects of classes without
+    it are never pooled, releasing them just leaves them to the garbage collector.
+    An object must not be used anymore after releasing it and must not be released twice.
+    Example:
+    ```python
+    >>> class MyClass(GenericBuildArtifact):
+    ...     def __init__(self, some_arg):
+    ...         self._some= some_arg
+    ...     def recycle_build_artifact(self, some_arg):
+    ...         self._some= some_arg
+    >>> class MyDescriptor(IntDescriptor):
+    ...     myclass= auto()
+    >>> builder= PooledBuilder(MyDescriptor.myclass, MyClass)
+    >>> obj1= builder(some_arg= 1)
+    >>> builder.release(obj1)
+    True
+    >>> obj2= builder(some_arg= 2)
+    >>> obj2 is obj1, obj2._some
+    (True, 2)
+    >>> builder.get_pool_stats()[MyDescriptor.myclass]
+    {'hits': 1, 'misses': 1, 'released': 1, 'discarded': 0, 'pooled': 0}
+
+    ```
+    """
+
+    #: :obj:`int` : default maximum number of released objects kept per type descriptor
+    pool_size: int = 64
+
+    def __init__(
+        self,
+        type_descriptor_key: Union[None, StrDescriptor, IntDescriptor] = None,
+        artifact_type: Union[None, Type[TGenericBuildArtifact]] = None,
+        *args,
+        **kwargs,
+    ):
+        """Initialize the pooled builder, see GenericBuilder. The free list size is taken from the
+        class attribute pool_size and can be changed with set_pool_size().
+        """
+        self._pools: Dict[Any, List[Any]] = {}
+        self._pool_stats: Dict[Any, _PoolStats] = {}
+        self._key_by_type: Dict[Type, Any] = {}
+        super().__init__(type_descriptor_key, artifact_type, *args, **kwargs)
+
+    def _compile_entry(self, type_descriptor_key: Any, artifact_type: Type[TGenericBuildArtifact]) -> Callable[..., Any]:
+        """Return the build function for a registered pair: pop and recycle a released object or construct a new one."""
+        construct = self._compile(artifact_type)
+        pool = self._pools.setdefault(type_descriptor_key, [])
+        stats = self._pool_stats.setdefault(type_descriptor_key, _PoolStats())
+        self._key_by_type.setdefault(artifact_type, type_descriptor_key)
+        recycle = getattr(artifact_type, "recycle_build_artifact", None)
+        if recycle is None:
+
+            def build(*args, **kwargs):
+                stats.misses.increment()
+                return construct(*args, **kwargs)
+
+            return build
+        fixed_args = tuple(self._fixed_args)
+        fixed_kwargs = dict(self._fixed_kwargs)
+
+        def build(*args, **kwargs):
+            try:
+                artifact = pool.pop()
+            except IndexError:
+                stats.misses.increment()
+                return construct(*args, **kwargs)
+            stats.hits.increment()
+            recycle(artifact, *fixed_args, *args, **fixed_kwargs, **kwargs)
+            return artifact
+
+        return build
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Support pickling; released objects kept for recycling are not pickled."""
+        state = super().__getstate__()
+        state["_pools"] = {}
+        return state
+
+    def release(
+        self,
+        artifact: TGenericBuildArtifact,
+        type_descriptor_key: Union[StrDescriptor, IntDescriptor, None] = None,
+    ) -> bool:
+        """Hand an object built by this builder back for recycling.
+        Args:
+            artifact: the object not used anymore
+            type_descriptor_key (Union[StrDescriptor,IntDescriptor]): The descriptor the object was built with.
+                If None, it is looked up by the object's class.
+        Returns:
+            True if the object was put into the free list, False if the free list is full or the object's class
+            defines no recycle_build_artifact() and the object is left to the garbage collector
+        Raises:
+            ValueError: if the descriptor is not registered or the object's class was never registered with this builder
+        """
+        if type_descriptor_key is None:
+            try:
+                type_descriptor_key = self._key_by_type[type(artifact)]
+            except KeyError:
+                raise ValueError(
+                    f"{self.__class__.__name__}: artifact type {type(artifact).__name__} not registered, cannot release it."
+                ) from None
+        try:
+            pool = self._pools[type_descriptor_key]
+        except KeyError:
+            raise ValueError(
+                f"{self.__class__.__name__}: type_descriptor_key {type_descriptor_key} not yet registered, cannot release artifact."
+            ) from None
+        stats = self._pool_stats[type_descriptor_key]
+        if len(pool) >= self.pool_size or not hasattr(artifact, "recycle_build_artifact"):
+            stats.discarded.increment()
+            return False
+        stats.released.increment()
+        pool.append(artifact)
+        return True
+
+    def set_pool_size(self, pool_size: int) -> None:
+        """Set the maximum number of released objects kept per type descriptor. Free lists exceeding
+        the new size are shrunk.
+        Args:
+            pool_size: maximum free list length, 0 disables recycling
+        Raises:
+            ValueError: if pool_size is negative
+        """
+        if pool_size < 0:
+            raise ValueError(
+                f"{self.__class__.__name__}: pool_size must not be negative, got {pool_size}."
+            )
+        self.pool_size = pool_size
+        for pool in self._pools.values():
+            del pool[pool_size:]
+
+    def clear_pools(self) -> None:
+        """Drop all released objects kept for recycling; the statistics are kept."""
+        for pool in self._pools.values():
+            pool.clear()
+
+    def get_pool_stats(self) -> Dict[Any, Dict[str, int]]:
+        """Get the recycling statistics per type descriptor, eg. to size the free lists.
+        Returns:
+            per type descriptor: the numbers of builds served from the free list (hits) and newly constructed (misses),
+            of objects put into the free list (released) or dropped because it was full (discarded) and the
+            current free list length (pooled)
+        """
+        return {
+            key: {
+                "hits": stats.hits.value(),
+                "misses": stats.misses.value(),
+                "released": stats.released.value(),
+                "discarded": stats.discarded.value(),
+                "pooled": len(self._pools[key]),
+            }
+            for key, stats in self._pool_stats.items()
+        }
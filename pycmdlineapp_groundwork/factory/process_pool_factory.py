@@ -0,0 +1,263 @@
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, Type, Union
+
+from .builder import GenericBuilder, TGenericBuilder, _zip_columns
+from .descriptor import StrDescriptor, IntDescriptor
+from .factory import Factory, _AMBIGUOUS, _add_dispatch_entry
+from .generic_build_artefact import TGenericBuildArtifact
+from .lazy_reference import LazyReference
+
+# factory of the current worker process, set up once per worker by _init_worker()
+_worker_factory: Optional[Factory] = None
+
+
+def _init_worker(builder_registry: Dict[Any, GenericBuilder]) -> None:
+    global _worker_factory
+    _worker_factory = Factory()
+    _worker_factory._builder_registry = builder_registry
+    for type_descriptor_key, builder in builder_registry.items():
+        _add_dispatch_entry(_worker_factory._dispatch_table, type_descriptor_key, builder)
+
+
+def _worker_builder(wire_key: Any) -> Tuple[Any, GenericBuilder]:
+    """Return descriptor and builder for a wire key, the raw value of a descriptor or the descriptor itself."""
+    entry = _worker_factory._dispatch_table.get(wire_key, _AMBIGUOUS)  # type: ignore
+    if entry is _AMBIGUOUS:
+        return _worker_factory._builder_for(wire_key)  # type: ignore
+    return entry
+
+
+def _worker_build(wire_key: Any, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Any:
+    type_descriptor_key, builder = _worker_builder(wire_key)
+    return builder(type_descriptor_key, *args, **kwargs)
+
+
+def _worker_build_kwargs(wire_key: Any, kwargs: Mapping[str, Any]) -> Any:
+    type_descriptor_key, builder = _worker_builder(wire_key)
+    return builder(type_descriptor_key, **kwargs)
+
+
+def _worker_build_row(
+    wire_key: Any, names: Tuple[str, ...], positional_count: int, row: Tuple[Any, ...]
+) -> Any:
+    type_descriptor_key, builder = _worker_builder(wire_key)
+    return builder(
+        type_descriptor_key,
+        *row[:positional_count],
+        **dict(zip(names, row[positional_count:])),
+    )
+
+
+def _worker_build_chunk(build: Callable[..., Any], leading_args: Tuple[Any, ...], chunk: List[Any]) -> List[Any]:
+    return [build(*leading_args, item) for item in chunk]
+
+
+class ProcessPoolFactory(Factory):
+    """Factory building objects in a pool of worker processes, for objects whose constructors do CPU-heavy setup.
+    Builders are registered as with Factory. The builder registry is handed to each worker process once, when the
+    pool starts, so build requests only carry the descriptor's raw value and the arguments. The pool is started on the first remote
+    build; registering another builder afterwards restarts it with the extended registry.
+    Builders, artifact classes, arguments and built objects need to be picklable, ie. the classes need to be
+    importable by the worker processes. Calling the factory directly still builds in the current process;
+    builds in the workers are not included in the counts of the builders in the current process.
+    build_many() and build_columns() send the build requests in chunks and keep at most two chunks per worker
+    in flight, so arguments given by an iterator are only consumed as far as the built objects are taken.
+
+    Example:
+    ```python
+    from my_app.shapes import Mesh, ShapeTypes  # classes need to be importable by the workers
+
+    with ProcessPoolFactory(max_workers=4, chunk_size=16) as factory:
+        factory.register_builder(GenericBuilder, ShapeTypes.mesh, Mesh)
+        future = factory.submit(ShapeTypes.mesh, resolution=1024)
+        meshes = factory.build_many(ShapeTypes.mesh, ({"resolution": r} for r in range(64)))
+        mesh = future.result()
+    ```
+    Args:
+        max_workers: number of worker processes, defaults to the number of processors
+        chunk_size: number of build requests sent to a worker at once by build_many() and build_columns()
+        mp_context: multiprocessing context used to start the workers, eg. `multiprocessing.get_context("spawn")`
+    Raises:
+        ValueError: if chunk_size is less than 1
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, chunk_size: int = 1, mp_context: Any = None):
+        super().__init__()
+        if chunk_size < 1:
+            raise ValueError(f"{self.__class__.__name__}: chunk_size must be at least 1, got {chunk_size}.")
+        self._max_workers = max_workers
+        self._chunk_size = chunk_size
+        self._mp_context = mp_context
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def register_builder(
+        self,
+        builder_type: Union[Type[TGenericBuilder], GenericBuilder],
+        type_descriptor_key: Union[StrDescriptor, IntDescriptor, None] = None,
+        artifact_type: Union[Type[TGenericBuildArtifact], str, LazyReference, None] = None,
+    ) -> None:
+        """Register a builder, see Factory.register_builder(). A running worker pool is restarted, pending builds
+        are completed by the old workers.
+        Raises:
+            ValueError: in the same cases as Factory.register_builder()
+        """
+        with self._lock:
+            super().register_builder(builder_type, type_descriptor_key, artifact_type)
+            if self._pool is not None:
+                self._pool.shutdown(wait=False)
+                self._pool = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        pool = self._pool
+        if pool is None:
+            with self._lock:
+                if self._pool is None:
+                    if not self._builder_registry:
+                        raise ValueError(
+                            f"{self.__class__.__name__}: No build artifacts registered, don't know which builder to use."
+                        )
+                    kwargs: Dict[str, Any] = {}
+                    if self._mp_context is not None:
+                        kwargs["mp_context"] = self._mp_context
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self._max_workers,
+                        initializer=_init_worker,
+                        initargs=(self._builder_registry,),
+                        **kwargs,
+                    )
+                pool = self._pool
+        return pool
+
+    def submit(
+        self,
+        type_descriptor_key: Union[StrDescriptor, IntDescriptor, None] = None,
+        *args,
+        **kwargs,
+    ) -> "Future[TGenericBuildArtifact]":
+        """Build an object referred to by type_descriptor_key in a worker process.
+        Args:
+            type_descriptor_key: The enum-derived descriptor identifying the class-object to be built.
+                If None, the first registered class type is built.
+            *args, **kwargs: arguments passed to the registered object builder
+        Returns:
+            future of the built object
+        Raises:
+            ValueError: if type_descriptor_key is not registered or no builder is registered at all
+        """
+        type_descriptor_key, _ = self._builder_for(type_descriptor_key)
+        return self._get_pool().submit(_worker_build, self._wire_key(type_descriptor_key), args, kwargs)
+
+    def build_many(
+        self,
+        type_descriptor_key: Union[StrDescriptor, IntDescriptor, None] = None,
+        iterable_of_kwargs: Iterable[Mapping[str, Any]] = (),
+        lazy: bool = False,
+        chunk_size: Optional[int] = None,
+    ) -> Union[List[TGenericBuildArtifact], Iterator[TGenericBuildArtifact]]:
+        """Build one object per keyword-argument mapping in the worker processes, see Factory.build_many().
+        The objects are returned in the order of the mappings.
+        Args:
+            type_descriptor_key: The enum-derived descriptor identifying the class-object to be built.
+            iterable_of_kwargs: per-build keyword arguments, one mapping per object to be built
+            lazy: if True, return an iterator yielding the objects as they arrive, in order
+            chunk_size: build requests sent to a worker at once, defaults to the factory's chunk_size
+        Returns:
+            list of built objects or, if lazy, an iterator of built objects
+        Raises:
+            ValueError: if type_descriptor_key is not registered or no builder is registered at all
+        """
+        type_descriptor_key, _ = self._builder_for(type_descriptor_key)
+        built = self._build_chunked(
+            _worker_build_kwargs,
+            (self._wire_key(type_descriptor_key),),
+            iterable_of_kwargs,
+            chunk_size or self._chunk_size,
+        )
+        return built if lazy else list(built)
+
+    def build_columns(
+        self,
+        type_descriptor_key: Union[StrDescriptor, IntDescriptor, None] = None,
+        *columns: Sequence[Any],
+        lazy: bool = False,
+        chunk_size: Optional[int] = None,
+        **keyword_columns: Sequence[Any],
+    ) -> Union[List[TGenericBuildArtifact], Iterator[TGenericBuildArtifact]]:
+        """Build one object per row of parallel argument sequences in the worker processes,
+        see Factory.build_columns(). The objects are returned in row order.
+        Args:
+            chunk_size: rows sent to a worker at once, defaults to the factory's chunk_size
+        Raises:
+            ValueError: if type_descriptor_key is not registered or the columns differ in length
+        """
+        rows = _zip_columns(self.__class__.__name__, columns + tuple(keyword_columns.values()))
+        type_descriptor_key, _ = self._builder_for(type_descriptor_key)
+        built = self._build_chunked(
+            _worker_build_row,
+            (self._wire_key(type_descriptor_key), tuple(keyword_columns), len(columns)),
+            rows,
+            chunk_size or self._chunk_size,
+        )
+        return built if lazy else list(built)
+
+    def _build_chunked(
+        self, build: Callable[..., Any], leading_args: Tuple[Any, ...], items: Iterable[Any], chunk_size: int
+    ) -> Iterator[Any]:
+        """Send the items to the workers in chunks, keeping at most two chunks per worker in flight, and return an
+        iterator of the built objects in item order. Unlike Executor.map(), the items are not all taken at once."""
+        pool = self._get_pool()
+        items = iter(items)
+        pending: Deque["Future[List[Any]]"] = deque()
+
+        def submit_chunk() -> bool:
+            chunk = list(islice(items, chunk_size))
+            if chunk:
+                pending.append(pool.submit(_worker_build_chunk, build, leading_args, chunk))
+            return bool(chunk)
+
+        in_flight = 2 * (self._max_workers or os.cpu_count() or 1)
+        while len(pending) < in_flight and submit_chunk():
+            pass
+
+        def results() -> Iterator[Any]:
+            try:
+                while pending:
+                    built = pending.popleft().result()
+                    submit_chunk()
+                    yield from built
+            finally:
+                for future in pending:
+                    future.cancel()
+
+        return results()
+
+    def _wire_key(self, type_descriptor_key: Any) -> Any:
+        """Return the raw value of a descriptor to send to the workers, if it dispatches to this descriptor,
+        else the descriptor itself. Raw values are cheaper to pickle and to unpickle than enum members."""
+        value = getattr(type_descriptor_key, "value", type_descriptor_key)
+        try:
+            entry = self._dispatch_table.get(value)
+        except TypeError:
+            return type_descriptor_key
+        if entry is not None and entry is not _AMBIGUOUS and entry[0] is type_descriptor_key:
+            return value
+        return type_descriptor_key
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker processes. A later remote build starts a new pool.
+        Args:
+            wait: wait for pending builds to complete
+        """
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+    def __enter__(self) -> "ProcessPoolFactory":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.shutdown()
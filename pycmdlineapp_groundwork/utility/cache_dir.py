@@ -0,0 +1,17 @@
+"""Location of the files pycmdlineapp_groundwork caches between invocations of an application."""
+
+import os
+import sys
+from pathlib import Path
+
+
+def user_cache_dir() -> Path:
+    """Return the directory for cache files in the user's cache directory: `$XDG_CACHE_HOME`,
+    `%LOCALAPPDATA%` on Windows or `~/.cache`, each followed by `pycmdlineapp_groundwork`.
+    The directory is not created.
+    """
+    cache_home = os.environ.get("XDG_CACHE_HOME") or (
+        os.environ.get("LOCALAPPDATA") if sys.platform == "win32" else None
+    )
+    cache_dir = Path(cache_home) if cache_home else Path.home() / ".cache"
+    return cache_dir / "pycmdlineapp_groundwork"
@@ -0,0 +1,219 @@
+"""Memory compaction of large, loaded configuration dictionaries.
+
+Configuration trees loaded from files contain many repeated small strings (keys,
+enum-like values), many small dicts sharing the same set of keys and long lists of
+numbers. `compact_dict` rebuilds such a tree with
+
+* interned keys and de-duplicated string values,
+* homogeneous number lists packed into `array.array`,
+* optionally read-only `FrozenDict` mappings sharing one key layout per distinct key set
+  (see `frozen_collections`).
+
+and reports how many bytes this saved.
+"""
+
+import sys
+from array import array
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .frozen_collections import FrozenDict, _KeyLayout
+
+#: :obj:`int` :
+#: Lists shorter than this are never packed into arrays, as the array header outweighs the savings
+MIN_PACK_LENGTH: int = 8
+
+_INT64_MIN = -(2 ** 63)
+_INT64_MAX = 2 ** 63 - 1
+
+
+class CompactionReport:
+    """Figures describing what a `compact_dict` run did.
+    Attributes:
+        bytes_before: deep size of the input tree in bytes (0 if not measured)
+        bytes_after: deep size of the compacted tree in bytes (0 if not measured)
+        deduplicated_strings: number of string occurrences replaced by an identical, shared string
+        packed_lists: number of lists packed into `array.array`
+        frozen_dicts: number of dicts converted to `FrozenDict`
+        key_layouts: number of distinct key layouts shared by the frozen dicts
+    """
+
+    __slots__ = (
+        "bytes_before",
+        "bytes_after",
+        "deduplicated_strings",
+        "packed_lists",
+        "frozen_dicts",
+        "key_layouts",
+    )
+
+    def __init__(self):
+        self.bytes_before: int = 0
+        self.bytes_after: int = 0
+        self.deduplicated_strings: int = 0
+        self.packed_lists: int = 0
+        self.frozen_dicts: int = 0
+        self.key_layouts: int = 0
+
+    @property
+    def bytes_saved(self) -> int:
+        """Bytes saved by the compaction, as far as measured."""
+        return self.bytes_before - self.bytes_after
+
+    def as_dict(self) -> Dict[str, int]:
+        """Return the figures as plain dictionary."""
+        figures = {name: getattr(self, name) for name in self.__slots__}
+        figures["bytes_saved"] = self.bytes_saved
+        return figures
+
+    def __str__(self) -> str:
+        return (
+            f"Compaction saved {self.bytes_saved} of {self.bytes_before} bytes"
+            f" ({self.deduplicated_strings} strings de-duplicated, {self.packed_lists}"
+            f" lists packed, {self.frozen_dicts} dicts frozen into"
+            f" {self.key_layouts} key layouts)"
+        )
+
+
+def deep_getsizeof(obj: Any) -> int:
+    """Return the size in bytes of `obj` and everything reachable from it through
+    mappings, lists, tuples and sets. Objects referenced more than once are counted once.
+    Example:
+    ```python
+    >>> shared = "x" * 1000
+    >>> deep_getsizeof([shared, shared]) < 2 * sys.getsizeof(shared)
+    True
+
+    ```
+    """
+    seen: Set[int] = set()
+    size = 0
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        size += sys.getsizeof(current)
+        if isinstance(current, FrozenDict):
+            if id(current._layout) not in seen:
+                seen.add(id(current._layout))
+                size += sys.getsizeof(current._layout) + sys.getsizeof(
+                    current._layout.index
+                )
+                stack.append(current._layout.keys)
+            stack.append(current._values)
+        elif isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            stack.extend(current)
+    return size
+
+
+def _pack_numbers(values: List[Any]) -> Optional[array]:
+    """Return `values` as `array.array`, if all of them are floats or all are 64 bit ints."""
+    first_type = type(values[0])
+    if first_type is float:
+        for value in values:
+            if type(value) is not float:
+                return None
+        return array("d", values)
+    if first_type is int:
+        for value in values:
+            if type(value) is not int or not _INT64_MIN <= value <= _INT64_MAX:
+                return None
+        return array("q", values)
+    return None
+
+
+class _Compactor:
+    def __init__(self, pack_number_lists: bool, freeze: bool, report: CompactionReport):
+        self.pack_number_lists = pack_number_lists
+        self.freeze = freeze
+        self.report = report
+        self.strings: Dict[str, str] = {}
+        self.layouts: Dict[Tuple[Any, ...], _KeyLayout] = {}
+
+    def string(self, value: str) -> str:
+        shared = self.strings.setdefault(value, value)
+        if shared is not value:
+            self.report.deduplicated_strings += 1
+        return shared
+
+    def key(self, key: Any) -> Any:
+        if type(key) is str:
+            interned = sys.intern(key)
+            if interned is not key:
+                self.report.deduplicated_strings += 1
+            return interned
+        return key
+
+    def compact(self, value: Any) -> Any:
+        value_type = type(value)
+        if value_type is str:
+            return self.string(value)
+        if isinstance(value, dict):
+            compacted = {self.key(key): self.compact(item) for key, item in value.items()}
+            if self.freeze:
+                self.report.frozen_dicts += 1
+                return FrozenDict.from_dict(compacted, self.layouts)
+            return compacted
+        if isinstance(value, list):
+            if self.pack_number_lists and len(value) >= MIN_PACK_LENGTH:
+                packed = _pack_numbers(value)
+                if packed is not None:
+                    self.report.packed_lists += 1
+                    return packed
+            items = [self.compact(item) for item in value]
+            return tuple(items) if self.freeze else items
+        if isinstance(value, (set, frozenset)):
+            items = {self.compact(item) for item in value}
+            return frozenset(items) if self.freeze else items
+        return value
+
+
+def compact_dict(
+    source: Dict[Any, Any],
+    pack_number_lists: bool = True,
+    freeze: bool = False,
+    measure: bool = True,
+) -> Tuple[Any, CompactionReport]:
+    """Return a memory-compacted copy of a (loaded and merged) configuration tree.
+    Keys are interned, equal string values are de-duplicated to one shared object.
+    The source tree is left unchanged.
+    Args:
+        source: the configuration tree
+        pack_number_lists: pack lists of at least `MIN_PACK_LENGTH` ints (64 bit) or floats into `array.array`.
+            Note that pydantic does not accept arrays for list fields.
+        freeze: convert dicts to read-only `FrozenDict` objects sharing key layouts,
+            lists to tuples and sets to frozensets
+        measure: measure deep sizes of source and result for the report; costs a traversal of both trees
+    Returns:
+        tuple of the compacted tree and a `CompactionReport`
+    Raises:
+        ValueError: if source is None
+    Example:
+    ```python
+    >>> source = {"servers": [{"mode": "fast", "port": port} for port in range(100)],
+    ...     "weights": [float(i) for i in range(100)]}
+    >>> compacted, report = compact_dict(source, freeze=True)
+    >>> compacted["servers"][0]["mode"] is compacted["servers"][99]["mode"]
+    True
+    >>> type(compacted["weights"]).__name__, report.packed_lists, report.key_layouts
+    ('array', 1, 2)
+    >>> report.bytes_saved > 0
+    True
+
+    ```
+    """
+    if source is None:
+        raise ValueError("Source dictionary is None.")
+    report = CompactionReport()
+    if measure:
+        report.bytes_before = deep_getsizeof(source)
+    compactor = _Compactor(pack_number_lists, freeze, report)
+    result = compactor.compact(source)
+    report.key_layouts = len(compactor.layouts)
+    if measure:
+        report.bytes_after = deep_getsizeof(result)
+    return result, report
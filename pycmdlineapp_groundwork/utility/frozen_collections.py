@@ -0,0 +1,170 @@
+"""Read-only collections for loaded configuration trees, shared by the memory compaction
+(`dict_compaction.compact_dict`) and the hash-consed settings snapshots
+(`config.frozen_settings.freeze_settings`).
+
+Both types compare equal to plain dicts and lists of the same content and hash like
+their content, computed once per object.
+"""
+
+from collections.abc import Mapping, Sequence
+from typing import Any, Dict, Iterator, List, MutableMapping, Optional, Tuple
+
+
+class _KeyLayout:
+    """Keys of a `FrozenDict` and their positions, shared by all mappings with the same keys."""
+
+    __slots__ = ("keys", "index", "__weakref__")
+
+    def __init__(self, keys: Tuple[Any, ...]):
+        self.keys = keys
+        self.index = {key: position for position, key in enumerate(keys)}
+
+
+class FrozenDict(Mapping):
+    """Read-only mapping storing only a tuple of values per instance. The keys and their
+    positions are kept in a key layout shared by all `FrozenDict` objects created with
+    the same keys in the same order, eg. the sections of one compaction run.
+    A `FrozenDict` is hashable if its values are; the hash is computed on first use and kept.
+    Example:
+    ```python
+    >>> first = FrozenDict.from_dict({"host": "a", "port": 1})
+    >>> second = FrozenDict.from_dict({"host": "b", "port": 2}, layouts={first.keys_tuple(): first._layout})
+    >>> second["port"], list(second), second._layout is first._layout
+    (2, ['host', 'port'], True)
+    >>> second == {"host": "b", "port": 2}
+    True
+    >>> {second: "cached"}[FrozenDict.from_dict({"port": 2, "host": "b"})]
+    'cached'
+
+    ```
+    """
+
+    __slots__ = ("_layout", "_values", "_hash", "__weakref__")
+
+    def __init__(self, layout: _KeyLayout, values: Tuple[Any, ...]):
+        self._layout = layout
+        self._values = values
+        self._hash: Optional[int] = None
+
+    @classmethod
+    def from_dict(
+        cls,
+        source: Mapping,
+        layouts: Optional[MutableMapping[Tuple[Any, ...], _KeyLayout]] = None,
+    ) -> "FrozenDict":
+        """Create a frozen copy of `source`, re-using a key layout from `layouts` if possible.
+        Args:
+            source: dictionary to be frozen (shallow, values are taken over as they are)
+            layouts: registry of key layouts to share; new layouts are added to it
+        """
+        keys = tuple(source)
+        layout = layouts.get(keys) if layouts is not None else None
+        if layout is None:
+            layout = _KeyLayout(keys)
+            if layouts is not None:
+                layouts[keys] = layout
+        return cls(layout, tuple(source.values()))
+
+    def keys_tuple(self) -> Tuple[Any, ...]:
+        """Return the keys as tuple, in insertion order."""
+        return self._layout.keys
+
+    def __getitem__(self, key: Any) -> Any:
+        return self._values[self._layout.index[key]]
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._layout.index
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._layout.keys)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            self._hash = hash(frozenset(zip(self._layout.keys, self._values)))
+        return self._hash
+
+    def __eq__(self, other: Any) -> bool:
+        if self is other:
+            return True
+        if isinstance(other, FrozenDict):
+            if self._hash is not None and other._hash is not None and self._hash != other._hash:
+                return False
+            if self._layout is other._layout:
+                return self._values == other._values
+        if isinstance(other, Mapping):
+            return dict(zip(self._layout.keys, self._values)) == dict(other.items())
+        return NotImplemented
+
+    def __ne__(self, other: Any) -> bool:
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({dict(zip(self._layout.keys, self._values))!r})"
+
+    def __reduce__(self):
+        return (_rebuild_frozen_dict, (self._layout.keys, self._values))
+
+    def to_dict(self) -> Dict[Any, Any]:
+        """Return a mutable deep copy, frozen mappings and sequences become dicts and lists."""
+        return {key: thaw(value) for key, value in zip(self._layout.keys, self._values)}
+
+
+def _rebuild_frozen_dict(keys: Tuple[Any, ...], values: Tuple[Any, ...]) -> FrozenDict:
+    return FrozenDict(_KeyLayout(keys), values)
+
+
+class FrozenSequence(Sequence):
+    """Read-only sequence with its hash computed once on creation, equal to lists and tuples
+    of the same items. Unlike a tuple it can be referenced weakly, eg. by a `HashConsTable`.
+    """
+
+    __slots__ = ("_items", "_hash", "__weakref__")
+
+    def __init__(self, items: Tuple[Any, ...]):
+        self._items = items
+        self._hash = hash(items)
+
+    def __getitem__(self, index: Any) -> Any:
+        return self._items[index]
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._items)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __eq__(self, other: Any) -> bool:
+        if self is other:
+            return True
+        if isinstance(other, FrozenSequence):
+            return self._hash == other._hash and self._items == other._items
+        if isinstance(other, (list, tuple)):
+            return list(self._items) == list(other)
+        return NotImplemented
+
+    def __ne__(self, other: Any) -> bool:
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({list(self._items)!r})"
+
+    def to_list(self) -> List[Any]:
+        """Return a mutable deep copy, frozen mappings and sequences become dicts and lists."""
+        return [thaw(item) for item in self._items]
+
+
+def thaw(value: Any) -> Any:
+    """Return a mutable deep copy of a frozen mapping or sequence, other values as they are."""
+    if isinstance(value, FrozenDict):
+        return value.to_dict()
+    if isinstance(value, FrozenSequence):
+        return value.to_list()
+    return value
@@ -0,0 +1,209 @@
+"""Opt-in measurement of peak and retained memory per stage of config loading.
+
+Profiling is switched on by setting the environment variable
+`PYCMDLINEAPP_MEMORY_PROFILE` to a non-empty value other than `0` before the
+application starts, or programmatically with `memory_profiler.enable()`. When
+disabled, every stage costs one attribute check.
+"""
+
+import os
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+#: :obj:`str` :
+#: Environment variable enabling memory profiling of config loading
+MEMORY_PROFILE_ENV_VAR: str = "PYCMDLINEAPP_MEMORY_PROFILE"
+
+#: :obj:`int` :
+#: Number of allocation sites kept per stage in the report
+TOP_ALLOCATIONS: int = 3
+
+
+class StageMemory:
+    """Accumulated memory figures for one stage (and source) of config loading.
+    Args:
+        stage: name of the stage, eg. `raw_bytes` or `pydantic_model`
+        source: optional source the stage worked on, eg. a file path
+    """
+
+    __slots__ = ("stage", "source", "calls", "peak", "retained", "top_allocations")
+
+    def __init__(self, stage: str, source: Optional[str] = None):
+        self.stage = stage
+        self.source = source
+        self.calls: int = 0
+        self.peak: int = 0
+        self.retained: int = 0
+        self.top_allocations: List[str] = []
+
+    def as_dict(self) -> Dict[str, object]:
+        """Return the figures as plain dictionary, eg. for JSON export."""
+        return {
+            "stage": self.stage,
+            "source": self.source,
+            "calls": self.calls,
+            "peak": self.peak,
+            "retained": self.retained,
+            "top_allocations": list(self.top_allocations),
+        }
+
+
+def _format_bytes(size: int) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024  # type: ignore
+    return f"{size:.1f} GiB"
+
+
+class MemoryProfiler:
+    """Records peak and retained memory of named stages using `tracemalloc`.
+
+    * _peak_ is the highest traced memory while the stage ran, relative to the memory
+      traced when it started.
+    * _retained_ is the traced memory still allocated when the stage ended, relative to
+      when it started, ie. what the stage's result keeps alive.
+
+    Stages may be nested; an outer stage's peak includes the peaks of its inner stages.
+    Figures of repeated stages with the same name and source are summed up (retained)
+    and maximized (peak).
+
+    Args:
+        enabled: switch profiling on or off; if `None`, the environment variable
+            `PYCMDLINEAPP_MEMORY_PROFILE` decides
+
+    Example:
+    ```python
+    >>> profiler = MemoryProfiler(enabled=True)
+    >>> with profiler.stage("decoded_text", source="example"):
+    ...     text = "x" * 1_000_000
+    >>> stats = profiler.stats()[0]
+    >>> (stats.stage, stats.source, stats.retained >= 1_000_000, stats.peak >= 1_000_000)
+    ('decoded_text', 'example', True, True)
+    >>> profiler.disable()
+
+    ```
+    """
+
+    def __init__(self, enabled: Optional[bool] = None):
+        if enabled is None:
+            enabled = os.environ.get(MEMORY_PROFILE_ENV_VAR, "") not in ("", "0")
+        self.enabled = False
+        self._stats: Dict[Tuple[str, Optional[str]], StageMemory] = {}
+        # per active stage: traced memory at start and highest peak seen so far
+        self._stack: List[List[int]] = []
+        self._started_tracing = False
+        if enabled:
+            self.enable()
+
+    def enable(self) -> None:
+        """Start recording stages, starting `tracemalloc` if it is not yet tracing."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self.enabled = True
+
+    def disable(self) -> None:
+        """Stop recording stages; stops `tracemalloc`, if it was started by `enable()`."""
+        self.enabled = False
+        if self._started_tracing and not self._stack:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def reset(self) -> None:
+        """Discard all recorded figures."""
+        self._stats.clear()
+
+    @contextmanager
+    def stage(
+        self, name: str, source: object = None, detail: Optional[str] = None
+    ) -> Iterator[None]:
+        """Context manager measuring the code run inside it as stage `name`.
+        Does nothing if profiling is disabled.
+        Args:
+            name: name of the stage
+            source: what the stage works on, eg. a file path or stream; converted to
+                `str` only if profiling is enabled
+            detail: optional text appended to the source, eg. the tried data format
+        """
+        if not self.enabled or not tracemalloc.is_tracing():
+            yield
+            return
+        if source is not None:
+            source = str(source) if detail is None else f"{source} ({detail})"
+
+        current, peak = tracemalloc.get_traced_memory()
+        if self._stack:
+            parent = self._stack[-1]
+            parent[1] = max(parent[1], peak)
+        snapshot_before = _take_snapshot()
+        _reset_peak()
+        start = tracemalloc.get_traced_memory()[0]
+        # memory held by the snapshot itself must not show up in an outer stage
+        overhead = start - current
+        frame = [start, start]
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            current_after, peak_after = tracemalloc.get_traced_memory()
+            peak_after = max(peak_after, frame[1])
+            top_allocations = [
+                f"{diff.traceback[0].filename}:{diff.traceback[0].lineno}"
+                f" {_format_bytes(diff.size_diff)}"
+                for diff in _take_snapshot().compare_to(snapshot_before, "lineno")[
+                    :TOP_ALLOCATIONS
+                ]
+                if diff.size_diff > 0
+            ]
+            del snapshot_before
+            if self._stack:
+                parent = self._stack[-1]
+                parent[1] = max(parent[1], peak_after - overhead)
+
+            key = (name, source)
+            stats = self._stats.get(key)  # type: ignore
+            if stats is None:
+                stats = self._stats[key] = StageMemory(name, source)  # type: ignore
+            stats.calls += 1
+            stats.peak = max(stats.peak, peak_after - start)
+            stats.retained += current_after - start
+            stats.top_allocations = top_allocations
+
+    def stats(self) -> List[StageMemory]:
+        """Return the recorded figures in the order the stages were first seen."""
+        return list(self._stats.values())
+
+    def report(self) -> str:
+        """Return a human-readable table of the recorded figures."""
+        lines = [f"{'stage':16s} {'peak':>12s} {'retained':>12s} calls  source"]
+        for stats in self._stats.values():
+            lines.append(
+                f"{stats.stage:16s} {_format_bytes(stats.peak):>12s}"
+                f" {_format_bytes(stats.retained):>12s} {stats.calls:5d} "
+                f" {stats.source or ''}"
+            )
+            for allocation in stats.top_allocations:
+                lines.append(f"{'':16s}   {allocation}")
+        return "\n".join(lines)
+
+
+def _take_snapshot() -> tracemalloc.Snapshot:
+    """Take a tracemalloc snapshot without the allocations of tracemalloc itself."""
+    return tracemalloc.take_snapshot().filter_traces(
+        (tracemalloc.Filter(False, tracemalloc.__file__),)
+    )
+
+
+def _reset_peak() -> None:
+    """Reset tracemalloc's peak to the currently traced memory (Python 3.9+). On older
+    Pythons peaks of a stage are measured against the process-wide peak instead.
+    """
+    if hasattr(tracemalloc, "reset_peak"):
+        tracemalloc.reset_peak()
+
+
+#: Process-wide profiler used by the config loading functions
+memory_profiler = MemoryProfiler()
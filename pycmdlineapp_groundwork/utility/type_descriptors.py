@@ -1,60 +1,139 @@
-from typing import Sequence, Tuple, Union, Iterable
-from collections import namedtuple
+"""Dynamic catalogue of type descriptors, the run-time alternative to the enum-based
+`StrDescriptor` and `IntDescriptor` for type catalogues that are generated, eg. from
+configuration files, and may hold many entries.
+
+Entries are immutable named tuples of name, key and description. Keys are assigned
+consecutively from 1 in the order the entries are appended, so an entry is found by key
+with a list index and by name with a dict lookup, both in constant time.
+"""
+
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+
+class TypeDescriptor(NamedTuple):
+    """Entry of a TypeDescriptors catalogue."""
+
+    name: str
+    key: int
+    description: str
+
+    def __str__(self) -> str:
+        return f"TypeDescriptor ({self.name},{self.key},{self.description})"
+
 
 class TypeDescriptors:
-    class TypeDescriptor:
-        _elements: Tuple[str,int,str]
-        def __init__(self, name:str=None, key:int=None, description:str=None):
-            self.elements= (name, key, description)
-        def __str__(self) -> str:
-            return f"BuildObjectType ({self.name},{self.key},{self.description})"
-        def __iter__(self) -> Tuple[str,int,str]:
-            return (self._elements[0],self._element[1],self._elements[2])
-        @property
-        def name(self) -> str:
-            return self._elements[0]
-        @property
-        def key(self) -> int:
-            return self._elements[1]
-        @property
-        def description(self) -> str:
-            return self._elements[2]
-        
-        
-    _types:Sequence[Sequence[TypeDescriptor]]= list()
-
-    def __init__(self):
-        pass
-
-    def __getitem__(self, key: int = None) -> Union[TypeDescriptor,None]:
-        return next((type_descriptor for type_descriptor in self._types if type_descriptor.key == key), None)
-
-    def __getitem__(self, name: str = None) -> Union[Tuple[str,int,str],None]:
-        return next((type_descriptor for type_descriptor in self._types if type_descriptor.name == name), None)
-
-    def __setitem__(self, name: str = None, description: str = None) -> TypeDescriptor:
-        return self.append(name= name, description= description) 
-
-    def __getattribute__(self, attribute:str) -> Union[TypeDescriptor,None]:
-        next((type_descriptor for type_descriptor in self._types if type_descriptor.name == attribute), None)
-
-    def append(self, name:str = None, description:str = None) -> TypeDescriptor:
-        key= self.len(self._types)+1
-        self._types.append(self.TypeDescriptor(name if name is not None else "", key, description if description is not None else "" ))
-        return key
+    """Catalogue of type descriptors indexed by key and by name. Entries are looked up with
+    `catalogue[key]`, `catalogue[name]` or as attribute `catalogue.name`.
+    Args:
+        entries: names or (name, description) pairs to append initially
+    Raises:
+        ValueError: if a name is appended twice
+    Example:
+    ```python
+    >>> messages= TypeDescriptors(["message1", ("message2", "second message")])
+    >>> messages.append("message3").key
+    3
+    >>> messages["message2"]
+    TypeDescriptor(name='message2', key=2, description='second message')
+    >>> messages[1] is messages.message1
+    True
+    >>> list(messages.names())
+    ['message1', 'message2', 'message3']
+
+    ```
+    """
+
+    #: kept for code referring to entries as TypeDescriptors.TypeDescriptor
+    TypeDescriptor = TypeDescriptor
+
+    __slots__ = ("_entries", "_by_name")
+
+    def __init__(self, entries: Iterable[Union[str, Tuple[str, str]]] = ()):
+        # instance attributes, so catalogues do not share their entries
+        self._entries: List[TypeDescriptor] = []
+        self._by_name: Dict[str, TypeDescriptor] = {}
+        self.extend(entries)
+
+    def append(self, name: str, description: Optional[str] = None) -> TypeDescriptor:
+        """Append an entry with the next key.
+        Args:
+            name: unique name of the entry
+            description: description of the entry, defaults to ""
+        Returns:
+            the new entry
+        Raises:
+            ValueError: if an entry with this name exists
+        """
+        if name in self._by_name:
+            raise ValueError(f"{self.__class__.__name__}: name '{name}' already defined.")
+        entry = TypeDescriptor(name, len(self._entries) + 1, description if description is not None else "")
+        self._entries.append(entry)
+        self._by_name[name] = entry
+        return entry
+
+    def extend(self, entries: Iterable[Union[str, Tuple[str, str]]]) -> None:
+        """Append names or (name, description) pairs, see append()."""
+        for entry in entries:
+            if isinstance(entry, str):
+                self.append(entry)
+            else:
+                self.append(*entry)
+
+    def get(self, key_or_name: Union[int, str], default: Any = None) -> Any:
+        """Return the entry with the given key or name, or default if there is none."""
+        if isinstance(key_or_name, str):
+            return self._by_name.get(key_or_name, default)
+        if isinstance(key_or_name, int) and 0 < key_or_name <= len(self._entries):
+            return self._entries[key_or_name - 1]
+        return default
+
+    def __getitem__(self, key_or_name: Union[int, str]) -> TypeDescriptor:
+        entry = self.get(key_or_name)
+        if entry is None:
+            raise KeyError(key_or_name)
+        return entry
+
+    def __setitem__(self, name: str, description: str) -> None:
+        self.append(name, description)
+
+    def __getattr__(self, name: str) -> TypeDescriptor:
+        # only called if regular attribute lookup fails; private names are never entries, which also
+        # keeps copying and unpickling from looking up entries before the slots are set
+        if not name.startswith("_"):
+            entry = self._by_name.get(name)
+            if entry is not None:
+                return entry
+        raise AttributeError(f"'{self.__class__.__name__}' object has no attribute or entry '{name}'")
+
+    def __call__(self, name: str, description: Optional[str] = None) -> TypeDescriptor:
+        return self.append(name, description)
+
+    def __contains__(self, key_or_name: Any) -> bool:
+        return self.get(key_or_name) is not None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[TypeDescriptor]:
+        return iter(self._entries)
 
     def names(self) -> Iterable[str]:
-        return (type.name for type in self._types)
+        """Return the names of the entries in key order."""
+        return self._by_name.keys()
 
     def keys(self) -> Iterable[int]:
-        return (type.key for type in self._types)
+        """Return the keys of the entries in order."""
+        return range(1, len(self._entries) + 1)
 
     def descriptions(self) -> Iterable[str]:
-        return (type.description for type in self._types)
-
-    def __call__(self, name:str = None, description:str = None) -> TypeDescriptor:
-        return self.append(name= name, description= description)
+        """Return the descriptions of the entries in key order."""
+        return (entry.description for entry in self._entries)
 
-    def __iter__(self) -> Sequence[TypeDescriptor]:
-        return self._types
+    def __getstate__(self) -> Tuple[List[TypeDescriptor]]:
+        return (self._entries,)
 
+    def __setstate__(self, state: Tuple[List[TypeDescriptor]]) -> None:
+        self._entries = []
+        self._by_name = {}
+        for entry in state[0]:
+            self.append(entry.name, entry.description)
@@ -6,12 +6,20 @@ from pydantic import BaseSettings
 from tempfile import mkdtemp
 from shutil import rmtree
 import sys
+import click
+from click.testing import CliRunner
 
 
+from pycmdlineapp_groundwork.config import settings_doc
 from pycmdlineapp_groundwork.config.config_data_types import ConfigDataTypes
 from pycmdlineapp_groundwork.config.click_config_option import (
+    DeferredHelpCommand,
+    DeferredHelpGroup,
+    SettingsDefaultMap,
     click_config_option,
+    settings_field_option,
 )
+from pycmdlineapp_groundwork.config.settings_doc import AttributesDocsCache, with_attrs_docs
 
 
 class DummyRunserverSettings(BaseSettings):
@@ -71,3 +79,99 @@ def _inner_test(
                 )
                 == resulting_dict
             )
+
+
+class DeferredSettings(BaseSettings):
+    #: port to listen on
+    port: int = 1234
+    runserver: DummyRunserverSettings = DummyRunserverSettings()
+
+
+def test__settings_default_map_converts_on_lookup():
+    settings = DeferredSettings(port=4242)
+    default_map = SettingsDefaultMap(settings)
+    assert default_map["port"] == 4242
+    assert default_map["runserver"] == {"port": 1234}
+    assert "missing" not in default_map
+    assert dict(default_map) == settings.dict()
+
+
+@pytest.fixture
+def deferred_cli(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings_doc, "default_docs_cache", AttributesDocsCache(tmp_path / "cache"))
+    for field in DeferredSettings.__fields__.values():
+        field.field_info.description = None
+    with_attrs_docs(lazy=True)(DeferredSettings)
+    settings = DeferredSettings()
+
+    @click.command(cls=DeferredHelpCommand)
+    @click_config_option(settings, DeferredSettings, deferred=True)
+    @settings_field_option(DeferredSettings, "--port", type=int, default=settings.port)
+    @click.pass_context
+    def cli(ctx, config, port):
+        click.echo(f"port={port} default_map={type(ctx.default_map).__name__}")
+
+    yield cli
+    settings_doc.apply_pending_attributes_docs()
+
+
+def test__deferred_cli_skips_docs_on_normal_invocation(deferred_cli, tmp_path):
+    config_file = tmp_path / "config.json"
+    config_file.write_text('{"port": 4242}')
+    result = CliRunner().invoke(deferred_cli, ["--config", str(config_file)])
+    assert result.exit_code == 0, result.output
+    assert result.output == "port=4242 default_map=SettingsDefaultMap\n"
+    assert DeferredSettings.__fields__["port"].field_info.description is None
+
+
+def test__deferred_cli_converts_only_merged_settings(deferred_cli, tmp_path, monkeypatch):
+    converted = []
+    for settings_class in (DeferredSettings, DummyRunserverSettings):
+
+        def recording_dict(self, *args, to_dict=settings_class.dict, **kwargs):
+            # the default map converts single fields on lookup
+            if "include" not in kwargs:
+                converted.append(type(self))
+            return to_dict(self, *args, **kwargs)
+
+        monkeypatch.setattr(settings_class, "dict", recording_dict)
+    config_file = tmp_path / "config.json"
+    config_file.write_text('{"port": 4242}')
+    runner = CliRunner()
+    assert runner.invoke(deferred_cli, ["--config", str(config_file)]).exit_code == 0
+    assert converted == []
+    config_file.write_text('{"runserver": {"port": 4242}}')
+    assert runner.invoke(deferred_cli, ["--config", str(config_file)]).exit_code == 0
+    assert converted == [DummyRunserverSettings]
+
+
+def test__deferred_cli_applies_docs_for_help(deferred_cli):
+    result = CliRunner().invoke(deferred_cli, ["--help"])
+    assert result.exit_code == 0, result.output
+    assert "port to listen on" in result.output
+    assert DeferredSettings.__fields__["port"].field_info.description == "port to listen on"
+
+
+def test__deferred_cli_applies_docs_for_completion(deferred_cli, monkeypatch):
+    # an instruction click does not know, so that the command runs instead of exiting the test process
+    monkeypatch.setenv("_DEFERRED_CLI_COMPLETE", "unknown")
+    with pytest.raises(SystemExit):
+        deferred_cli.main([], prog_name="deferred-cli")
+    assert DeferredSettings.__fields__["port"].field_info.description == "port to listen on"
+
+
+def test__deferred_help_group_subcommands():
+    @click.group(cls=DeferredHelpGroup)
+    def group():
+        pass
+
+    @group.command()
+    def sub():
+        pass
+
+    @group.group()
+    def subgroup():
+        pass
+
+    assert isinstance(sub, DeferredHelpCommand)
+    assert isinstance(subgroup, DeferredHelpGroup)
@@ -0,0 +1,70 @@
+import pytest
+from pathlib import Path
+
+from pycmdlineapp_groundwork.config.config_file_loaders import load_dict_from_file
+from pycmdlineapp_groundwork.config.config_query import (
+    Selector,
+    compile_selector,
+    format_selector,
+    project,
+    select,
+)
+
+
+@pytest.mark.parametrize(
+    "selector, path",
+    [
+        ("a", ("a",)),
+        ("$.a.b", ("a", "b")),
+        ("$a", ("a",)),
+        ("a.b[3].c", ("a", "b", 3, "c")),
+        ("a[-1]", ("a", -1)),
+        ("a['b.c'][\"d e\"]", ("a", "b.c", "d e")),
+        ("a.0", ("a", "0")),
+        ("$", ()),
+        (("a", 1), ("a", 1)),
+    ],
+)
+def test_compile_selector(selector, path):
+    assert compile_selector(selector) == path
+
+
+@pytest.mark.parametrize("selector", ["a..b", "a[0]b", "a[x]", "a['b", "a]"])
+def test_compile_selector_invalid(selector):
+    with pytest.raises(ValueError):
+        compile_selector(selector)
+
+
+@pytest.mark.parametrize("path", [("a", "b.c", 0, "d"), ("x y ", "it's"), (0, "a")])
+def test_format_selector_roundtrip(path):
+    assert compile_selector(format_selector(path)) == path
+
+
+def test_selector_on_loaded_config():
+    config = load_dict_from_file(Path("tests/config/example_cfg3.json"))
+    assert Selector("runserver.nested_list[1]")(config) == 96
+    assert select(config, "$.main") == "started"
+    assert select(config, ["runserver", "nested_list", 0]) == 42
+    assert select(config, "runserver.missing", default=None) is None
+    with pytest.raises(KeyError):
+        Selector("runserver.nested_list[7]")(config)
+    with pytest.raises(KeyError):
+        select(config, "main.not_a_dict")
+    assert Selector("a.b") == Selector(["a", "b"])
+    assert len({Selector("a.b"), Selector(("a", "b"))}) == 1
+    assert repr(Selector(("a", 0))) == "Selector('a[0]')"
+
+
+def test_project():
+    config = {
+        "db": {"host": "h", "port": 1, "pool": {"size": 5}},
+        "servers": [{"name": "a"}, {"name": "b"}],
+        "log": {"level": "INFO"},
+    }
+    projected = project(config, ["db.pool.size", "db.pool", "servers[1].name", "missing.key"])
+    assert projected == {"db": {"pool": {"size": 5}}, "servers": {1: {"name": "b"}}}
+    assert projected["db"]["pool"] is config["db"]["pool"]
+    assert config["db"] == {"host": "h", "port": 1, "pool": {"size": 5}}
+    assert project(config, ["$"]) is config
+    with pytest.raises(KeyError):
+        project(config, ["missing.key"], strict=True)
@@ -0,0 +1,86 @@
+import pytest
+import gc
+from pydantic import BaseSettings
+
+from pycmdlineapp_groundwork.config.frozen_settings import HashConsTable, freeze_settings
+from pycmdlineapp_groundwork.utility.dict_compaction import compact_dict
+from pycmdlineapp_groundwork.utility.frozen_collections import FrozenDict, FrozenSequence
+
+
+class DummyRunserverSettings(BaseSettings):
+    port: int = 1234
+    hosts: list = ["localhost"]
+
+
+class DummySettings(BaseSettings):
+    runserver: DummyRunserverSettings = DummyRunserverSettings()
+    debug: bool = False
+
+
+def test_freeze_settings_shares_equal_subtrees():
+    table = HashConsTable()
+    first = freeze_settings(DummySettings(), table)
+    second = freeze_settings({"debug": False, "runserver": {"hosts": ["localhost"], "port": 1234}}, table)
+    assert first is second
+    changed = freeze_settings(DummySettings(debug=True), table)
+    assert changed is not first
+    assert changed != first
+    assert changed["runserver"] is first["runserver"]
+    assert hash(changed["runserver"]) == hash(first["runserver"])
+
+
+def test_freeze_settings_node_types():
+    frozen = freeze_settings({"a": [1, {"b": 2}], "s": {1, 2}, "t": (1, 2)}, HashConsTable())
+    assert isinstance(frozen, FrozenDict)
+    assert isinstance(frozen["a"], FrozenSequence)
+    assert isinstance(frozen["a"][1], FrozenDict)
+    assert frozen["s"] == frozenset({1, 2})
+    assert frozen["a"] == [1, {"b": 2}]
+    assert frozen == {"a": [1, {"b": 2}], "s": {1, 2}, "t": [1, 2]}
+    assert frozen.to_dict() == {"a": [1, {"b": 2}], "s": frozenset({1, 2}), "t": [1, 2]}
+    assert isinstance(frozen.to_dict()["a"][1], dict)
+    assert len(frozen) == 3 and "a" in frozen and list(frozen) == ["a", "s", "t"]
+    with pytest.raises(TypeError):
+        frozen["a"] = 1
+    assert "FrozenDict" in repr(frozen)
+
+
+def test_freeze_settings_keeps_scalar_types_apart():
+    table = HashConsTable()
+    assert table.freeze({"a": 1}) is not table.freeze({"a": True})
+    assert table.freeze([1.0]) is not table.freeze([1])
+
+
+def test_freeze_settings_across_tables():
+    first = freeze_settings({"a": {"b": 1}}, HashConsTable())
+    second = freeze_settings({"a": {"b": 1}}, HashConsTable())
+    assert first is not second
+    assert first == second
+    assert hash(first) == hash(second)
+    assert HashConsTable().freeze(first) == first
+
+
+def test_freeze_settings_table_holds_nodes_weakly():
+    table = HashConsTable()
+    frozen = table.freeze({"a": {"b": [1, 2]}})
+    assert len(table) == 3
+    del frozen
+    gc.collect()
+    assert len(table) == 0
+
+
+def test_freeze_settings_errors():
+    with pytest.raises(ValueError):
+        freeze_settings(None)
+    with pytest.raises(TypeError):
+        freeze_settings({"a": bytearray(b"x")})
+
+
+def test_freeze_settings_shares_frozen_dict_with_compaction():
+    table = HashConsTable()
+    frozen = table.freeze({"a": {"b": 1}, "c": {"b": 2}})
+    assert frozen["a"]._layout is frozen["c"]._layout
+    compacted, _ = compact_dict({"a": {"b": 1}, "c": {"b": 2}}, freeze=True)
+    assert compacted == frozen
+    assert hash(compacted) == hash(frozen)
+    assert table.freeze(compacted) is frozen
@@ -0,0 +1,181 @@
+import importlib.util
+import json
+import os
+import sys
+
+import pytest
+from click.testing import CliRunner
+
+from pycmdlineapp_groundwork.config import settings_doc
+from pycmdlineapp_groundwork.config.settings_artifact import (
+    SettingsArtifact,
+    main,
+    model_key,
+    write_settings_artifact,
+)
+
+MODELS_SOURCE = """
+from pydantic import BaseSettings
+
+from pycmdlineapp_groundwork.config.settings_doc import with_attrs_docs
+
+
+@with_attrs_docs
+class ArtifactSettings(BaseSettings):
+    #: port to listen on,
+    #: defaults to 1234
+    port: int = 1234
+    debug: bool = False
+"""
+
+
+@pytest.fixture
+def models_module(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings_doc, "default_docs_cache", settings_doc.AttributesDocsCache(tmp_path / "cache"))
+    module_path = tmp_path / "settings_artifact_models.py"
+    module_path.write_text(MODELS_SOURCE)
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    def load():
+        spec = importlib.util.spec_from_file_location("settings_artifact_models", str(module_path))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules["settings_artifact_models"] = module
+        spec.loader.exec_module(module)
+        return module
+
+    yield module_path, load
+    sys.modules.pop("settings_artifact_models", None)
+
+
+def _touch_source(module_path, source):
+    module_path.write_text(source)
+    stat = module_path.stat()
+    os.utime(str(module_path), ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test__write_settings_artifact(tmp_path, models_module):
+    _, load = models_module
+    settings = load().ArtifactSettings
+    artifact = write_settings_artifact(tmp_path / "artifact.json", [settings])
+    entry = artifact["models"][model_key(settings)]
+    assert entry["descriptions"] == {"port": "port to listen on,\ndefaults to 1234"}
+    assert entry["help"] == {"port": "port to listen on, defaults to 1234"}
+    assert entry["schema"]["properties"]["port"]["description"] == "port to listen on,\ndefaults to 1234"
+    assert json.loads((tmp_path / "artifact.json").read_text()) == artifact
+
+
+def test__settings_artifact_applies_fresh_entries_without_extraction(tmp_path, models_module, monkeypatch):
+    _, load = models_module
+    write_settings_artifact(tmp_path / "artifact.json", [load().ArtifactSettings])
+    artifact = SettingsArtifact.load(tmp_path / "artifact.json")
+
+    def fail_extraction(model):
+        raise AssertionError("docs extracted although the artifact is fresh")
+
+    settings = load().ArtifactSettings
+    settings.__fields__["port"].field_info.description = None
+    monkeypatch.setattr(settings_doc, "_extract_docs", fail_extraction)
+    monkeypatch.setattr(settings_doc, "default_docs_cache", None)
+    assert artifact.is_fresh(settings)
+    assert artifact.apply(settings)
+    assert settings.__fields__["port"].field_info.description == "port to listen on,\ndefaults to 1234"
+    assert artifact.help(settings) == {"port": "port to listen on, defaults to 1234"}
+    assert artifact.schema(settings)["properties"]["port"]["description"] == "port to listen on,\ndefaults to 1234"
+
+
+def test__settings_artifact_falls_back_when_stale(tmp_path, models_module):
+    module_path, load = models_module
+    write_settings_artifact(tmp_path / "artifact.json", [load().ArtifactSettings])
+    artifact = SettingsArtifact.load(tmp_path / "artifact.json")
+
+    _touch_source(module_path, MODELS_SOURCE.replace("port to listen on", "new port doc"))
+    settings = load().ArtifactSettings
+    assert not artifact.is_fresh(settings)
+    assert artifact.stale_models([settings]) == [settings]
+    assert not artifact.apply(settings)
+    assert settings.__fields__["port"].field_info.description == "new port doc,\ndefaults to 1234"
+    assert artifact.help(settings) == {"port": "new port doc, defaults to 1234"}
+    assert artifact.schema(settings)["properties"]["port"]["description"] == "new port doc,\ndefaults to 1234"
+
+
+def test__settings_artifact_load_missing_or_outdated(tmp_path):
+    assert SettingsArtifact.load(tmp_path / "missing.json").models == {}
+    outdated = tmp_path / "outdated.json"
+    outdated.write_text(json.dumps({"format_version": 0, "models": {"a:B": {}}}))
+    assert SettingsArtifact.load(outdated).models == {}
+
+
+def test__settings_artifact_command(tmp_path, models_module):
+    module_path, _ = models_module
+    artifact_path = tmp_path / "artifact.json"
+    runner = CliRunner()
+    result = runner.invoke(main, ["settings_artifact_models", "-o", str(artifact_path)])
+    assert result.exit_code == 0, result.output
+    assert list(json.loads(artifact_path.read_text())["models"]) == ["settings_artifact_models:ArtifactSettings"]
+    assert runner.invoke(main, ["settings_artifact_models", "-o", str(artifact_path), "--check"]).exit_code == 0
+
+    _touch_source(module_path, MODELS_SOURCE + "\n")
+    result = runner.invoke(main, ["settings_artifact_models", "-o", str(artifact_path), "--check"])
+    assert result.exit_code == 1
+
+
+def _fail_extraction(model):
+    raise AssertionError("docs extracted although the artifact is fresh")
+
+
+def test__settings_artifact_replaces_pending_lazy_docs(tmp_path, models_module, monkeypatch):
+    module_path, load = models_module
+    _touch_source(module_path, MODELS_SOURCE.replace("@with_attrs_docs", "@with_attrs_docs(lazy=True)"))
+    write_settings_artifact(tmp_path / "artifact.json", [load().ArtifactSettings])
+    artifact = SettingsArtifact.load(tmp_path / "artifact.json")
+
+    settings = load().ArtifactSettings
+    monkeypatch.setattr(settings_doc, "_extract_docs", _fail_extraction)
+    monkeypatch.setattr(settings_doc, "default_docs_cache", None)
+    assert artifact.apply(settings)
+    assert "schema" not in settings.__dict__
+    settings_doc.apply_pending_attributes_docs()
+    assert settings.schema()["properties"]["port"]["description"] == "port to listen on,\ndefaults to 1234"
+
+
+def test__installed_settings_artifact_documents_decorated_models(tmp_path, models_module, monkeypatch):
+    _, load = models_module
+    write_settings_artifact(tmp_path / "artifact.json", [load().ArtifactSettings])
+    artifact = SettingsArtifact.load(tmp_path / "artifact.json")
+
+    monkeypatch.setattr(settings_doc, "_extract_docs", _fail_extraction)
+    monkeypatch.setattr(settings_doc, "default_docs_cache", None)
+    artifact.install()
+    try:
+        settings = load().ArtifactSettings
+    finally:
+        artifact.uninstall()
+    assert settings.__fields__["port"].field_info.description == "port to listen on,\ndefaults to 1234"
+
+
+NESTED_SOURCE = """
+from pydantic import BaseModel
+
+
+class Nested(BaseModel):
+    #: nested doc
+    value: int = 0
+"""
+
+
+def test__settings_artifact_stale_when_nested_model_changes(tmp_path, models_module, monkeypatch):
+    module_path, load = models_module
+    nested_path = tmp_path / "settings_artifact_nested.py"
+    nested_path.write_text(NESTED_SOURCE)
+    monkeypatch.delitem(sys.modules, "settings_artifact_nested", raising=False)
+    _touch_source(
+        module_path,
+        MODELS_SOURCE.replace("debug: bool = False", "debug: bool = False\n    nested: Nested = Nested()")
+        .replace("from pydantic import BaseSettings", "from pydantic import BaseSettings\nfrom settings_artifact_nested import Nested"),
+    )
+    write_settings_artifact(tmp_path / "artifact.json", [load().ArtifactSettings])
+    artifact = SettingsArtifact.load(tmp_path / "artifact.json")
+    assert artifact.is_fresh(load().ArtifactSettings)
+    _touch_source(nested_path, NESTED_SOURCE.replace("nested doc", "changed doc"))
+    assert not artifact.is_fresh(load().ArtifactSettings)
+    sys.modules.pop("settings_artifact_nested", None)
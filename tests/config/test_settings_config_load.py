@@ -6,14 +6,17 @@ from pydantic import BaseSettings
 from tempfile import mkdtemp
 from shutil import rmtree
 import sys
+import logging
 
 
+from pycmdlineapp_groundwork.config import config_file_loaders
 from pycmdlineapp_groundwork.config.config_data_types import ConfigDataTypes
 from pycmdlineapp_groundwork.config.config_file_loaders import (
     DictLoadError,
     _settings_config_load,
     get_settings_config_load_function,
 )
+from pycmdlineapp_groundwork.utility.dict_compaction import compact_dict
 
 
 class DummyRunserverSettings(BaseSettings):
@@ -298,3 +301,41 @@ def test__get_settings_load_function(
         resulting_dict=resulting_dict,
         function_in_test=f,
     )
+
+
+def test__settings_config_load_compact(dummy_settings):
+    loaded = _settings_config_load(
+        dummy_settings, Path("tests/config/example_cfg3.json"), compact=True
+    )
+    assert loaded == {"main": "started", "runserver": {"nested_list": [42, 96]}}
+    assert isinstance(loaded["runserver"]["nested_list"], list)
+    # settings sources need dicts, pydantic copies them when merging the sources
+    with pytest.raises(ValueError):
+        _settings_config_load(
+            dummy_settings,
+            Path("tests/config/example_cfg3.json"),
+            compact={"freeze": True},
+        )
+
+
+def test__settings_config_load_compact_measures_for_debug_log_only(
+    dummy_settings, monkeypatch, caplog
+):
+    calls = []
+
+    def recording_compact_dict(source, **options):
+        calls.append(options["measure"])
+        return compact_dict(source, **options)
+
+    monkeypatch.setattr(
+        config_file_loaders, "compact_dict", recording_compact_dict
+    )
+    with caplog.at_level(logging.INFO, logger=config_file_loaders.__name__):
+        _settings_config_load(
+            dummy_settings, Path("tests/config/example_cfg3.json"), compact=True
+        )
+    with caplog.at_level(logging.DEBUG, logger=config_file_loaders.__name__):
+        _settings_config_load(
+            dummy_settings, Path("tests/config/example_cfg3.json"), compact=True
+        )
+    assert calls == [False, True]
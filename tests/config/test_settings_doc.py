@@ -0,0 +1,115 @@
+import importlib.util
+import os
+import sys
+import textwrap
+
+import pytest
+
+from pycmdlineapp_groundwork.config import settings_doc
+from pycmdlineapp_groundwork.config.settings_doc import (
+    AttributesDocsCache,
+    apply_attributes_docs,
+    apply_pending_attributes_docs,
+    with_attrs_docs,
+)
+
+MODELS_SOURCE = """
+from pydantic import BaseModel, Field
+
+
+class Settings(BaseModel):
+    #: name of the app
+    name: str = "app"
+    #: number of workers
+    workers: int = 1
+    described: int = Field(2, description="existing description")
+"""
+
+
+@pytest.fixture
+def models_module(tmp_path):
+    module_path = tmp_path / "settings_doc_models.py"
+    module_path.write_text(MODELS_SOURCE)
+
+    def load():
+        spec = importlib.util.spec_from_file_location("settings_doc_models", str(module_path))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules["settings_doc_models"] = module
+        spec.loader.exec_module(module)
+        return module
+
+    yield module_path, load
+    sys.modules.pop("settings_doc_models", None)
+
+
+def _fail_extraction(model):
+    raise AssertionError(f"docs of {model} extracted again")
+
+
+def test__attributes_docs_cache_reuses_extracted_docs(tmp_path, models_module, monkeypatch):
+    _, load = models_module
+    cache_dir = tmp_path / "cache"
+    apply_attributes_docs(load().Settings, docs_cache=AttributesDocsCache(cache_dir))
+    assert len(list(cache_dir.glob("*.json"))) == 1
+
+    # a new cache instance, like a later invocation of the app, reads the docs from disk
+    monkeypatch.setattr(settings_doc, "_extract_docs", _fail_extraction)
+    settings = load().Settings
+    apply_attributes_docs(settings, docs_cache=AttributesDocsCache(cache_dir))
+    assert settings.__fields__["name"].field_info.description == "name of the app"
+    assert settings.__fields__["workers"].field_info.description == "number of workers"
+
+
+def test__attributes_docs_cache_invalidated_on_source_change(tmp_path, models_module):
+    module_path, load = models_module
+    cache = AttributesDocsCache(tmp_path / "cache")
+    assert cache.get(load().Settings)["name"] == ["name of the app"]
+
+    module_path.write_text(MODELS_SOURCE.replace("name of the app", "new name doc"))
+    stat = module_path.stat()
+    os.utime(str(module_path), ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert cache.get(load().Settings)["name"] == ["new name doc"]
+    assert AttributesDocsCache(tmp_path / "cache").get(load().Settings)["name"] == ["new name doc"]
+
+
+def test__attributes_docs_cache_clear(tmp_path, models_module):
+    _, load = models_module
+    cache = AttributesDocsCache(tmp_path / "cache")
+    cache.get(load().Settings)
+    cache.clear()
+    assert list((tmp_path / "cache").glob("*.json")) == []
+
+
+def test__apply_attributes_docs_keeps_existing_descriptions(tmp_path, models_module):
+    _, load = models_module
+    settings = load().Settings
+    apply_attributes_docs(settings, override_existing=False, docs_cache=AttributesDocsCache(tmp_path))
+    assert settings.__fields__["described"].field_info.description == "existing description"
+    assert settings.__fields__["name"].field_info.description == "name of the app"
+
+
+def test__with_attrs_docs_lazy_applies_on_schema(tmp_path, models_module, monkeypatch):
+    _, load = models_module
+    monkeypatch.setattr(settings_doc, "default_docs_cache", AttributesDocsCache(tmp_path))
+    extracted = []
+    extract_docs = settings_doc._extract_docs
+    monkeypatch.setattr(settings_doc, "_extract_docs", lambda model: extracted.append(model) or extract_docs(model))
+
+    settings = with_attrs_docs(lazy=True)(load().Settings)
+    assert extracted == []
+    assert settings.__fields__["name"].field_info.description is None
+
+    schema = settings.schema()
+    assert extracted == [settings]
+    assert schema["properties"]["name"]["description"] == "name of the app"
+    # the original schema() is restored after the docs are applied
+    assert "schema" not in settings.__dict__
+
+
+def test__apply_pending_attributes_docs(tmp_path, models_module, monkeypatch):
+    _, load = models_module
+    monkeypatch.setattr(settings_doc, "default_docs_cache", AttributesDocsCache(tmp_path))
+    settings = with_attrs_docs(lazy=True)(load().Settings)
+    apply_pending_attributes_docs()
+    assert settings.__fields__["workers"].field_info.description == "number of workers"
+    assert "schema" not in settings.__dict__
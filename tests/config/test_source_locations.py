@@ -0,0 +1,201 @@
+import json
+import string
+from typing import Dict, List
+
+import click
+import pytest
+import toml
+import yaml
+from click.testing import CliRunner
+from hypothesis import HealthCheck, assume, given, settings, strategies as st
+from pydantic import BaseModel, BaseSettings, ValidationError, validator
+
+from pycmdlineapp_groundwork.config.click_config_option import click_config_option
+from pycmdlineapp_groundwork.config.config_file_loaders import DictLoadError
+from pycmdlineapp_groundwork.config.source_locations import (
+    format_error_locations,
+    load_dict_with_locations,
+    parse_json_with_locations,
+    parse_toml_with_locations,
+    parse_yaml_with_locations,
+)
+
+json_values = st.recursive(
+    st.none() | st.booleans() | st.integers() | st.floats(allow_nan=False) | st.text(),
+    lambda children: st.lists(children) | st.dictionaries(st.text(), children),
+    max_leaves=20,
+)
+
+
+@given(value=json_values, indent=st.sampled_from([None, 0, 2]))
+def test__parse_json_with_locations_same_as_json_loads(value, indent):
+    text = json.dumps(value, indent=indent)
+    assert parse_json_with_locations(text)[0] == json.loads(text)
+
+
+@pytest.mark.parametrize(
+    "text", ["", "{", '{"a" 1}', '{"a": 1,}', "[1 2]", "[1,]", "{} x", "{'a': 1}", '{"a": tru}']
+)
+def test__parse_json_with_locations_errors_like_json(text):
+    with pytest.raises(json.JSONDecodeError) as expected:
+        json.loads(text)
+    with pytest.raises(json.JSONDecodeError) as error:
+        parse_json_with_locations(text)
+    assert (error.value.msg, error.value.pos) == (expected.value.msg, expected.value.pos)
+
+
+def test__json_locations():
+    text = '{\n  "server": {\n    "port": 8080,\n    "hosts": ["a", "bc"]\n  }\n}'
+    _, index = parse_json_with_locations(text)
+    port = index.get_location(("server", "port"))
+    assert (port.line, port.col, port.end_line, port.end_col) == (3, 13, 3, 17)
+    assert text[port.pos : port.end_pos] == "8080"
+    host = index.get_location(("server", "hosts", 1))
+    assert text[host.pos : host.end_pos] == '"bc"'
+    assert index.get_location(("server", "hosts", "1")) == host
+    server = index.get_location(("server",))
+    assert (server.line, server.end_line) == (2, 5)
+    with pytest.raises(KeyError):
+        index.get_location(("server", "missing"))
+    assert index.find(("server", "missing", "deeper")) == (server, 1)
+
+
+def test__yaml_locations():
+    text = "defaults: &defaults\n  port: 80\nserver:\n  <<: *defaults\n  hosts:\n    - a\n    - bc\n"
+    value, index = parse_yaml_with_locations(text)
+    assert value == yaml.safe_load(text)
+    host = index.get_location(("server", "hosts", 1))
+    assert (host.line, host.col) == (7, 7)
+    assert text[host.pos : host.end_pos] == "bc"
+    # merged keys point to where their value is defined
+    assert index.get_location(("server", "port")).line == 2
+
+
+def test__toml_locations():
+    text = (
+        'title = "example"\n'
+        "[server]\n"
+        "port = 8080  # comment\n"
+        "hosts = [\n"
+        '  "a", "[b]",\n'
+        "]\n"
+        'notes = """\n'
+        "port = 1\n"
+        '"""\n'
+        '"quoted.key".sub = 1\n'
+        "[[items]]\n"
+        'name = "first"\n'
+        "[[items]]\n"
+        'name = "second"\n'
+    )
+    value, index = parse_toml_with_locations(text)
+    assert value == toml.loads(text)
+    port = index.get_location(("server", "port"))
+    assert (port.line, port.col) == (3, 8)
+    assert index.get_location(("server", "hosts")).line == 4
+    assert index.get_location(("server", "quoted.key", "sub")).line == 10
+    assert index.get_location(("items", 1, "name")).line == 14
+    host = index.get_location(("server", "hosts", 1))
+    assert (host.line, host.col, text[host.pos : host.end_pos]) == (5, 8, '"[b]"')
+    notes = index.get_location(("server", "notes"))
+    assert (notes.line, notes.end_line) == (7, 9)
+
+
+# toml leaves escape sequences in quoted keys as they are
+toml_keys = st.text(string.ascii_letters + string.digits + "_-.#=[]{},")
+toml_values = st.recursive(
+    st.booleans() | st.integers() | st.floats(allow_nan=False, allow_infinity=False) | st.text(),
+    lambda children: st.lists(children, max_size=1) | st.dictionaries(toml_keys, children),
+    max_leaves=20,
+)
+
+
+@settings(suppress_health_check=[HealthCheck.too_slow])
+@given(value=st.dictionaries(toml_keys, toml_values))
+def test__parse_toml_with_locations_same_as_toml_loads(value):
+    try:
+        text = toml.dumps(value)
+        expected = toml.loads(text)
+    except (IndexError, toml.TomlDecodeError):
+        # toml does not dump or load everything
+        assume(False)
+    assert parse_toml_with_locations(text)[0] == expected
+
+
+@pytest.mark.parametrize("text", ["a = 1\na = 2", "[a]\n[a]", "a = 1 b = 2", 's = "\\x"', "a = [1", "[a"])
+def test__parse_toml_with_locations_errors(text):
+    with pytest.raises(toml.TomlDecodeError):
+        parse_toml_with_locations(text)
+
+
+@pytest.mark.parametrize(
+    "suffix, content",
+    [(".json", '{"port": 80}'), (".yaml", "port: 80\n"), (".toml", "port = 80\n")],
+)
+def test__load_dict_with_locations(tmp_path, suffix, content):
+    file_path = tmp_path / f"config{suffix}"
+    file_path.write_text(content)
+    value, index = load_dict_with_locations(file_path)
+    assert value == {"port": 80}
+    assert index.get_location(("port",)).line == 1
+
+
+def test__load_dict_with_locations_falls_back_without_index(tmp_path):
+    file_path = tmp_path / "config.txt"
+    file_path.write_text("port = 80\n")
+    assert load_dict_with_locations(file_path) == ({"port": 80}, None)
+    # invalid content is reported like by load_dict_from_file
+    file_path = tmp_path / "config.json"
+    file_path.write_text('{"port": 80,}')
+    with pytest.raises(DictLoadError) as error:
+        load_dict_with_locations(file_path)
+    assert error.value.line_number == 1
+
+
+class _Server(BaseModel):
+    port: int
+    hosts: List[str] = []
+
+
+class _Settings(BaseSettings):
+    servers: Dict[str, _Server] = {}
+
+
+def test__click_config_option_reports_error_locations(tmp_path):
+    config_file = tmp_path / "config.yaml"
+    config_file.write_text("servers:\n  web:\n    port: eighty\n  db:\n    hosts: [a]\n")
+
+    @click.command()
+    @click_config_option(_Settings(), _Settings, locate_errors=True)
+    def cli(config):
+        pass
+
+    result = CliRunner().invoke(cli, ["--config", str(config_file)])
+    assert result.exit_code != 0
+    assert f"{config_file}:3:11: servers.web.port: value is not a valid integer" in result.output
+    assert f"{config_file}:5:5: servers.db.port: field required (in the enclosing value)" in result.output
+
+
+class _Range(BaseModel):
+    low: int
+    high: int
+
+    @validator("high")
+    def _above_low(cls, high, values):
+        if high <= values.get("low", high - 1):
+            raise ValueError("must exceed low")
+        return high
+
+
+class _Limits(BaseModel):
+    range: _Range
+
+
+def test__format_error_locations_uses_supplying_file():
+    first, first_index = parse_json_with_locations('{"range": {"low": 1,\n  "high": 5}}')
+    second, second_index = parse_yaml_with_locations("range:\n  low: 10\n")
+    first["range"].update(second["range"])
+    with pytest.raises(ValidationError) as error:
+        _Limits.parse_obj(first)
+    lines = format_error_locations(error.value, {"first.json": first_index, "second.yaml": second_index, "other": None})
+    assert lines == ["first.json:2:11: range.high: must exceed low"]
@@ -0,0 +1,196 @@
+import random
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import click
+import pytest
+from click.testing import CliRunner
+from pydantic import BaseModel, BaseSettings, ValidationError, validator
+
+from pycmdlineapp_groundwork.config import trusted_settings
+from pycmdlineapp_groundwork.config.click_config_option import click_config_option
+from pycmdlineapp_groundwork.config.settings_artifact import model_key
+from pycmdlineapp_groundwork.config.trusted_settings import (
+    TrustedSampleMismatch,
+    TrustStore,
+    construct_settings,
+    parse_trusted,
+    settings_digest,
+)
+
+
+class _Section(BaseModel):
+    name: str
+    port: int
+    ratio: float = 1.0
+    tags: List[str] = []
+    path: Optional[Path] = None
+    nested: Dict[str, Any] = {}
+
+
+class _Upper(BaseModel):
+    value: str
+
+    @validator("value")
+    def upper(cls, value):
+        return value.upper()
+
+
+class _Settings(BaseSettings):
+    debug: bool = False
+    sections: Dict[str, _Section] = {}
+    items: List[_Section] = []
+    upper: Optional[_Upper] = None
+
+
+DATA = {
+    "debug": True,
+    "sections": {
+        "a": {"name": "a", "port": 80, "tags": ["x"], "nested": {"k": [1, 2]}},
+        "b": {"name": "b", "port": "81", "ratio": 2, "path": "/tmp"},
+    },
+    "items": [{"name": "c", "port": 82}],
+    "upper": {"value": "abc"},
+}
+
+
+@pytest.fixture
+def trust_store(tmp_path):
+    return TrustStore(tmp_path / "trusted.json")
+
+
+def test__construct_settings_equals_parse_obj():
+    constructed = construct_settings(_Settings, DATA)
+    validated = _Settings.parse_obj(DATA)
+    assert constructed == validated
+    # values needing coercion are validated, models with validators are parsed
+    assert constructed.sections["b"].port == 81
+    assert constructed.sections["b"].ratio == 2.0 and isinstance(constructed.sections["b"].ratio, float)
+    assert constructed.sections["b"].path == Path("/tmp")
+    assert constructed.upper.value == "ABC"
+    assert isinstance(constructed.items[0], _Section)
+    assert constructed.__fields_set__ == validated.__fields_set__
+
+
+def test__construct_settings_invalid_values():
+    with pytest.raises(ValidationError):
+        construct_settings(_Settings, {"sections": {"a": {"name": "a", "port": "eighty"}}})
+    with pytest.raises(ValidationError):
+        construct_settings(_Settings, {"sections": {"a": {"name": "a"}}})
+
+
+def test__construct_settings_sampling_detects_mismatch(monkeypatch):
+    # a plain value that would be invalid, eg. if the data changed without the digest changing
+    monkeypatch.setattr(trusted_settings, "_is_plain", lambda model, field, value: True)
+    data = {"sections": {"a": {"name": "a", "port": "eighty"}}}
+    assert construct_settings(_Settings, data).sections["a"].port == "eighty"
+    with pytest.raises(TrustedSampleMismatch):
+        construct_settings(_Settings, data, sample_rate=1.0, rng=random.Random(0))
+
+
+def test__settings_digest_changes_with_data():
+    assert settings_digest(_Settings, DATA) == settings_digest(_Settings, dict(DATA))
+    assert settings_digest(_Settings, DATA) != settings_digest(_Settings, dict(DATA, debug=False))
+
+
+def test__parse_trusted_validates_once(trust_store, monkeypatch):
+    calls = []
+    parse_obj = _Settings.parse_obj.__func__
+
+    def counting_parse_obj(cls, data):
+        calls.append(cls)
+        return parse_obj(cls, data)
+
+    monkeypatch.setattr(_Settings, "parse_obj", classmethod(counting_parse_obj))
+    assert parse_trusted(_Settings, DATA, trust_store) == parse_obj(_Settings, DATA)
+    assert calls == [_Settings]
+    # trusted now, also by another store instance reading the same file
+    assert parse_trusted(_Settings, DATA, TrustStore(trust_store.file_path)) == parse_obj(_Settings, DATA)
+    assert calls == [_Settings]
+    # changed data is validated in full again
+    parse_trusted(_Settings, dict(DATA, debug=False), trust_store)
+    assert calls == [_Settings, _Settings]
+
+
+def test__parse_trusted_revalidates_after_failed_checks(trust_store, monkeypatch):
+    data = {"sections": {"a": {"name": "a", "port": 80}}}
+    parse_trusted(_Settings, data, trust_store)
+
+    def fail(*args, **kwargs):
+        raise TrustedSampleMismatch("tampered")
+
+    monkeypatch.setattr(trusted_settings, "_construct", fail)
+    assert parse_trusted(_Settings, data, trust_store).sections["a"].port == 80
+    with pytest.raises(ValidationError):
+        parse_trusted(_Settings, {"sections": {"a": {"name": "a", "port": "x"}}}, trust_store)
+
+
+def test__click_config_option_trust_mode(tmp_path, trust_store):
+    config_file = tmp_path / "config.json"
+    config_file.write_text('{"sections": {"a": {"name": "a", "port": 80}}}')
+
+    @click.command()
+    @click_config_option(_Settings(), _Settings, trust_store=trust_store, trust_sample_rate=0.5)
+    def cli(config):
+        click.echo(config.sections["a"].port)
+
+    runner = CliRunner()
+    for _ in range(2):
+        result = runner.invoke(cli, ["--config", str(config_file)])
+        assert result.exit_code == 0, result.output
+        assert result.output == "80\n"
+    assert trust_store.file_path.exists()
+
+    config_file.write_text('{"sections": {"a": {"name": "a", "port": "x"}}}')
+    result = runner.invoke(cli, ["--config", str(config_file)])
+    assert result.exit_code != 0
+    assert "Validation error" in result.output
+
+
+def test__parse_trusted_records_canonical_data(trust_store):
+    canonical = {"sections": {"a": {"name": "a", "port": 80}}}
+    coerced = {"sections": {"a": {"name": "a", "port": "80"}}}
+    parse_trusted(_Settings, canonical, trust_store, trust_key="canonical")
+    parse_trusted(_Settings, coerced, trust_store, trust_key="coerced")
+    assert trust_store.trusted("canonical", settings_digest(_Settings, canonical)) is True
+    assert trust_store.trusted("coerced", settings_digest(_Settings, coerced)) is False
+    assert trust_store.trusted("coerced", settings_digest(_Settings, canonical)) is None
+    # values of trusted data that validation changed are still coerced
+    assert parse_trusted(_Settings, coerced, trust_store, trust_key="coerced").sections["a"].port == 80
+
+
+class _Numbers(BaseModel):
+    ratio: float
+    enabled: bool
+
+
+def test__parse_trusted_int_data_for_float_and_bool_fields_is_not_canonical(trust_store):
+    data = {"ratio": 1, "enabled": 1}
+    first = parse_trusted(_Numbers, data, trust_store)
+    assert trust_store.trusted(model_key(_Numbers), settings_digest(_Numbers, data)) is False
+    second = parse_trusted(_Numbers, data, trust_store)
+    for settings in (first, second):
+        assert type(settings.ratio) is float and type(settings.enabled) is bool
+    assert first == second == _Numbers(ratio=1.0, enabled=True)
+
+
+class _EnvSettings(BaseSettings):
+    host: str = "default"
+    port: int = 80
+
+    class Config:
+        env_prefix = "TRUSTED_TEST_"
+
+
+def test__parse_trusted_includes_settings_sources(trust_store, monkeypatch):
+    monkeypatch.setenv("TRUSTED_TEST_HOST", "from-env")
+    data = {"port": 81}
+    assert parse_trusted(_EnvSettings, data, trust_store) == _EnvSettings.parse_obj(data)
+    trusted = parse_trusted(_EnvSettings, data, trust_store)
+    assert (trusted.host, trusted.port) == ("from-env", 81)
+    assert construct_settings(_EnvSettings, data).host == "from-env"
+    # a changed environment variable invalidates the trusted digest
+    monkeypatch.setenv("TRUSTED_TEST_HOST", "changed")
+    key = model_key(_EnvSettings)
+    assert trust_store.trusted(key, settings_digest(_EnvSettings, {"host": "changed", "port": 81})) is None
+    assert parse_trusted(_EnvSettings, data, trust_store).host == "changed"
@@ -0,0 +1,13 @@
+from pycmdlineapp_groundwork.factory.generic_build_artefact import GenericBuildArtifact
+
+
+class LazyArtifact(GenericBuildArtifact):
+    def __init__(self, context, value= 0):
+        self.context= context
+        self.value= value
+
+    def recycle_build_artifact(self, context, value= 0):
+        self.__init__(context, value)
+
+    class Nested(GenericBuildArtifact):
+        pass
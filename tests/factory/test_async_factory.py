@@ -0,0 +1,158 @@
+import asyncio
+import pytest
+from pycmdlineapp_groundwork.factory.descriptor import IntDescriptor, auto
+from pycmdlineapp_groundwork.factory.generic_build_artefact import GenericBuildArtifact
+from pycmdlineapp_groundwork.factory.builder import GenericBuilder
+from pycmdlineapp_groundwork.factory.async_builder import AsyncBuilder
+from pycmdlineapp_groundwork.factory.async_factory import AsyncFactory
+
+
+class Tracker:
+    def __init__(self):
+        self.running= 0
+        self.max_running= 0
+        self.finished= 0
+
+
+class AsyncConnection(GenericBuildArtifact):
+    def __init__(self, tracker, host= "localhost"):
+        self.tracker= tracker
+        self.host= host
+        self.connected= False
+    async def async_init(self):
+        self.tracker.running+= 1
+        self.tracker.max_running= max(self.tracker.max_running, self.tracker.running)
+        await asyncio.sleep(0.01)
+        self.tracker.running-= 1
+        self.tracker.finished+= 1
+        self.connected= True
+
+
+class CreatedArtifact(GenericBuildArtifact):
+    def __init__(self, value):
+        self.value= value
+    @classmethod
+    async def create(cls, value):
+        await asyncio.sleep(0)
+        return cls(value * 2)
+
+
+class SyncArtifact(GenericBuildArtifact):
+    def __init__(self, value= 0):
+        self.value= value
+
+
+class AsyncTypes(IntDescriptor):
+    connection= auto()
+    created= auto()
+    sync= auto()
+
+
+class HookedBuilder(AsyncBuilder):
+    hook_calls= 0
+    async def async_init_hook(self):
+        await asyncio.sleep(0.01)
+        HookedBuilder.hook_calls+= 1
+        self.set_fixed_args(Tracker())
+
+
+def test_async_builder():
+    builder= AsyncBuilder(AsyncTypes.connection, AsyncConnection, Tracker())
+    builder.register(AsyncTypes.created, CreatedArtifact.create)
+    connection= asyncio.run(builder(AsyncTypes.connection, host= "db"))
+    assert (connection.host, connection.connected) == ("db", True)
+    with pytest.raises(TypeError):
+        asyncio.run(builder(AsyncTypes.created, 21))
+    assert builder.get_count() == 2
+    with pytest.raises(ValueError):
+        asyncio.run(builder(AsyncTypes.sync))
+
+
+def test_async_builder_init_hook_runs_once():
+    builder= HookedBuilder(AsyncTypes.connection, AsyncConnection)
+    async def main():
+        return await asyncio.gather(*(builder() for _ in range(5)))
+    connections= asyncio.run(main())
+    assert HookedBuilder.hook_calls == 1
+    assert all(connection.connected for connection in connections)
+    assert asyncio.run(builder()).connected
+
+
+def test_async_builder_created_by_coroutine():
+    builder= AsyncBuilder(AsyncTypes.created, CreatedArtifact.create)
+    assert asyncio.run(builder(value= 21)).value == 42
+
+
+def test_async_builder_build_many_concurrency():
+    tracker= Tracker()
+    builder= AsyncBuilder(AsyncTypes.connection, AsyncConnection, tracker)
+    connections= asyncio.run(builder.build_many(None, [{"host": str(i)} for i in range(10)], concurrency= 3))
+    assert [connection.host for connection in connections] == [str(i) for i in range(10)]
+    assert tracker.max_running == 3
+    connections= asyncio.run(builder.build_many(None, [{"host": str(i)} for i in range(10)], concurrency= None))
+    assert tracker.max_running == 10
+    connections= asyncio.run(builder.build_columns(None, host= ["a", "b"], concurrency= 1))
+    assert [connection.host for connection in connections] == ["a", "b"]
+    assert builder.get_count() == 22
+    with pytest.raises(ValueError):
+        asyncio.run(builder.build_many(None, [{}], concurrency= 0))
+    with pytest.raises(ValueError):
+        asyncio.run(builder.build_columns(None, ["a", "b"], host= ["a"]))
+    with pytest.raises(ValueError):
+        asyncio.run(AsyncBuilder(AsyncTypes.connection, AsyncConnection).build_columns(None, iter([tracker, tracker]), host= ["a"]))
+    with pytest.raises(TypeError):
+        asyncio.run(builder.build_many(None, [{"tracker": tracker}]))
+
+
+def test_async_factory():
+    factory= AsyncFactory()
+    factory.register_builder(AsyncBuilder(AsyncTypes.connection, AsyncConnection, Tracker()))
+    factory.register_builder(GenericBuilder, AsyncTypes.sync, SyncArtifact)
+    async def main():
+        connection= await factory(host= "db")
+        sync= await factory(AsyncTypes.sync, 7)
+        connections= await factory.build_many(AsyncTypes.connection, [{"host": "a"}, {"host": "b"}], concurrency= 1)
+        syncs= await factory.build_columns(AsyncTypes.sync, [1, 2])
+        more_connections= await factory.build_columns(AsyncTypes.connection, host= ["c"])
+        more_syncs= await factory.build_many(AsyncTypes.sync, [{"value": 3}])
+        return connection, sync, connections, syncs, more_connections, more_syncs
+    connection, sync, connections, syncs, more_connections, more_syncs= asyncio.run(main())
+    assert connection.connected and connection.host == "db"
+    assert sync.value == 7
+    assert [obj.host for obj in connections + more_connections] == ["a", "b", "c"]
+    assert [obj.value for obj in syncs + more_syncs] == [1, 2, 3]
+    with pytest.raises(ValueError):
+        asyncio.run(factory(AsyncTypes.created))
+    async def from_values():
+        connection= await factory.build_from_value(AsyncTypes.connection.value, host= "d")
+        built= await factory.build_many_from_values(
+            [(AsyncTypes.sync.value, {"value": 1}), (AsyncTypes.connection.value, {"host": "e"}), (AsyncTypes.sync.value, {"value": 2})]
+        )
+        return connection, built
+    connection, built= asyncio.run(from_values())
+    assert connection.connected and connection.host == "d"
+    assert [built[0].value, built[1].host, built[2].value] == [1, "e", 2] and built[1].connected
+
+
+def test_async_builder_build_many_pulls_arguments_on_demand():
+    tracker= Tracker()
+    builder= AsyncBuilder(AsyncTypes.connection, AsyncConnection, tracker)
+    pulled= []
+    def arguments():
+        for i in range(10):
+            pulled.append(i)
+            # at most the running constructions and the one being pulled
+            assert len(pulled) - tracker.finished <= 3
+            yield {"host": str(i)}
+    connections= asyncio.run(builder.build_many(None, arguments(), concurrency= 2))
+    assert [connection.host for connection in connections] == [str(i) for i in range(10)]
+
+
+def test_async_builder_instrumentation_times_initialization():
+    builder= AsyncBuilder(AsyncTypes.connection, AsyncConnection, Tracker())
+    instrumentation= builder.enable_instrumentation()
+    asyncio.run(builder(host= "db"))
+    metrics= instrumentation.as_dict()["AsyncTypes.connection"]
+    assert metrics["count"] == 1
+    # async_init() sleeps 10 ms
+    assert metrics["total_seconds"] >= 0.01
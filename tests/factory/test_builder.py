@@ -149,3 +149,117 @@ def test_generic_builder_constructor_raises_exception(type_descriptor_key, artef
     else:
         builder= GenericBuilder(type_descriptor_key, artefact_type)
         assert isinstance(builder, GenericBuilder)
+
+
+def test_generic_builder_compiled_build_path():
+    builder= GenericBuilder(ExampleIntDescriptor.value1_name, SpecificBuildArtifact)
+    assert builder._compiled_registry[ExampleIntDescriptor.value1_name] is SpecificBuildArtifact
+    builder.set_fixed_args("bar")
+    obj= builder(ExampleIntDescriptor.value1_name, foo= 1)
+    assert (obj.positional_arg, obj.keyword_arg) == ("bar", 1)
+    builder.set_fixed_args(foo= 2)
+    obj= builder()
+    assert (obj.positional_arg, obj.keyword_arg) == ("bar", 2)
+    with pytest.raises(TypeError):
+        builder(ExampleIntDescriptor.value1_name, foo= 3)
+    builder.register(ExampleIntDescriptor.value2_name, SpecificBuildArtifactWithAdditionalArgs)
+    obj= builder(ExampleIntDescriptor.value2_name, 7)
+    assert (obj.positional_arg, obj.some_other_pos_arg, obj.keyword_arg) == ("bar", 7, 2)
+    assert isinstance(builder(), SpecificBuildArtifact)
+    assert builder.get_count() == 5  # failed builds are counted, too
+    with pytest.raises(ValueError):
+        GenericBuilder()()
+
+
+def test_generic_builder_build_many():
+    builder= GenericBuilder(ExampleIntDescriptor.value1_name, SpecificBuildArtifact)
+    objs= builder.build_many(ExampleIntDescriptor.value1_name, [{"positional_arg": "a"}, {"positional_arg": "b", "foo": 1}])
+    assert [(obj.positional_arg, obj.keyword_arg) for obj in objs] == [("a", 12), ("b", 1)]
+    assert builder.get_count() == 2
+    lazy_objs= builder.build_many(None, ({"positional_arg": str(i)} for i in range(3)), lazy= True)
+    assert builder.get_count() == 2
+    assert [obj.positional_arg for obj in lazy_objs] == ["0", "1", "2"]
+    assert builder.get_count() == 5
+    builder.set_fixed_args(foo= 7)
+    with pytest.raises(TypeError):
+        builder.build_many(None, [{"positional_arg": "a", "foo": 1}])
+    with pytest.raises(ValueError):
+        builder.build_many(ExampleIntDescriptor.value2_name, [{}])
+    assert builder.build_many(None, []) == []
+
+
+def test_generic_builder_batch_counts_failed_builds():
+    builder= GenericBuilder(ExampleIntDescriptor.value1_name, SpecificBuildArtifact)
+    with pytest.raises(TypeError):
+        builder.build_many(None, [{"positional_arg": "a"}, {"unknown": 1}, {"positional_arg": "c"}])
+    assert builder.get_count() == 2
+    lazy_objs= builder.build_many(None, [{"positional_arg": "a"}, {"unknown": 1}], lazy= True)
+    with pytest.raises(TypeError):
+        list(lazy_objs)
+    assert builder.get_count() == 4
+    with pytest.raises(TypeError):
+        builder()
+    assert builder.get_count() == 5
+
+
+def test_generic_builder_build_columns():
+    builder= GenericBuilder(ExampleIntDescriptor.value1_name, SpecificBuildArtifactWithAdditionalArgs)
+    objs= builder.build_columns(None, ["a", "b"], [1, 2])
+    assert [(obj.positional_arg, obj.some_other_pos_arg, obj.keyword_arg) for obj in objs] == [("a", 1, 12), ("b", 2, 12)]
+    objs= builder.build_columns(None, ["a", "b"], some_other_pos_arg= [1, 2], foo= [3, 4])
+    assert [(obj.some_other_pos_arg, obj.keyword_arg) for obj in objs] == [(1, 3), (2, 4)]
+    assert builder.get_count() == 4
+    lazy_objs= builder.build_columns(None, iter("xyz"), range(3), lazy= True)
+    assert [obj.positional_arg for obj in lazy_objs] == ["x", "y", "z"]
+    assert builder.get_count() == 7
+    with pytest.raises(ValueError):
+        builder.build_columns(None, ["a", "b"], [1])
+    with pytest.raises(ValueError):
+        builder.build_columns(None, iter("ab"), [1])
+    with pytest.raises(ValueError):
+        builder.build_columns(None, ["a"], iter([1, 2]))
+    lazy_objs= builder.build_columns(None, iter("abc"), (i for i in range(2)), lazy= True)
+    assert next(lazy_objs).positional_arg == "a"
+    with pytest.raises(ValueError):
+        list(lazy_objs)
+    builder.set_fixed_args(foo= 7)
+    with pytest.raises(TypeError):
+        builder.build_columns(None, ["a"], [1], foo= [3])
+
+
+def test_generic_builder_concurrent_builds_and_registration():
+    import threading
+    builder= GenericBuilder(ExampleIntDescriptor.value1_name, SpecificBuildArtifact, "bar")
+    start= threading.Barrier(9)
+    errors= []
+    def build():
+        start.wait()
+        try:
+            for _ in range(2000):
+                assert builder(ExampleIntDescriptor.value1_name).positional_arg == "bar"
+                builder.build_many(None, [{}, {}])
+        except Exception as error:  # pragma: no cover
+            errors.append(error)
+    def register():
+        start.wait()
+        builder.register(ExampleIntDescriptor.value2_name, SpecificBuildArtifactWithAdditionalArgs)
+        builder.set_fixed_args(foo= 1)
+    threads= [threading.Thread(target=build) for _ in range(8)] + [threading.Thread(target=register)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert builder.get_count() == builder._count == 8 * 2000 * 3
+    assert builder(ExampleIntDescriptor.value2_name, 1).keyword_arg == 1
+
+
+def test_generic_builder_count_assignable_in_init_hook():
+    class RestartingBuilder(GenericBuilder):
+        def init_hook(self):
+            self._count= 10
+    builder= RestartingBuilder(ExampleIntDescriptor.value1_name, SpecificBuildArtifact, "bar")
+    builder()
+    assert builder.get_count() == builder._count == 11
+    builder._count= 0
+    assert builder.get_count() == 0
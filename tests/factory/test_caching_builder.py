@@ -0,0 +1,114 @@
+import pickle
+import pytest
+from pycmdlineapp_groundwork.factory.descriptor import IntDescriptor, auto
+from pycmdlineapp_groundwork.factory.generic_build_artefact import GenericBuildArtifact
+from pycmdlineapp_groundwork.factory.caching_builder import CachingBuilder
+from pycmdlineapp_groundwork.factory.factory import Factory
+from pycmdlineapp_groundwork.factory import caching_builder
+
+
+class CachedArtifact(GenericBuildArtifact):
+    def __init__(self, context, value= 0, options= ()):
+        self.context= context
+        self.value= value
+        self.options= options
+
+class OtherCachedArtifact(CachedArtifact):
+    pass
+
+class CachedTypes(IntDescriptor):
+    cached= auto()
+    other= auto()
+
+
+def test_caching_builder_hits_and_misses():
+    builder= CachingBuilder(CachedTypes.cached, CachedArtifact, "ctx")
+    builder.register(CachedTypes.other, OtherCachedArtifact)
+    obj= builder(value= 1)
+    assert builder(CachedTypes.cached, value= 1) is obj
+    assert builder(CachedTypes.cached, value= 2) is not obj
+    other= builder(CachedTypes.other, value= 1)
+    assert other is not obj and isinstance(other, OtherCachedArtifact)
+    assert builder(CachedTypes.cached, options= [1]) is not builder(CachedTypes.cached, options= [1])
+    assert builder.get_count() == 6
+    assert builder.get_cache_stats() == {"hits": 1, "misses": 3, "uncached": 2, "evictions": 0, "expirations": 0, "size": 3}
+    with pytest.raises(TypeError):
+        builder(context= "other")
+
+
+def test_caching_builder_lru_eviction():
+    builder= CachingBuilder(CachedTypes.cached, CachedArtifact, "ctx")
+    builder.set_cache_options(max_size= 2)
+    first= builder(value= 1)
+    second= builder(value= 2)
+    assert builder(value= 1) is first
+    builder(value= 3)
+    assert builder(value= 1) is first
+    assert builder(value= 2) is not second
+    stats= builder.get_cache_stats()
+    assert (stats["evictions"], stats["size"]) == (2, 2)
+    builder.set_cache_options(max_size= 1)
+    assert builder.get_cache_stats()["size"] == 1
+    builder.set_cache_options(max_size= 0)
+    assert builder(value= 1) is not builder(value= 1)
+    assert builder.get_cache_stats()["size"] == 0
+    with pytest.raises(ValueError):
+        builder.set_cache_options(max_size= -1)
+    with pytest.raises(ValueError):
+        builder.set_cache_options(ttl= 0)
+
+
+def test_caching_builder_ttl(monkeypatch):
+    now= [1000.0]
+    monkeypatch.setattr(caching_builder.time, "monotonic", lambda: now[0])
+    builder= CachingBuilder(CachedTypes.cached, CachedArtifact, "ctx")
+    builder.set_cache_options(ttl= 10)
+    obj= builder(value= 1)
+    now[0]+= 5
+    assert builder(value= 1) is obj
+    now[0]+= 6
+    assert builder(value= 1) is not obj
+    assert builder.get_cache_stats()["expirations"] == 1
+    # changing max_size only keeps the ttl
+    builder.set_cache_options(max_size= 10)
+    obj= builder(value= 2)
+    now[0]+= 11
+    assert builder(value= 2) is not obj
+    builder.set_cache_options(ttl= None)
+    obj= builder(value= 3)
+    now[0]+= 1000
+    assert builder(value= 3) is obj
+
+
+def test_caching_builder_without_ttl_does_not_read_clock(monkeypatch):
+    def fail():
+        raise AssertionError("clock read")
+    monkeypatch.setattr(caching_builder.time, "monotonic", fail)
+    builder= CachingBuilder(CachedTypes.cached, CachedArtifact, "ctx")
+    assert builder(value= 1) is builder(value= 1)
+
+
+def test_caching_builder_cleared_on_changes():
+    builder= CachingBuilder(CachedTypes.cached, CachedArtifact)
+    obj= builder(CachedTypes.cached, "ctx")
+    builder.set_fixed_args(value= 5)
+    assert builder.get_cache_stats()["size"] == 0
+    rebuilt= builder(CachedTypes.cached, "ctx")
+    assert rebuilt is not obj and rebuilt.value == 5
+    # registering and resolving lazy references keep the cached objects
+    builder.register(CachedTypes.other, f"{__name__}:OtherCachedArtifact")
+    assert builder(CachedTypes.cached, "ctx") is rebuilt
+    assert isinstance(builder(CachedTypes.other, "ctx"), OtherCachedArtifact)
+    assert builder(CachedTypes.cached, "ctx") is rebuilt
+    builder.clear_cache()
+    copied= pickle.loads(pickle.dumps(builder))
+    assert copied.get_cache_stats()["size"] == 0
+    assert copied(None, "ctx") is copied(None, "ctx")
+
+
+def test_caching_builder_in_factory():
+    factory= Factory()
+    factory.register_builder(CachingBuilder, CachedTypes.cached, CachedArtifact)
+    assert factory(CachedTypes.cached, "ctx") is factory(CachedTypes.cached, "ctx")
+    objs= factory.build_many(CachedTypes.cached, [{"context": "a"}, {"context": "a"}])
+    assert objs[0] is objs[1]
@@ -18,8 +18,8 @@ def test_str_descriptor(example_str_descriptor_value):
     assert param1.name == "value1_name"
     assert ExampleStrDescriptor("value2") == ExampleStrDescriptor.value2_name
     assert ExampleStrDescriptor["value2_name"] == ExampleStrDescriptor.value2_name
-    assert ExampleStrDescriptor.allowed_values() == ["value1", "value2"]
-    assert ExampleStrDescriptor.allowed_names() == ["value1_name", "value2_name"]
+    assert ExampleStrDescriptor.allowed_values() == ("value1", "value2")
+    assert ExampleStrDescriptor.allowed_names() == ("value1_name", "value2_name")
     assert str(param1) == "value1_name: value1"
         
 
@@ -44,8 +44,8 @@ def test_auto_str_descriptor(example_auto_str_descriptor_value):
     assert ExampleAutoStrDescriptor("value1_name") == ExampleAutoStrDescriptor.value1_name
 
     assert ExampleAutoStrDescriptor["value2_name"] == ExampleAutoStrDescriptor.value2_name
-    assert ExampleAutoStrDescriptor.allowed_values() == ["value1_name", "value2_name"]
-    assert ExampleAutoStrDescriptor.allowed_names() == ["value1_name", "value2_name"]
+    assert ExampleAutoStrDescriptor.allowed_values() == ("value1_name", "value2_name")
+    assert ExampleAutoStrDescriptor.allowed_names() == ("value1_name", "value2_name")
     assert str(param1) == "value1_name: value1_name"
 
 
@@ -66,6 +66,39 @@ def test_int_descriptor(example_int_descriptor_value):
     assert param1.name == "value1_name"
     assert ExampleIntDescriptor(1) == ExampleIntDescriptor.value1_name
     assert ExampleIntDescriptor["value2_name"] == ExampleIntDescriptor.value2_name
-    assert ExampleIntDescriptor.allowed_values() == [1,2]
-    assert ExampleIntDescriptor.allowed_names() == ["value1_name", "value2_name"]
+    assert ExampleIntDescriptor.allowed_values() == (1, 2)
+    assert ExampleIntDescriptor.allowed_names() == ("value1_name", "value2_name")
     assert str(param1) == "value1_name: 1"
+
+
+class ExampleAliasDescriptor(IntDescriptor):
+    value1_name= 1
+    value1_alias= 1
+    value2_name= 2
+
+
+def test_descriptor_cached_lookups():
+    assert ExampleStrDescriptor.allowed_values() is ExampleStrDescriptor.allowed_values()
+    assert ExampleStrDescriptor.is_allowed_value("value1")
+    assert not ExampleStrDescriptor.is_allowed_value("value1_name")
+    assert ExampleStrDescriptor.is_allowed_name("value1_name")
+    assert not ExampleStrDescriptor.is_allowed_name({})
+    assert ExampleStrDescriptor.from_value("value2") is ExampleStrDescriptor.value2_name
+    assert ExampleStrDescriptor.from_value(ExampleStrDescriptor.value2_name) is ExampleStrDescriptor.value2_name
+    assert ExampleStrDescriptor.from_value("unknown", "default") == "default"
+    assert ExampleStrDescriptor.from_value(["unhashable"]) is None
+    assert ExampleStrDescriptor.from_name("value1_name") is ExampleStrDescriptor.value1_name
+    assert ExampleStrDescriptor.from_name("value1") is None
+    assert ExampleIntDescriptor.from_value(2) is ExampleIntDescriptor.value2_name
+    assert ExampleIntDescriptor.is_allowed_value(1) and not ExampleIntDescriptor.is_allowed_value(3)
+
+
+def test_descriptor_aliases_and_functional_api():
+    assert ExampleAliasDescriptor.allowed_values() == (1, 2)
+    assert ExampleAliasDescriptor.allowed_names() == ("value1_name", "value2_name")
+    assert ExampleAliasDescriptor.from_name("value1_alias") is ExampleAliasDescriptor.value1_name
+    assert not ExampleAliasDescriptor.is_allowed_name("value1_alias")
+    Functional= AutoStrDescriptor("Functional", ["first", "second"])
+    assert Functional.allowed_values() == ("first", "second")
+    assert Functional.from_value("second") is Functional.second
+    assert StrDescriptor.allowed_values() == ()
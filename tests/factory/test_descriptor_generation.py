@@ -0,0 +1,61 @@
+import json
+import pytest
+from pycmdlineapp_groundwork.factory import descriptor_generation
+from pycmdlineapp_groundwork.factory.descriptor import AutoStrDescriptor, IntDescriptor, StrDescriptor
+from pycmdlineapp_groundwork.factory.descriptor_generation import descriptor_from_dict, descriptor_from_file
+from pycmdlineapp_groundwork.config import config_file_loaders
+
+
+def test_descriptor_from_dict():
+    Types= descriptor_from_dict("Types", {"first": "the first", "second": "the second", "alias": "the first"}, StrDescriptor)
+    assert issubclass(Types, StrDescriptor)
+    assert Types.allowed_names() == ("first", "second")
+    assert Types.alias is Types.first and Types("the second") is Types.second
+    assert descriptor_from_dict("Types", {"first": "the first", "second": "the second", "alias": "the first"}, StrDescriptor) is Types
+    assert descriptor_from_dict("Types", {"first": "the first"}, StrDescriptor) is not Types
+    Numbers= descriptor_from_dict("Numbers", ["one", "two"], IntDescriptor)
+    assert Numbers.allowed_values() == (1, 2)
+    Large= descriptor_from_dict("Large", (f"type{index}" for index in range(5000)), IntDescriptor)
+    assert len(Large) == 5000 and Large.type4999 == 5000
+    with pytest.raises(TypeError):
+        descriptor_from_dict("Invalid", {1: "one"})
+    with pytest.raises(TypeError):
+        descriptor_from_dict("Invalid", ["twice", "twice"])
+
+
+def test_descriptor_from_file(tmp_path, monkeypatch):
+    config_file= tmp_path / "catalogue.json"
+    config_file.write_text(json.dumps({"catalogue": {"messages": {"message1": None, "message2": "second"}}}))
+    cache_dir= tmp_path / "cache"
+    Messages= descriptor_from_file("Messages", config_file, "catalogue.messages", AutoStrDescriptor, cache_dir= cache_dir)
+    assert Messages.allowed_values() == ("message1", "second")
+    assert len(list(cache_dir.iterdir())) == 1
+    assert descriptor_from_file("Messages", config_file, "catalogue.messages", cache_dir= cache_dir) is Messages
+
+    # a new process has no generated classes, but reads the members from the disk cache without parsing
+    monkeypatch.setattr(descriptor_generation, "_generated", {})
+    def fail(*args, **kwargs):
+        raise AssertionError("config file parsed")
+    monkeypatch.setattr(config_file_loaders, "load_dict_from_file", fail)
+    Cached= descriptor_from_file("Messages", config_file, "catalogue.messages", cache_dir= cache_dir)
+    assert Cached is not Messages and Cached.allowed_values() == Messages.allowed_values()
+    monkeypatch.undo()
+
+    config_file.write_text(json.dumps({"catalogue": {"messages": ["message3"]}}))
+    Changed= descriptor_from_file("Messages", config_file, "catalogue.messages", cache_dir= cache_dir)
+    assert Changed.allowed_values() == ("message3",)
+    assert len(list(cache_dir.iterdir())) == 2
+    with pytest.raises(KeyError):
+        descriptor_from_file("Messages", config_file, "catalogue.unknown", use_disk_cache= False)
+
+
+def test_descriptor_from_dict_cached_by_content(monkeypatch):
+    monkeypatch.setattr(descriptor_generation, "_generated", {})
+    # names built at run time are not interned, so equal lists hold distinct str objects
+    names= ["-".join(("generated", "name", str(index))) for index in range(1000)]
+    Generated= descriptor_from_dict("Generated", names, IntDescriptor)
+    assert descriptor_from_dict("Generated", names, IntDescriptor) is Generated
+    copied= ["-".join(("generated", "name", str(index))) for index in range(1000)]
+    assert descriptor_from_dict("Generated", copied, IntDescriptor) is Generated
+    assert descriptor_from_dict("Generated", list(names), IntDescriptor) is Generated
+    assert len(descriptor_generation._generated) == 1
@@ -65,3 +65,76 @@ def test_factory():
         message= message_provider(MyMessageTypes.message3)
     message= message_provider(MyMessageTypes.message2, 24)
     assert str(message) == "foobar: 24"
+
+
+def test_factory_build_many():
+    message_provider= Factory()
+    message_provider.register_builder(MyMessageBuilder, MyMessageTypes.message1, MyMessage1)
+    message_provider.register_builder(MyMessageBuilder, MyMessageTypes.message2, MyMessage2)
+    messages= message_provider.build_many(MyMessageTypes.message2, [{"number": 1}, {"number": 2}])
+    assert [str(message) for message in messages] == ["foobar: 1", "foobar: 2"]
+    messages= message_provider.build_many(None, [{"text": "a"}], lazy= True)
+    assert [str(message) for message in messages] == ["foobar: a"]
+    messages= message_provider.build_columns(MyMessageTypes.message2, [3, 4])
+    assert [str(message) for message in messages] == ["foobar: 3", "foobar: 4"]
+    with pytest.raises(ValueError):
+        message_provider.build_many(MyMessageTypes.message3, [{}])
+    with pytest.raises(ValueError):
+        Factory().build_columns(None, [1])
+
+
+def test_factory_register_builder_atomic():
+    message_provider= Factory()
+    message_provider.register_builder(MyMessageBuilder, MyMessageTypes.message2, MyMessage2)
+    builder= MyMessageBuilder(MyMessageTypes.message1, MyMessage1)
+    builder.register(MyMessageTypes.message2, MyMessage2)
+    with pytest.raises(ValueError):
+        message_provider.register_builder(builder)
+    assert list(message_provider._builder_registry.keys()) == [MyMessageTypes.message2]
+
+
+def test_factory_concurrent_registration():
+    import threading
+    keys= list(StrDescriptor("ManyTypes", {f"key{i}": f"key{i}" for i in range(50)}))
+    message_provider= Factory()
+    message_provider.register_builder(MyMessageBuilder, MyMessageTypes.message1, MyMessage1)
+    start= threading.Barrier(5)
+    def register(offset):
+        start.wait()
+        for key in keys[offset::4]:
+            message_provider.register_builder(MyMessageBuilder, key, MyMessage1)
+    def build():
+        start.wait()
+        for _ in range(2000):
+            assert str(message_provider(MyMessageTypes.message1, text= "t")) == "foobar: t"
+    threads= [threading.Thread(target=register, args=(offset,)) for offset in range(4)] + [threading.Thread(target=build)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(message_provider._builder_registry) == 51
+
+
+def test_factory_build_from_value():
+    from enum import Enum
+    class PlainTypes(Enum):
+        plain= 1
+    message_provider= Factory()
+    message_provider.register_builder(MyMessageBuilder, MyMessageTypes.message1, MyMessage1)
+    message_provider.register_builder(MyMessageBuilder, MyMessageTypes.message2, MyMessage2)
+    assert str(message_provider.build_from_value(1, text= "a")) == "foobar: a"
+    assert str(message_provider.build_from_value(MyMessageTypes.message2, 42)) == "foobar: 42"
+    with pytest.raises(ValueError):
+        message_provider.build_from_value(3)
+    with pytest.raises(ValueError):
+        message_provider.build_from_value([1])
+    objs= message_provider.build_many_from_values([(1, {"text": "a"}), (2, {"number": 1}), (1, {"text": "b"})])
+    assert [str(obj) for obj in objs] == ["foobar: a", "foobar: 1", "foobar: b"]
+    assert message_provider.build_many_from_values([]) == []
+    with pytest.raises(ValueError):
+        message_provider.build_many_from_values([(1, {"text": "a"}), (3, {})])
+    message_provider.register_builder(MyMessageBuilder, PlainTypes.plain, MyMessage1)
+    with pytest.raises(ValueError, match= "several"):
+        message_provider.build_from_value(1)
+    assert str(message_provider(MyMessageTypes.message1, text= "c")) == "foobar: c"
+    assert str(message_provider.build_from_value(2, 43)) == "foobar: 43"
@@ -15,7 +15,64 @@ class MyDescriptor(IntDescriptor):
 def test_generic_build_artifact():
     artifact= GenericBuildArtifact()
     assert isinstance(artifact, GenericBuildArtifact)
+    artifact.anything= 1
     builder= GenericBuilder(MyDescriptor.myclass, MyClass, 42)
     obj= builder()
     assert isinstance(obj, MyClass)
     assert obj._some == 42
+
+
+def test_slotted_build_artifact():
+    from typing import ClassVar
+    from pycmdlineapp_groundwork.factory.generic_build_artefact import SlottedBuildArtifact
+
+    class SlottedClass(SlottedBuildArtifact):
+        kind: ClassVar[str]= "slotted"
+        some: int
+        other: "typing.ClassVar[int]"= 1
+        def __init__(self, some_arg):
+            self.some= some_arg
+
+    class DerivedSlottedClass(SlottedClass):
+        some: int
+        more: str
+        def __init__(self, some_arg, more= "more"):
+            super().__init__(some_arg)
+            self.more= more
+
+    assert SlottedClass.__slots__ == ("some",)
+    assert DerivedSlottedClass.__slots__ == ("more",)
+    builder= GenericBuilder(MyDescriptor.myclass, DerivedSlottedClass, 42)
+    obj= builder()
+    assert (obj.some, obj.more, obj.kind) == (42, "more", "slotted")
+    assert not hasattr(obj, "__dict__")
+    with pytest.raises(AttributeError):
+        obj.undeclared= 1
+    with pytest.raises(TypeError):
+        class DefaultClass(SlottedBuildArtifact):
+            some: int= 1
+
+
+def test_slotted_build_artifact_with_abc():
+    from abc import ABC, abstractmethod
+    from pycmdlineapp_groundwork.factory.generic_build_artefact import SlottedBuildArtifact
+
+    class Shape(ABC):
+        __slots__= ()
+        @abstractmethod
+        def area(self): ...
+
+    class Square(SlottedBuildArtifact, Shape):
+        side: float
+        def __init__(self, side):
+            self.side= side
+        def area(self):
+            return self.side ** 2
+
+    class Unfinished(SlottedBuildArtifact, Shape):
+        side: float
+
+    square= Square(2.0)
+    assert (square.area(), hasattr(square, "__dict__")) == (4.0, False)
+    with pytest.raises(TypeError):
+        Unfinished()
@@ -0,0 +1,84 @@
+import math
+import pickle
+import pytest
+from pycmdlineapp_groundwork.factory.descriptor import IntDescriptor, auto
+from pycmdlineapp_groundwork.factory.generic_build_artefact import GenericBuildArtifact
+from pycmdlineapp_groundwork.factory.builder import GenericBuilder
+from pycmdlineapp_groundwork.factory.factory import Factory
+from pycmdlineapp_groundwork.factory.instrumentation import BuildInstrumentation, BuildMetrics
+
+
+class InstrumentedArtifact(GenericBuildArtifact):
+    def __init__(self, value= 0):
+        if value < 0:
+            raise ValueError("negative value")
+        self.value= value
+
+class InstrumentedTypes(IntDescriptor):
+    first= auto()
+    second= auto()
+
+
+def test_build_metrics_histogram():
+    metrics= BuildMetrics((0.001, 0.01, 0.1))
+    assert math.isnan(metrics.percentile(0.5))
+    for seconds in (0.0005, 0.001, 0.005, 0.05, 0.5):
+        metrics.record(seconds)
+    metrics.record_failure()
+    assert metrics.counts == [2, 1, 1, 1]
+    assert metrics.count == 5
+    assert metrics.percentile(0.4) == 0.001
+    assert metrics.percentile(0.6) == 0.01
+    assert metrics.percentile(1.0) == 0.5
+    exported= metrics.as_dict()
+    assert exported["buckets"] == {"0.001": 2, "0.01": 3, "0.1": 4, "+Inf": 5}
+    assert exported["failures"] == 1
+    assert exported["total_seconds"] == pytest.approx(0.5565)
+    with pytest.raises(ValueError):
+        BuildInstrumentation((0.1, 0.01))
+
+
+def test_builder_instrumentation():
+    builder= GenericBuilder(InstrumentedTypes.first, InstrumentedArtifact)
+    instrumentation= builder.enable_instrumentation()
+    builder(value= 1)
+    builder.build_many(InstrumentedTypes.first, [{"value": 2}, {"value": 3}])
+    with pytest.raises(ValueError):
+        builder(value= -1)
+    builder.set_fixed_args(value= 4)
+    builder()
+    metrics= instrumentation.as_dict()["InstrumentedTypes.first"]
+    assert (metrics["count"], metrics["failures"]) == (4, 1)
+    assert metrics["p99_seconds"] >= metrics["p50_seconds"] > 0
+    copied= pickle.loads(pickle.dumps(builder))
+    assert copied._instrumentation is None and copied().value == 4
+    builder.disable_instrumentation()
+    assert builder._compiled_registry[InstrumentedTypes.first].func is InstrumentedArtifact
+    builder()
+    assert instrumentation.as_dict()["InstrumentedTypes.first"]["count"] == 4
+    instrumentation.reset()
+    assert instrumentation.as_dict()["InstrumentedTypes.first"]["count"] == 0
+
+
+def test_factory_instrumentation(tmp_path):
+    factory= Factory()
+    factory.register_builder(GenericBuilder, InstrumentedTypes.first, InstrumentedArtifact)
+    instrumentation= factory.enable_instrumentation()
+    factory.register_builder(GenericBuilder, InstrumentedTypes.second, "tests.factory.test_instrumentation:InstrumentedArtifact")
+    factory(InstrumentedTypes.first, 1)
+    factory(InstrumentedTypes.second, 2)
+    factory.build_from_value(2, 3)
+    assert {label: metrics["count"] for label, metrics in instrumentation.as_dict().items()} == {
+        "InstrumentedTypes.first": 1, "InstrumentedTypes.second": 2
+    }
+    text= instrumentation.to_prometheus("app_build")
+    assert "# TYPE app_build_duration_seconds histogram" in text
+    assert 'app_build_duration_seconds_bucket{descriptor="InstrumentedTypes.second",le="+Inf"} 2' in text
+    assert 'app_build_duration_seconds_count{descriptor="InstrumentedTypes.first"} 1' in text
+    assert 'app_build_failures_total{descriptor="InstrumentedTypes.first"} 0' in text
+    prom_file= tmp_path / "build.prom"
+    instrumentation.write_prometheus(prom_file, "app_build")
+    assert prom_file.read_text() == text
+    factory.disable_instrumentation()
+    factory(InstrumentedTypes.first, 1)
+    assert instrumentation.as_dict()["InstrumentedTypes.first"]["count"] == 1
@@ -0,0 +1,94 @@
+import sys
+import pytest
+from pycmdlineapp_groundwork.factory.descriptor import IntDescriptor, auto
+from pycmdlineapp_groundwork.factory.builder import GenericBuilder
+from pycmdlineapp_groundwork.factory.pooled_builder import PooledBuilder
+from pycmdlineapp_groundwork.factory.factory import Factory
+from pycmdlineapp_groundwork.factory.lazy_reference import LazyReference
+
+LAZY_MODULE= "tests.factory.lazy_artifacts"
+
+
+class LazyTypes(IntDescriptor):
+    lazy= auto()
+    nested= auto()
+    loaded= auto()
+    missing= auto()
+
+
+@pytest.fixture
+def unimported():
+    sys.modules.pop(LAZY_MODULE, None)
+    yield
+    sys.modules.pop(LAZY_MODULE, None)
+
+
+def test_lazy_reference():
+    with pytest.raises(ValueError):
+        LazyReference("no_class_given")
+    with pytest.raises(ValueError):
+        LazyReference(":Class")
+    with pytest.raises(TypeError):
+        LazyReference(42)
+    reference= LazyReference(f"{LAZY_MODULE}:LazyArtifact.Nested")
+    assert reference.__name__ == "Nested"
+    assert reference == LazyReference(f"{LAZY_MODULE}:LazyArtifact.Nested")
+    assert reference.resolve().__qualname__ == "LazyArtifact.Nested"
+    with pytest.raises(AttributeError):
+        LazyReference(f"{LAZY_MODULE}:Missing").resolve()
+    with pytest.raises(ImportError):
+        LazyReference("tests.factory.no_such_module:Missing").resolve()
+
+
+def test_generic_builder_lazy_registration(unimported):
+    builder= GenericBuilder(LazyTypes.lazy, f"{LAZY_MODULE}:LazyArtifact", "ctx")
+    loader_calls= []
+    def loader():
+        loader_calls.append(1)
+        from tests.factory.lazy_artifacts import LazyArtifact
+        return LazyArtifact
+    builder.register(LazyTypes.loaded, LazyReference(loader))
+    assert LAZY_MODULE not in sys.modules
+    assert str(builder) == "Builder 'GenericBuilder' building [lazy: 1 => LazyArtifact, loaded: 3 => loader]"
+    obj= builder(value= 1)
+    assert LAZY_MODULE in sys.modules
+    assert (type(obj).__name__, obj.context, obj.value) == ("LazyArtifact", "ctx", 1)
+    assert builder._registry[LazyTypes.lazy] is type(obj)
+    assert builder._compiled_registry[LazyTypes.lazy].func is type(obj)
+    assert builder(LazyTypes.loaded).context == "ctx"
+    assert builder(LazyTypes.loaded, value= 2).value == 2
+    assert loader_calls == [1]
+    assert builder.get_count() == 3
+
+
+def test_lazy_registration_errors_raised_on_build():
+    builder= GenericBuilder(LazyTypes.missing, "tests.factory.no_such_module:Missing")
+    with pytest.raises(ImportError):
+        builder()
+    assert builder.prewarm(background= True).join() is None
+    with pytest.raises(ImportError):
+        builder.prewarm()
+    with pytest.raises(ImportError):
+        builder(LazyTypes.missing)
+
+
+def test_pooled_builder_lazy_registration(unimported):
+    builder= PooledBuilder(LazyTypes.lazy, f"{LAZY_MODULE}:LazyArtifact", "ctx")
+    obj= builder()
+    assert builder.release(obj)
+    assert builder(value= 5) is obj
+
+
+def test_factory_lazy_registration_and_prewarm(unimported):
+    factory= Factory()
+    factory.register_builder(GenericBuilder, LazyTypes.lazy, f"{LAZY_MODULE}:LazyArtifact")
+    factory.register_builder(GenericBuilder, LazyTypes.nested, f"{LAZY_MODULE}:LazyArtifact.Nested")
+    assert LAZY_MODULE not in sys.modules
+    factory.prewarm(background= True).join()
+    assert LAZY_MODULE in sys.modules
+    assert not any(isinstance(builder._registry[key], LazyReference) for key, builder in factory._builder_registry.items())
+    assert factory(LazyTypes.lazy, "ctx").context == "ctx"
+    assert type(factory(LazyTypes.nested)).__name__ == "Nested"
+    factory.register_builder(GenericBuilder, LazyTypes.missing, "tests.factory.no_such_module:Missing")
+    with pytest.raises(ImportError):
+        factory.prewarm()
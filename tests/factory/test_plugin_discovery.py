@@ -0,0 +1,100 @@
+import os
+import sys
+import logging
+import pytest
+from pycmdlineapp_groundwork.factory.descriptor import StrDescriptor
+from pycmdlineapp_groundwork.factory.builder import GenericBuilder
+from pycmdlineapp_groundwork.factory.pooled_builder import PooledBuilder
+from pycmdlineapp_groundwork.factory.factory import Factory
+from pycmdlineapp_groundwork.factory.lazy_reference import LazyReference
+from pycmdlineapp_groundwork.factory import plugin_discovery
+from pycmdlineapp_groundwork.factory.plugin_discovery import PluginIndex, discover_plugins, distributions_fingerprint
+
+GROUP= "pycmdlineapp_tests.artifacts"
+
+
+class PluginTypes(StrDescriptor):
+    lazy= "lazy"
+    nested= "nested"
+    other= "other"
+
+
+def write_distribution(path, name, entry_points):
+    dist_info= path / f"{name}-1.0.dist-info"
+    dist_info.mkdir()
+    (dist_info / "METADATA").write_text(f"Name: {name}\nVersion: 1.0\n")
+    (dist_info / "entry_points.txt").write_text(entry_points)
+    return dist_info
+
+
+@pytest.fixture
+def scan_counter(monkeypatch):
+    calls= []
+    scan= plugin_discovery._scan_entry_points
+    def counting_scan(paths= None):
+        calls.append(paths)
+        return scan(paths)
+    monkeypatch.setattr(plugin_discovery, "_scan_entry_points", counting_scan)
+    return calls
+
+
+def test_discover_plugins(tmp_path, scan_counter, caplog):
+    write_distribution(tmp_path, "lazy_plugin", f"[{GROUP}]\n"
+        "lazy = tests.factory.lazy_artifacts:LazyArtifact\n"
+        "nested = tests.factory.lazy_artifacts:LazyArtifact.Nested\n"
+        "unknown = tests.factory.lazy_artifacts:LazyArtifact\n"
+        "[other.group]\nother = foo:bar\n")
+    index= PluginIndex(tmp_path / "cache" / "index.json", paths= [str(tmp_path)])
+    factory= Factory()
+    with caplog.at_level(logging.WARNING):
+        registered= discover_plugins(factory, GROUP, PluginTypes, PooledBuilder, index= index)
+    assert registered == [PluginTypes.lazy, PluginTypes.nested]
+    assert "unknown" in caplog.text
+    assert isinstance(factory._builder_registry[PluginTypes.lazy], PooledBuilder)
+    assert isinstance(factory._builder_registry[PluginTypes.lazy]._registry[PluginTypes.lazy], LazyReference)
+    assert factory(PluginTypes.lazy, "ctx").context == "ctx"
+    assert discover_plugins(factory, GROUP, PluginTypes, index= index) == []
+    assert len(scan_counter) == 1
+
+
+def test_plugin_index_cached_until_distributions_change(tmp_path, scan_counter):
+    distributions= tmp_path / "site"
+    distributions.mkdir()
+    dist_info= write_distribution(distributions, "plugin_a", f"[{GROUP}]\nlazy = a:A\n")
+    index_path= tmp_path / "index.json"
+    assert PluginIndex(index_path, paths= [str(distributions)]).entry_points(GROUP) == [("lazy", "a:A")]
+    assert index_path.exists()
+    assert PluginIndex(index_path, paths= [str(distributions)]).entry_points(GROUP) == [("lazy", "a:A")]
+    assert PluginIndex(index_path, paths= [str(distributions)]).entry_points("no.such.group") == []
+    assert len(scan_counter) == 1
+
+    write_distribution(distributions, "plugin_b", f"[{GROUP}]\nother = b:B\n")
+    assert sorted(PluginIndex(index_path, paths= [str(distributions)]).entry_points(GROUP)) == [("lazy", "a:A"), ("other", "b:B")]
+    assert len(scan_counter) == 2
+
+    fingerprint= distributions_fingerprint([str(distributions)])
+    stat= dist_info.stat()
+    os.utime(dist_info, ns= (stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert distributions_fingerprint([str(distributions)]) != fingerprint
+    index= PluginIndex(index_path, paths= [str(distributions)])
+    index.entry_points(GROUP)
+    assert len(scan_counter) == 3
+    index.invalidate()
+    assert not index_path.exists()
+    index.entry_points(GROUP)
+    assert len(scan_counter) == 4
+
+
+def test_plugin_index_corrupt_or_unwritable(tmp_path, scan_counter):
+    index_path= tmp_path / "index.json"
+    index_path.write_text("{not json")
+    assert PluginIndex(index_path, paths= [str(tmp_path)]).entry_points(GROUP) == []
+    blocking_file= tmp_path / "file"
+    blocking_file.write_text("")
+    assert PluginIndex(blocking_file / "index.json", paths= [str(tmp_path)]).entry_points(GROUP) == []
+    assert distributions_fingerprint([str(tmp_path / "missing"), str(blocking_file)]) == distributions_fingerprint([])
+
+
+def test_default_index_path(monkeypatch, tmp_path):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    assert plugin_discovery.default_index_path() == tmp_path / "pycmdlineapp_groundwork" / "plugin_index.json"
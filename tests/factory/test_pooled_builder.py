@@ -0,0 +1,117 @@
+import pytest
+from pycmdlineapp_groundwork.factory.descriptor import IntDescriptor, auto
+from pycmdlineapp_groundwork.factory.generic_build_artefact import GenericBuildArtifact
+from pycmdlineapp_groundwork.factory.builder import GenericBuilder
+from pycmdlineapp_groundwork.factory.pooled_builder import PooledBuilder
+from pycmdlineapp_groundwork.factory.factory import Factory
+
+
+class PooledArtifact(GenericBuildArtifact):
+    def __init__(self, context, value= 0):
+        self.context= context
+        self.value= value
+    def recycle_build_artifact(self, context, value= 0):
+        self.__init__(context, value)
+
+class ResettingArtifact(GenericBuildArtifact):
+    def __init__(self, context, value= 0):
+        self.items= [value]
+        self.resets= 0
+    def recycle_build_artifact(self, context, value= 0):
+        self.items.clear()
+        self.items.append(value)
+        self.resets+= 1
+
+class OtherArtifact(GenericBuildArtifact):
+    pass
+
+class UserResetArtifact(GenericBuildArtifact):
+    def __init__(self):
+        self.reset_calls= 0
+    def reset(self):
+        self.reset_calls+= 1
+
+class PooledTypes(IntDescriptor):
+    pooled= auto()
+    resetting= auto()
+    other= auto()
+
+
+def test_pooled_builder_recycles():
+    builder= PooledBuilder(PooledTypes.pooled, PooledArtifact, "ctx")
+    obj1= builder(PooledTypes.pooled, value= 1)
+    assert builder.release(obj1)
+    obj2= builder(value= 2)
+    assert obj2 is obj1
+    assert (obj2.context, obj2.value) == ("ctx", 2)
+    obj3= builder(PooledTypes.pooled, value= 3)
+    assert obj3 is not obj1
+    assert builder.get_count() == 3
+    assert builder.get_pool_stats() == {
+        PooledTypes.pooled: {"hits": 1, "misses": 2, "released": 1, "discarded": 0, "pooled": 0}
+    }
+    with pytest.raises(TypeError):
+        builder(PooledTypes.pooled, "ctx2", context= "ctx3")
+
+
+def test_pooled_builder_reset_hook_and_bulk_build():
+    builder= PooledBuilder(PooledTypes.resetting, ResettingArtifact, "ctx")
+    objs= builder.build_many(PooledTypes.resetting, [{"value": i} for i in range(3)])
+    for obj in objs:
+        builder.release(obj, PooledTypes.resetting)
+    recycled= builder.build_columns(PooledTypes.resetting, value= [7, 8, 9])
+    assert {id(obj) for obj in recycled} == {id(obj) for obj in objs}
+    assert sorted(obj.items[0] for obj in recycled) == [7, 8, 9]
+    assert all(obj.resets == 1 for obj in recycled)
+
+
+def test_pooled_builder_without_recycle_hook():
+    builder= PooledBuilder(PooledTypes.other, UserResetArtifact)
+    obj= builder()
+    assert not builder.release(obj)
+    assert builder() is not obj
+    assert obj.reset_calls == 0
+    assert builder.get_pool_stats() == {
+        PooledTypes.other: {"hits": 0, "misses": 2, "released": 0, "discarded": 1, "pooled": 0}
+    }
+
+
+def test_pooled_builder_bounded_pool():
+    builder= PooledBuilder(PooledTypes.pooled, PooledArtifact, "ctx")
+    builder.set_pool_size(2)
+    objs= [builder() for _ in range(3)]
+    assert [builder.release(obj) for obj in objs] == [True, True, False]
+    stats= builder.get_pool_stats()[PooledTypes.pooled]
+    assert (stats["released"], stats["discarded"], stats["pooled"]) == (2, 1, 2)
+    builder.set_pool_size(1)
+    assert builder.get_pool_stats()[PooledTypes.pooled]["pooled"] == 1
+    builder.clear_pools()
+    assert builder.get_pool_stats()[PooledTypes.pooled]["pooled"] == 0
+    with pytest.raises(ValueError):
+        builder.set_pool_size(-1)
+
+
+def test_pooled_builder_release_errors():
+    builder= PooledBuilder(PooledTypes.pooled, PooledArtifact, "ctx")
+    with pytest.raises(ValueError):
+        builder.release(OtherArtifact())
+    with pytest.raises(ValueError):
+        builder.release(builder(), PooledTypes.other)
+    builder.register(PooledTypes.other, OtherArtifact)
+    assert builder.release(ResettingArtifact("ctx"), PooledTypes.other)
+    assert builder.get_pool_stats()[PooledTypes.other]["pooled"] == 1
+    assert builder.get_pool_stats()[PooledTypes.pooled]["pooled"] == 0
+
+
+def test_factory_release():
+    factory= Factory()
+    factory.register_builder(PooledBuilder(PooledTypes.pooled, PooledArtifact, "ctx"))
+    factory.register_builder(GenericBuilder, PooledTypes.other, OtherArtifact)
+    obj= factory(PooledTypes.pooled)
+    assert factory.release(obj)
+    assert factory(PooledTypes.pooled, value= 5) is obj
+    assert not factory.release(factory(PooledTypes.other))
+    with pytest.raises(ValueError):
+        factory.release(ResettingArtifact("ctx"))
+    with pytest.raises(ValueError):
+        factory.release(obj, PooledTypes.resetting)
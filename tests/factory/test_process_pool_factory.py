@@ -0,0 +1,99 @@
+import os
+import pytest
+from pycmdlineapp_groundwork.factory.descriptor import IntDescriptor, auto
+from pycmdlineapp_groundwork.factory.generic_build_artefact import GenericBuildArtifact
+from pycmdlineapp_groundwork.factory.builder import GenericBuilder
+from pycmdlineapp_groundwork.factory.pooled_builder import PooledBuilder
+from pycmdlineapp_groundwork.factory.process_pool_factory import ProcessPoolFactory
+
+
+class HeavyArtifact(GenericBuildArtifact):
+    def __init__(self, context, value= 0):
+        self.context= context
+        self.value= value
+        self.pid= os.getpid()
+
+class OtherHeavyArtifact(GenericBuildArtifact):
+    def __init__(self, value, label= ""):
+        self.value= value
+        self.label= label
+
+class FailingArtifact(GenericBuildArtifact):
+    def __init__(self):
+        raise RuntimeError("constructor failed")
+
+class HeavyTypes(IntDescriptor):
+    heavy= auto()
+    other= auto()
+    failing= auto()
+
+
+@pytest.fixture
+def process_factory():
+    factory= ProcessPoolFactory(max_workers= 2, chunk_size= 4)
+    yield factory
+    factory.shutdown()
+
+
+def test_process_pool_factory_submit(process_factory):
+    process_factory.register_builder(GenericBuilder(HeavyTypes.heavy, HeavyArtifact, "ctx"))
+    obj= process_factory.submit(HeavyTypes.heavy, value= 42).result()
+    assert (obj.context, obj.value) == ("ctx", 42)
+    assert obj.pid != os.getpid()
+    assert process_factory.submit(value= 1).result().value == 1
+    local_obj= process_factory(HeavyTypes.heavy, value= 2)
+    assert local_obj.pid == os.getpid()
+    with pytest.raises(ValueError):
+        process_factory.submit(HeavyTypes.other)
+    assert process_factory._wire_key(HeavyTypes.heavy) == 1 and type(process_factory._wire_key(HeavyTypes.heavy)) is int
+    assert process_factory.build_columns(HeavyTypes.heavy, value= [3, 4])[1].value == 4
+
+
+def test_process_pool_factory_build_many_ordered(process_factory):
+    process_factory.register_builder(PooledBuilder(HeavyTypes.heavy, HeavyArtifact, "ctx"))
+    objs= process_factory.build_many(HeavyTypes.heavy, [{"value": i} for i in range(50)])
+    assert [obj.value for obj in objs] == list(range(50))
+    lazy_objs= process_factory.build_many(HeavyTypes.heavy, ({"value": i} for i in range(10)), lazy= True, chunk_size= 1)
+    assert [obj.value for obj in lazy_objs] == list(range(10))
+
+
+def test_process_pool_factory_registration_restarts_pool(process_factory):
+    process_factory.register_builder(GenericBuilder, HeavyTypes.heavy, HeavyArtifact)
+    assert process_factory.submit(HeavyTypes.heavy, "ctx").result().context == "ctx"
+    with pytest.raises(ValueError):
+        process_factory.register_builder(GenericBuilder, HeavyTypes.heavy, OtherHeavyArtifact)
+    process_factory.register_builder(GenericBuilder, HeavyTypes.other, OtherHeavyArtifact)
+    objs= process_factory.build_columns(HeavyTypes.other, [1, 2, 3], label= ["a", "b", "c"])
+    assert [(obj.value, obj.label) for obj in objs] == [(1, "a"), (2, "b"), (3, "c")]
+    with pytest.raises(ValueError):
+        process_factory.build_columns(HeavyTypes.other, [1, 2], label= ["a"])
+
+
+def test_process_pool_factory_errors():
+    with pytest.raises(ValueError):
+        ProcessPoolFactory(chunk_size= 0)
+    with ProcessPoolFactory(max_workers= 1) as factory:
+        with pytest.raises(ValueError):
+            factory.submit()
+        factory.register_builder(GenericBuilder, HeavyTypes.failing, FailingArtifact)
+        with pytest.raises(RuntimeError):
+            factory.submit(HeavyTypes.failing).result()
+    assert factory._pool is None
+
+
+def test_process_pool_factory_takes_arguments_on_demand():
+    pulled= []
+    def arguments():
+        for i in range(100):
+            pulled.append(i)
+            yield {"value": i}
+    with ProcessPoolFactory(max_workers= 1, chunk_size= 2) as factory:
+        factory.register_builder(GenericBuilder(HeavyTypes.heavy, HeavyArtifact, "ctx"))
+        objs= factory.build_many(HeavyTypes.heavy, arguments(), lazy= True)
+        # two chunks of two requests for the single worker
+        assert len(pulled) == 4
+        assert [next(objs).value for _ in range(3)] == [0, 1, 2]
+        assert len(pulled) <= 8
+        assert [obj.value for obj in objs] == list(range(3, 100))
+        objs= factory.build_columns(HeavyTypes.heavy, value= list(range(5)), chunk_size= 3)
+        assert [obj.value for obj in objs] == list(range(5))
@@ -0,0 +1,31 @@
+import threading
+from pycmdlineapp_groundwork.utility.concurrent_counter import ConcurrentCounter
+
+
+def test_concurrent_counter():
+    counter= ConcurrentCounter(10)
+    assert counter.value() == 10
+    counter.increment()
+    counter.increment(5)
+    assert int(counter) == 16
+    assert repr(counter) == "ConcurrentCounter(16)"
+
+
+def test_concurrent_counter_threads():
+    counter= ConcurrentCounter()
+    start= threading.Barrier(8)
+    def work():
+        start.wait()
+        for _ in range(10000):
+            counter.increment()
+    for _ in range(3):
+        threads= [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert counter.value() == 3 * 8 * 10000
+    # cells of finished threads are folded on the next new cell
+    counter.increment()
+    assert len(counter._cells) == 1
+    assert counter.value() == 3 * 8 * 10000 + 1
@@ -0,0 +1,88 @@
+import pytest
+import pickle
+import sys
+from array import array
+
+from pycmdlineapp_groundwork.utility.dict_compaction import (
+    FrozenDict,
+    compact_dict,
+    deep_getsizeof,
+    MIN_PACK_LENGTH,
+)
+
+
+def _example_tree():
+    return {
+        "sections": [
+            {"name": "section" + str(index), "mode": "".join(["fa", "st"]), "port": index}
+            for index in range(200)
+        ],
+        "ints": list(range(100)),
+        "floats": [index / 2 for index in range(100)],
+        "mixed": [1, 2.0] * MIN_PACK_LENGTH,
+        "bools": [True, False] * MIN_PACK_LENGTH,
+        "short": [1, 2],
+        "huge_ints": [2 ** 70] * MIN_PACK_LENGTH,
+        "tags": {"a", "b"},
+        "nothing": None,
+    }
+
+
+def test_compact_dict_defaults():
+    source = _example_tree()
+    compacted, report = compact_dict(source)
+    assert compacted is not source
+    assert source["ints"] == list(range(100))
+    assert isinstance(compacted["ints"], array) and compacted["ints"].typecode == "q"
+    assert isinstance(compacted["floats"], array) and compacted["floats"].typecode == "d"
+    assert compacted["mixed"] == [1, 2.0] * MIN_PACK_LENGTH
+    assert compacted["bools"] == [True, False] * MIN_PACK_LENGTH
+    assert compacted["short"] == [1, 2]
+    assert compacted["huge_ints"] == [2 ** 70] * MIN_PACK_LENGTH
+    assert compacted["tags"] == {"a", "b"}
+    assert compacted["nothing"] is None
+    modes = {id(section["mode"]) for section in compacted["sections"]}
+    assert len(modes) == 1
+    assert report.packed_lists == 2
+    assert report.deduplicated_strings >= 199
+    assert report.frozen_dicts == 0
+    assert report.bytes_saved == report.bytes_before - report.bytes_after > 0
+    assert report.as_dict()["bytes_saved"] == report.bytes_saved
+    assert "saved" in str(report)
+
+
+def test_compact_dict_freeze():
+    compacted, report = compact_dict(_example_tree(), pack_number_lists=False, freeze=True)
+    assert isinstance(compacted, FrozenDict)
+    sections = compacted["sections"]
+    assert isinstance(sections, tuple)
+    assert all(isinstance(section, FrozenDict) for section in sections)
+    assert len({id(section._layout) for section in sections}) == 1
+    assert sections[3] == {"name": "section3", "mode": "fast", "port": 3}
+    assert compacted["ints"] == tuple(range(100))
+    assert compacted["tags"] == frozenset({"a", "b"})
+    assert report.frozen_dicts == 201
+    assert report.key_layouts == 2
+    with pytest.raises(TypeError):
+        sections[0]["port"] = 1
+    with pytest.raises(KeyError):
+        sections[0]["unknown"]
+    assert "port" in sections[0]
+    assert len(sections[0]) == 3
+    assert pickle.loads(pickle.dumps(sections[0])) == sections[0]
+
+
+def test_compact_dict_unmeasured():
+    compacted, report = compact_dict({"a": 1}, measure=False)
+    assert compacted == {"a": 1}
+    assert report.bytes_before == report.bytes_after == 0
+
+
+def test_compact_dict_none():
+    with pytest.raises(ValueError):
+        compact_dict(None)
+
+
+def test_deep_getsizeof_counts_shared_objects_once():
+    shared = ["x" * 100]
+    assert deep_getsizeof([shared, shared]) == sys.getsizeof([shared, shared]) + deep_getsizeof(shared)
@@ -0,0 +1,86 @@
+import pytest
+import tracemalloc
+import click
+from click.testing import CliRunner
+from pathlib import Path
+from pydantic import BaseSettings
+
+from pycmdlineapp_groundwork.utility.memory_profile import MemoryProfiler, memory_profiler
+from pycmdlineapp_groundwork.config.config_file_loaders import load_dict_from_file
+from pycmdlineapp_groundwork.config.click_config_option import click_config_option
+
+
+@pytest.fixture
+def enabled_memory_profiler():
+    memory_profiler.reset()
+    memory_profiler.enable()
+    yield memory_profiler
+    memory_profiler.disable()
+    memory_profiler.reset()
+
+
+def test_memory_profiler_disabled():
+    profiler = MemoryProfiler(enabled=False)
+    with profiler.stage("raw_bytes", "foo"):
+        data = b"x" * 1000
+    assert profiler.stats() == []
+
+
+def test_memory_profiler_env_var(monkeypatch):
+    monkeypatch.setenv("PYCMDLINEAPP_MEMORY_PROFILE", "0")
+    assert not MemoryProfiler().enabled
+    monkeypatch.setenv("PYCMDLINEAPP_MEMORY_PROFILE", "1")
+    profiler = MemoryProfiler()
+    assert profiler.enabled
+    profiler.disable()
+
+
+def test_memory_profiler_nested_stages():
+    profiler = MemoryProfiler(enabled=True)
+    with profiler.stage("outer"):
+        with profiler.stage("inner"):
+            temporary = bytearray(2_000_000)
+            del temporary
+        kept = bytearray(500_000)
+    profiler.disable()
+    stats = {stats.stage: stats for stats in profiler.stats()}
+    assert stats["inner"].peak >= 2_000_000
+    assert stats["inner"].retained < 100_000
+    assert stats["outer"].peak >= 2_000_000
+    assert 500_000 <= stats["outer"].retained < 600_000
+    assert "outer" in profiler.report()
+    assert stats["outer"].as_dict()["calls"] == 1
+
+
+def test_memory_profiler_loading_stages(enabled_memory_profiler):
+    assert load_dict_from_file(Path("tests/config/example_cfg3.json")) == {
+        "main": "started",
+        "runserver": {"nested_list": [42, 96]},
+    }
+    assert load_dict_from_file(Path("tests/config/example_cfg2.toml")) is not None
+    stages = [stats.stage for stats in enabled_memory_profiler.stats()]
+    assert stages.count("raw_bytes") == 2
+    assert stages.count("decoded_text") == 2
+    assert stages.count("parsed_dict") == 2
+
+
+class ProfiledSettings(BaseSettings):
+    debug: bool = False
+    port: int = 1234
+
+
+def test_memory_profiler_click_config_option(enabled_memory_profiler, tmp_path):
+    config_file = tmp_path / "config.toml"
+    config_file.write_text("port = 4242\r\n")
+    settings = ProfiledSettings()
+
+    @click.command()
+    @click_config_option(settings, ProfiledSettings)
+    def cli(config):
+        click.echo(f"port={config.port}")
+
+    result = CliRunner().invoke(cli, ["--config", str(config_file)])
+    assert result.exit_code == 0
+    assert "port=4242" in result.output
+    for stage in ["raw_bytes", "decoded_text", "parsed_dict", "merged_dict", "pydantic_model"]:
+        assert stage in result.output
@@ -0,0 +1,37 @@
+import pickle
+import pytest
+from pycmdlineapp_groundwork.utility.type_descriptors import TypeDescriptor, TypeDescriptors
+
+
+def test_type_descriptors_lookups():
+    types= TypeDescriptors(["first", ("second", "the second type")])
+    third= types("third", "the third type")
+    types["fourth"]= "the fourth type"
+    assert third == TypeDescriptor("third", 3, "the third type")
+    assert types[3] is third and types["third"] is third and types.third is third
+    assert types.get(5) is None and types.get("fifth", "default") == "default"
+    assert types.get(0) is None
+    assert "second" in types and 4 in types and "fifth" not in types and [] not in types
+    assert len(types) == 4
+    assert list(types.names()) == ["first", "second", "third", "fourth"]
+    assert list(types.keys()) == [1, 2, 3, 4]
+    assert list(types.descriptions()) == ["", "the second type", "the third type", "the fourth type"]
+    assert [entry.key for entry in types] == [1, 2, 3, 4]
+    assert str(types.first) == "TypeDescriptor (first,1,)"
+    assert TypeDescriptors.TypeDescriptor is TypeDescriptor
+    with pytest.raises(KeyError):
+        types["fifth"]
+    with pytest.raises(AttributeError):
+        types.fifth
+    with pytest.raises(ValueError):
+        types.append("first")
+
+
+def test_type_descriptors_are_independent_and_picklable():
+    first= TypeDescriptors(["a"])
+    second= TypeDescriptors()
+    assert len(second) == 0 and "a" not in second
+    copied= pickle.loads(pickle.dumps(first))
+    assert copied.a == first.a and copied["a"] is copied[1]
+    copied.append("b")
+    assert "b" not in first